@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Bulk Historical Backfill
+
+Fetches long spans of satellite positions from NASA SSC by splitting the job
+into (satellite x UTC day) work units, running them through a worker pool and
+writing each completed unit straight to a columnar TrackStore. Completed units
+are appended to a manifest in the store, so an interrupted or failed run
+resumes where it stopped instead of starting over. All calls run at
+PRIORITY_BULK, so a real-time tracker in the same process keeps precedence.
+
+Usage:
+    python backfill.py -s iss ace --days 90 --store tracks/
+    python backfill.py --start 2025-01-01 --end 2025-04-01 --workers 8
+    python backfill.py -s iss ace --days 365 --store archive/ --compress
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+
+from satellite_tracker import fetch_satellite_positions, get_ssc_client
+from ssc_ratelimit import PRIORITY_BULK, request_priority
+from track_store import TrackStore, day_bounds, day_range
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+
+class BackfillManifest:
+    """
+    Append-only record of completed (satellite, day) units.
+
+    Each completed unit is one JSON line, flushed and fsynced before the unit
+    counts as done. A truncated last line from a crash is ignored on load.
+
+    Args:
+        path (str): Manifest file path
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.completed[(entry['id'], entry['day'])] = entry['samples']
+
+    def is_done(self, satellite_id, day):
+        """Return True if the unit was completed by an earlier or the current run."""
+        return (satellite_id, day.isoformat()) in self.completed
+
+    def mark_done(self, satellite_id, day, samples):
+        """Record a completed unit durably."""
+        entry = {'id': satellite_id, 'day': day.isoformat(), 'samples': samples,
+                 'completed_at': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')}
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.completed[(satellite_id, entry['day'])] = samples
+
+
+def _run_unit(store, satellite_id, day, client):
+    """Fetch and store one (satellite, day) unit. Returns the number of samples."""
+    start_time, end_time = day_bounds(day)
+    with request_priority(PRIORITY_BULK):
+        satellite_data = fetch_satellite_positions(
+            [satellite_id], client=client, start_time=start_time,
+            end_time=end_time - timedelta(seconds=1), raise_errors=True, verbose=False
+        )
+    sat = next((s for s in satellite_data if s['id'].lower() == satellite_id.lower()), None)
+    return store.write_unit(satellite_id, day, sat)
+
+
+def run_backfill(satellite_ids, start_day, end_day, store_dir, workers=4, client=None, compress=False):
+    """
+    Backfill positions for every (satellite, day) unit not already completed.
+
+    Args:
+        satellite_ids (list): Satellite IDs
+        start_day (date): First UTC day to fetch
+        end_day (date): UTC day to stop at (exclusive)
+        store_dir (str): TrackStore directory; also holds the manifest
+        workers (int): Number of concurrent workers (default: 4)
+        client: SSC client (default: None, the shared client)
+        compress (bool): Write units with the archival codec (see track_codec.py)
+
+    Returns:
+        dict: Summary with 'completed', 'skipped', 'failed', 'samples' and 'elapsed'
+    """
+    store = TrackStore(store_dir, compress=compress)
+    manifest = BackfillManifest(os.path.join(store_dir, MANIFEST_NAME))
+    client = client or get_ssc_client()
+
+    units = [(sat_id, day) for sat_id in satellite_ids for day in day_range(start_day, end_day)]
+    pending = [(sat_id, day) for sat_id, day in units if not manifest.is_done(sat_id, day)]
+    skipped = len(units) - len(pending)
+
+    print(f"Backfill: {len(units)} units ({len(satellite_ids)} satellites x "
+          f"{(end_day - start_day).days} days), {skipped} already complete, {len(pending)} to fetch")
+
+    completed, samples, failed = 0, 0, []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_unit, store, sat_id, day, client): (sat_id, day)
+                   for sat_id, day in pending}
+        try:
+            for future in as_completed(futures):
+                sat_id, day = futures[future]
+                try:
+                    unit_samples = future.result()
+                except Exception as e:
+                    failed.append((sat_id, day))
+                    print(f"  {sat_id} {day}: failed ({e})")
+                    continue
+                manifest.mark_done(sat_id, day, unit_samples)
+                completed += 1
+                samples += unit_samples
+                elapsed = time.monotonic() - started
+                print(f"  [{completed + len(failed)}/{len(pending)}] {sat_id} {day}: "
+                      f"{unit_samples} samples | {samples / elapsed:,.0f} samples/s")
+        except KeyboardInterrupt:
+            print("\nBackfill interrupted; completed units are saved and will be skipped on resume.")
+            for future in futures:
+                future.cancel()
+            raise
+
+    elapsed = time.monotonic() - started
+    print(f"\nBackfill finished: {completed} units, {samples:,} samples in {elapsed:.1f}s "
+          f"({samples / elapsed if elapsed else 0:,.0f} samples/s), {len(failed)} failed")
+    if failed:
+        print("Re-run the same command to retry failed units.")
+    return {'completed': completed, 'skipped': skipped, 'failed': failed,
+            'samples': samples, 'elapsed': elapsed}
+
+
+def _active_satellite_ids(client, start_day):
+    """Return IDs of satellites whose coverage extends past start_day."""
+    start = datetime(start_day.year, start_day.month, start_day.day, tzinfo=timezone.utc)
+    observatories = client.get_observatories()['Observatory']
+    return [obs['Id'] for obs in observatories if obs['EndTime'] > start]
+
+
+def main():
+    """Main function with command line options."""
+    parser = argparse.ArgumentParser(description='Resumable bulk backfill of SSC satellite positions')
+    parser.add_argument('--satellites', '-s', nargs='+', default=['all'],
+                        help='Satellite IDs to backfill (space-separated, default: all active)')
+    parser.add_argument('--start', type=date.fromisoformat,
+                        help='First UTC day to fetch (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat,
+                        help='UTC day to stop at, exclusive (YYYY-MM-DD, default: today)')
+    parser.add_argument('--days', type=int, default=30,
+                        help='Number of days before --end when --start is omitted (default: 30)')
+    parser.add_argument('--store', default='tracks',
+                        help='Track store directory (default: tracks)')
+    parser.add_argument('--compress', action='store_true',
+                        help='Write units in the compressed archival format (.trk) instead of .npz')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                        help='Concurrent workers (default: 4)')
+    parser.add_argument('--standin', action='store_true',
+                        help='Fetch from the local SSC stand-in instead of NASA SSC')
+    parser.add_argument('--tle', nargs='+', metavar='FILE',
+                        help='Propagate from TLE/OMM element files with SGP4 instead of querying SSC')
+    args = parser.parse_args()
+
+    end_day = args.end or datetime.utcnow().date()
+    start_day = args.start or end_day - timedelta(days=args.days)
+
+    client = None
+    if args.standin:
+        from ssc_standin import StandInSscWs
+        client = StandInSscWs()
+    elif args.tle:
+        from tle_backend import TleClient
+        client = TleClient(args.tle)
+
+    satellite_ids = args.satellites
+    if 'all' in satellite_ids:
+        satellite_ids = _active_satellite_ids(client or get_ssc_client(), start_day)
+
+    run_backfill(satellite_ids, start_day, end_day, args.store, args.workers, client, args.compress)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Close-Approach (Conjunction) Screening over Fetched Tracks
+
+Finds the closest approach of every satellite pair over a fetched time window
+without looping over pairs and samples in Python:
+
+1. Align all tracks on a common time grid. Positions are rotated from GEO to
+   the inertial GEI frame first (distances are the same, but motion between
+   samples is much closer to linear), then interpolated, with NaN outside each
+   satellite's coverage.
+2. Prune: bucket every (satellite, time step) sample into a uniform grid whose
+   cell is the threshold plus the largest per-step motion, with the time step
+   packed into the cell key. Only pairs that share or neighbour a cell at some
+   step are kept as candidates. The few fastest movers (deep-space and
+   interplanetary objects, whose steps would blow up the cell size) are
+   instead screened against everyone with one vectorized distance bound each.
+3. Refine: for each candidate pair, compute the exact minimum distance on
+   every segment between grid steps (relative motion is linear within a
+   segment, so the minimum has a closed form), in chunks of pairs to bound
+   memory.
+"""
+
+import itertools
+
+import numpy as np
+
+from frames import convert as convert_frame
+from satellite_tracker import times_to_epoch_seconds
+
+_KEY_BITS = 16
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+FAST_MOVER_PERCENTILE = 95
+_HALF_NEIGHBOURS = [np.array(o) for o in itertools.product((-1, 0, 1), repeat=3) if o >= (0, 0, 0)]
+
+
+def align_tracks(satellite_data, step_s=60.0):
+    """
+    Interpolate every track onto one common time grid.
+
+    Args:
+        satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        step_s (float): Grid spacing in seconds (default: 60)
+
+    Returns:
+        tuple: (ids, grid_epochs (T,), GEI positions (n, T, 3) in km with NaN
+               where a satellite has no coverage)
+    """
+    sats = [sat for sat in satellite_data if len(sat['times']) > 1]
+    epochs = [times_to_epoch_seconds(sat['times']) for sat in sats]
+    if not sats:
+        return [], np.zeros(0), np.zeros((0, 0, 3))
+
+    start = min(e[0] for e in epochs)
+    end = max(e[-1] for e in epochs)
+    grid = np.arange(start, end + step_s / 2, step_s)
+    positions = np.full((len(sats), len(grid), 3), np.nan)
+    for idx, (sat, t) in enumerate(zip(sats, epochs)):
+        covered = (grid >= t[0]) & (grid <= t[-1])
+        gei = convert_frame(np.column_stack([sat['x'], sat['y'], sat['z']]), t, 'geo', 'gei')
+        for axis in range(3):
+            positions[idx, covered, axis] = np.interp(grid[covered], t, gei[:, axis])
+    return [sat['id'] for sat in sats], grid, positions
+
+
+def _candidate_pairs(positions, cell_km, members):
+    """Return unique (a, b) pairs among members that come within one grid cell at some step."""
+    n = positions.shape[0]
+    valid = np.zeros(positions.shape[:2], dtype=bool)
+    valid[members] = np.isfinite(positions[members, :, 0])
+    sat_idx, step_idx = np.nonzero(valid)
+    cells = np.floor(positions[sat_idx, step_idx] / cell_km).astype(np.int64)
+    cells = np.clip(cells + _KEY_OFFSET, 1, (1 << _KEY_BITS) - 2)
+
+    def keys(c):
+        return (((step_idx << _KEY_BITS | c[:, 0]) << _KEY_BITS | c[:, 1]) << _KEY_BITS) | c[:, 2]
+
+    # Work in key order so the neighbour lookups below are nearly sorted too,
+    # which keeps searchsorted cache-friendly
+    own_keys = keys(cells)
+    order = np.argsort(own_keys, kind='stable')
+    sorted_keys = own_keys[order]
+    sat_idx, step_idx, cells = sat_idx[order], step_idx[order], cells[order]
+
+    found = []
+    for offset in _HALF_NEIGHBOURS:
+        neighbour_keys = keys(cells + offset)
+        lo = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+        hi = np.searchsorted(sorted_keys, neighbour_keys, side='right')
+        counts = hi - lo
+        owner = np.repeat(np.arange(len(lo)), counts)
+        members = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        a, b = sat_idx[owner], sat_idx[members]
+        keep = a != b
+        found.append(np.minimum(a, b)[keep] * n + np.maximum(a, b)[keep])
+
+    return np.concatenate(found)
+
+
+def _fast_mover_pairs(positions, fast, step_sizes, threshold_km):
+    """Return pair codes for each fast mover and every satellite it may approach."""
+    n = positions.shape[0]
+    found = []
+    for f in fast:
+        distance = np.linalg.norm(positions - positions[f], axis=2)
+        bound = threshold_km + step_sizes[f] + step_sizes
+        near = np.nonzero(np.any(distance <= bound[:, None], axis=1))[0]
+        near = near[near != f]
+        found.append(np.minimum(near, f) * n + np.maximum(near, f))
+    return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+
+def _closest_approach(positions, a, b):
+    """Return (segment index, fraction, distance) of the minimum distance for each pair."""
+    r0 = positions[a, :-1] - positions[b, :-1]
+    dr = (positions[a, 1:] - positions[b, 1:]) - r0
+    dr_sq = np.einsum('pti,pti->pt', dr, dr)
+    s = np.clip(-np.einsum('pti,pti->pt', r0, dr) / np.where(dr_sq > 0, dr_sq, 1), 0, 1)
+    closest = r0 + s[..., None] * dr
+    distance = np.sqrt(np.einsum('pti,pti->pt', closest, closest))
+    distance = np.where(np.isnan(distance), np.inf, distance)
+    segment = np.argmin(distance, axis=1)
+    rows = np.arange(len(a))
+    return segment, s[rows, segment], distance[rows, segment]
+
+
+def screen_conjunctions(satellite_data, threshold_km, step_s=60.0, chunk_pairs=256):
+    """
+    Find satellite pairs whose closest approach in the window is below a threshold.
+
+    Args:
+        satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        threshold_km (float): Report approaches closer than this (km)
+        step_s (float): Common time grid spacing in seconds (default: 60)
+        chunk_pairs (int): Candidate pairs refined per batch (default: 256)
+
+    Returns:
+        list: (id_a, id_b, tca_epoch_seconds, distance_km) tuples sorted by distance
+    """
+    ids, grid, positions = align_tracks(satellite_data, step_s)
+    if len(ids) < 2 or len(grid) < 2:
+        return []
+
+    # A pair closer than the threshold mid-segment is within threshold + both
+    # satellites' step displacement at the nearer grid point
+    steps = np.linalg.norm(np.diff(positions, axis=1), axis=2)
+    step_sizes = np.max(np.where(np.isnan(steps), 0.0, steps), axis=1)
+    fast_limit = np.percentile(step_sizes, FAST_MOVER_PERCENTILE)
+    fast = np.nonzero(step_sizes > fast_limit)[0]
+    slow = np.nonzero(step_sizes <= fast_limit)[0]
+
+    n = len(ids)
+    codes = np.concatenate([
+        _candidate_pairs(positions, threshold_km + 2 * fast_limit, slow),
+        _fast_mover_pairs(positions, fast, step_sizes, threshold_km),
+    ])
+    codes = np.unique(codes)
+    a, b = codes // n, codes % n
+
+    results = []
+    for start in range(0, len(a), chunk_pairs):
+        ca, cb = a[start:start + chunk_pairs], b[start:start + chunk_pairs]
+        segment, fraction, distance = _closest_approach(positions, ca, cb)
+        close = distance <= threshold_km
+        tca = grid[segment] + fraction * step_s
+        results.extend(zip(ca[close], cb[close], tca[close], distance[close]))
+
+    results.sort(key=lambda r: r[3])
+    return [(ids[i], ids[j], float(t), float(d)) for i, j, t, d in results]
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Ground-Track and Footprint Coverage Accumulation
+
+Bins track samples into a regular latitude/longitude grid to show how often
+each cell was overflown during a window. There are two modes:
+
+- ground track: each sample counts once in the cell under the satellite
+  (a single np.bincount over the flattened cell index)
+- footprint: each sample counts in every cell inside the satellite's
+  visibility circle, whose Earth-central half-angle follows from altitude and
+  an elevation mask. Each (sample, grid row) pair covers one longitude
+  interval, so interval ends are histogrammed as +1/-1 into a per-row
+  difference array with np.bincount and summed with a single cumsum.
+
+The grid keeps the newest accumulated epoch per satellite, so add() can be
+called again after every real-time refresh and only new samples are counted.
+"""
+
+import numpy as np
+
+from satellite_tracker import EARTH_RADIUS_KM, times_to_epoch_seconds
+
+
+def footprint_half_angle(altitudes_km, min_elevation=0.0):
+    """
+    Earth-central half-angle of the area that sees a satellite above a mask.
+
+    Args:
+        altitudes_km (array): Satellite altitudes in km
+        min_elevation (float): Elevation mask in degrees (default: 0)
+
+    Returns:
+        numpy.ndarray: Half-angles in radians (0 where the satellite is below ground)
+    """
+    elevation = np.radians(min_elevation)
+    ratio = EARTH_RADIUS_KM / (EARTH_RADIUS_KM + np.maximum(np.asarray(altitudes_km, dtype=np.float64), 0.0))
+    return np.arccos(np.clip(ratio * np.cos(elevation), -1, 1)) - elevation
+
+
+class CoverageGrid:
+    """
+    Incremental lat/lon coverage histogram.
+
+    Args:
+        resolution_deg (float): Grid cell size in degrees (default: 1)
+        footprint (bool): Count every cell inside the visibility footprint
+                          instead of only the sub-satellite cell (default: False)
+        min_elevation (float): Elevation mask in degrees for footprints (default: 0)
+    """
+
+    def __init__(self, resolution_deg=1.0, footprint=False, min_elevation=0.0):
+        self.resolution_deg = resolution_deg
+        self.footprint = footprint
+        self.min_elevation = min_elevation
+        self.n_lat = int(round(180 / resolution_deg))
+        self.n_lon = int(round(360 / resolution_deg))
+        self.counts = np.zeros((self.n_lat, self.n_lon), dtype=np.int64)
+        self.samples = 0
+        self._last_epoch = {}
+
+    def _new_samples(self, satellite_data):
+        """Return concatenated lat, lon, alt of samples newer than those already counted."""
+        lats, lons, alts = [], [], []
+        for sat in satellite_data:
+            if len(sat['times']) == 0:
+                continue
+            epochs = times_to_epoch_seconds(sat['times'])
+            new = epochs > self._last_epoch.get(sat['id'], -np.inf)
+            self._last_epoch[sat['id']] = float(epochs[-1])
+            lats.append(np.asarray(sat['latitudes'], dtype=np.float64)[new])
+            lons.append(np.asarray(sat['longitudes'], dtype=np.float64)[new])
+            alts.append(np.asarray(sat['altitudes'], dtype=np.float64)[new])
+        if not lats:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        return np.concatenate(lats), np.concatenate(lons), np.concatenate(alts)
+
+    def add(self, satellite_data):
+        """
+        Accumulate samples from fetch_satellite_positions() output.
+
+        Samples at or before the newest epoch already counted for a satellite
+        are skipped, so overlapping real-time windows are not double counted.
+
+        Returns:
+            int: Number of samples added
+        """
+        lat, lon, alt = self._new_samples(satellite_data)
+        keep = np.isfinite(lat) & np.isfinite(lon)
+        lat, lon, alt = lat[keep], lon[keep], alt[keep]
+        if len(lat) == 0:
+            return 0
+        if self.footprint:
+            self._add_footprints(lat, lon, alt)
+        else:
+            row = np.clip(((lat + 90) / self.resolution_deg).astype(np.int64), 0, self.n_lat - 1)
+            col = (((lon + 180) % 360) / self.resolution_deg).astype(np.int64) % self.n_lon
+            self.counts += np.bincount(row * self.n_lon + col, minlength=self.counts.size).reshape(self.counts.shape)
+        self.samples += len(lat)
+        return len(lat)
+
+    def _add_footprints(self, lat, lon, alt, chunk_pairs=4_000_000):
+        """Add every cell whose centre lies inside each sample's footprint circle."""
+        res = np.radians(self.resolution_deg)
+        half_angle = footprint_half_angle(alt, self.min_elevation)
+        lat0 = np.radians(lat)
+        cos_half, sin_lat0, cos_lat0 = np.cos(half_angle), np.sin(lat0), np.cos(lat0)
+        centre = ((lon + 180) % 360) / self.resolution_deg - 0.5
+        row_lat = (np.arange(self.n_lat) + 0.5) * res - np.pi / 2
+        sin_row, cos_row = np.sin(row_lat), np.cos(row_lat)
+
+        # Grid rows whose centre latitude is inside each footprint's latitude band
+        first = np.clip(np.ceil((lat0 - half_angle + np.pi / 2) / res - 0.5), 0, self.n_lat).astype(np.int64)
+        last = np.clip(np.floor((lat0 + half_angle + np.pi / 2) / res - 0.5), -1, self.n_lat - 1).astype(np.int64)
+        counts = np.maximum(last - first + 1, 0)
+
+        # Process samples in batches that expand to at most chunk_pairs (sample, row) pairs
+        stride = self.n_lon + 1
+        diff = np.zeros(self.n_lat * stride, dtype=np.int64)
+        bounds = np.searchsorted(np.cumsum(counts), np.arange(chunk_pairs, counts.sum(), chunk_pairs))
+        for chunk in np.split(np.arange(len(lat0)), np.unique(bounds) + 1):
+            chunk_counts = counts[chunk]
+            sample = np.repeat(chunk, chunk_counts)
+            row = (np.repeat(first[chunk] - np.cumsum(chunk_counts) + chunk_counts, chunk_counts)
+                   + np.arange(chunk_counts.sum()))
+
+            # Longitude half-width of the circle on each row (spherical law of cosines)
+            cos_width = ((cos_half[sample] - sin_row[row] * sin_lat0[sample])
+                         / np.maximum(cos_row[row] * cos_lat0[sample], 1e-12))
+            width = np.arccos(np.clip(cos_width, -1, 1)) / res
+
+            # Column range [start, stop) of cell centres within the half-width
+            start = np.ceil(centre[sample] - width).astype(np.int64)
+            stop = np.floor(centre[sample] + width).astype(np.int64) + 1
+            full = (stop - start) >= self.n_lon
+            start = np.where(full, 0, start)
+            stop = np.where(full, self.n_lon, stop)
+
+            # Intervals crossing the antimeridian are split in two
+            shift = np.floor_divide(start, self.n_lon) * self.n_lon
+            start, stop = start - shift, stop - shift
+            wraps = stop > self.n_lon
+            rise = np.concatenate([row * stride + start, row[wraps] * stride])
+            fall = np.concatenate([row * stride + np.minimum(stop, self.n_lon),
+                                   row[wraps] * stride + stop[wraps] - self.n_lon])
+            diff += np.bincount(rise, minlength=diff.size) - np.bincount(fall, minlength=diff.size)
+
+        self.counts += np.cumsum(diff.reshape(self.n_lat, stride), axis=1)[:, :self.n_lon]
+
+    def reset(self):
+        """Clear all accumulated counts."""
+        self.counts[:] = 0
+        self.samples = 0
+        self._last_epoch.clear()
+
+    def covered_fraction(self):
+        """Return the area-weighted fraction of the globe with non-zero coverage."""
+        row_lat = np.radians((np.arange(self.n_lat) + 0.5) * self.resolution_deg - 90)
+        area = np.cos(row_lat)[:, None] * np.ones(self.n_lon)
+        return float(area[self.counts > 0].sum() / area.sum())
+
+    def draw(self, ax, cmap='inferno', alpha=0.55):
+        """
+        Draw the grid as one raster layer on a cartopy PlateCarree axes.
+
+        Returns:
+            matplotlib.image.AxesImage: The image; pass it to update_image() after add()
+        """
+        import cartopy.crs as ccrs
+
+        return ax.imshow(np.ma.masked_equal(self.counts, 0), origin='lower',
+                         extent=(-180, 180, -90, 90), transform=ccrs.PlateCarree(),
+                         cmap=cmap, alpha=alpha, interpolation='nearest', zorder=1)
+
+    def update_image(self, image):
+        """Refresh an image returned by draw() with the current counts."""
+        image.set_data(np.ma.masked_equal(self.counts, 0))
+        image.set_clim(1, max(int(self.counts.max()), 1))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Sun Illumination and Eclipse State per Track Sample
+
+Computes, for every sample of every fetched track in fixed-size batches, the
+fraction of the solar disc visible from the satellite:
+
+- 1.0: sunlit
+- 0.0: umbra (full eclipse)
+- in between: penumbra, or an annular eclipse far from Earth
+
+The Sun position comes from the low-precision analytic ephemeris in frames.py
+(about 0.01 degree accuracy), rotated into GEO so the tracks do not need to be
+converted. No network access or ephemeris files are needed. Two shadow models
+are available:
+
+- 'conical' (default): overlap of the apparent solar and Earth discs seen
+  from the satellite, which gives penumbra and annular phases
+- 'cylindrical': Earth's shadow as a cylinder of Earth radius anti-sunward,
+  sunlit/umbra only, which is cheaper and fine for low orbits
+"""
+
+import numpy as np
+
+from frames import convert as convert_frame
+from frames import sun_direction_gei, sun_distance_km
+from satellite_tracker import EARTH_RADIUS_KM, times_to_epoch_seconds
+
+SUN_RADIUS_KM = 695700.0
+SHADOW_MODELS = ('conical', 'cylindrical')
+ILLUMINATION_BLOCK = 32768  # Samples evaluated per batch in add_illumination()
+
+
+def sun_position_geo(epochs):
+    """
+    Geocentric Sun position in GEO.
+
+    Args:
+        epochs (array): UTC epoch seconds
+
+    Returns:
+        numpy.ndarray: (n, 3) Sun positions in km
+    """
+    epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+    sun_gei = sun_direction_gei(epochs) * sun_distance_km(epochs)[:, None]
+    return convert_frame(sun_gei, epochs, 'gei', 'geo')
+
+
+def illumination(xyz, sun_xyz, model='conical'):
+    """
+    Visible fraction of the solar disc for each position.
+
+    Args:
+        xyz (array): (n, 3) satellite positions in km
+        sun_xyz (array): (n, 3) or (3,) Sun positions in km, same frame as xyz
+        model (str): 'conical' or 'cylindrical' (default: 'conical')
+
+    Returns:
+        numpy.ndarray: (n,) fractions in [0, 1]
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    sun_xyz = np.broadcast_to(np.asarray(sun_xyz, dtype=np.float64), xyz.shape)
+    r = np.linalg.norm(xyz, axis=-1)
+
+    if model == 'cylindrical':
+        sun_hat = sun_xyz / np.linalg.norm(sun_xyz, axis=-1, keepdims=True)
+        along = np.einsum('ni,ni->n', xyz, sun_hat)
+        across = np.linalg.norm(xyz - along[:, None] * sun_hat, axis=-1)
+        return ((along > 0) | (across > EARTH_RADIUS_KM)).astype(np.float64)
+    if model != 'conical':
+        raise ValueError(f"Unsupported shadow model: {model} (choose from {', '.join(SHADOW_MODELS)})")
+
+    # Apparent radii of the Sun (a) and Earth (b) and their separation (c)
+    to_sun = sun_xyz - xyz
+    sun_range = np.linalg.norm(to_sun, axis=-1)
+    a = np.arcsin(np.clip(SUN_RADIUS_KM / sun_range, 0, 1))
+    b = np.arcsin(np.clip(EARTH_RADIUS_KM / np.maximum(r, EARTH_RADIUS_KM), 0, 1))
+    c = np.arccos(np.clip(-np.einsum('ni,ni->n', xyz, to_sun) / (r * sun_range), -1, 1))
+
+    # Overlap area of two discs for the partial phase
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = (c**2 + a**2 - b**2) / (2 * c)
+        y = np.sqrt(np.maximum(a**2 - x**2, 0))
+        overlap = (a**2 * np.arccos(np.clip(x / a, -1, 1))
+                   + b**2 * np.arccos(np.clip((c - x) / b, -1, 1)) - c * y)
+        partial = 1 - overlap / (np.pi * a**2)
+
+    return np.select(
+        [c >= a + b, c <= b - a, c <= a - b],
+        [1.0, 0.0, 1 - b**2 / a**2],
+        default=np.clip(partial, 0, 1),
+    )
+
+
+def _illuminate(batch, model):
+    """Evaluate one batch of (sat, lo, hi, epochs) track slices into their 'illumination' columns."""
+    epochs = np.concatenate([piece[3] for piece in batch])
+    xyz = np.concatenate([np.column_stack([sat['x'][lo:hi], sat['y'][lo:hi], sat['z'][lo:hi]])
+                          for sat, lo, hi, _ in batch])
+    fraction = illumination(xyz, sun_position_geo(epochs), model)
+    start = 0
+    for sat, lo, hi, _ in batch:
+        sat['illumination'][lo:hi] = fraction[start:start + hi - lo]
+        start += hi - lo
+
+
+def add_illumination(satellite_data, model='conical', block=ILLUMINATION_BLOCK):
+    """
+    Add an 'illumination' column to every track.
+
+    Samples are evaluated in batches of about `block` samples spanning as
+    many satellites as fit (long tracks are sliced), so the shadow geometry
+    temporaries, roughly 300 bytes per sample, stay bounded for any window.
+
+    Args:
+        satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        model (str): Shadow model, 'conical' or 'cylindrical' (default: 'conical')
+        block (int): Samples per batch (default: ILLUMINATION_BLOCK)
+
+    Returns:
+        list: The same satellite dictionaries, each with an 'illumination' array
+              (1 sunlit, 0 umbra) aligned with its samples
+    """
+    batch, size = [], 0
+    for sat in satellite_data:
+        if len(sat['times']) == 0:
+            continue
+        epochs = times_to_epoch_seconds(sat['times'])
+        sat['illumination'] = np.empty(len(epochs))
+        for lo in range(0, len(epochs), block):
+            hi = min(len(epochs), lo + block)
+            batch.append((sat, lo, hi, epochs[lo:hi]))
+            size += hi - lo
+            if size >= block:
+                _illuminate(batch, model)
+                batch, size = [], 0
+    if batch:
+        _illuminate(batch, model)
+    return satellite_data
+
+
+def eclipse_summary(satellite_data):
+    """
+    Summarize the 'illumination' column per satellite.
+
+    Returns:
+        list: (satellite_id, fraction of samples in shadow, latest illumination) tuples
+    """
+    return [(sat['id'], float(np.mean(sat['illumination'] < 1.0)), float(sat['illumination'][-1]))
+            for sat in satellite_data if len(sat.get('illumination', ())) > 0]
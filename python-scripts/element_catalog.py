@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Orbital Element Catalogs for the Animated Viewers
+
+Loads the simple orbit descriptions the animated viewers draw (altitude,
+inclination, period, phase, or a fixed longitude for geostationary objects,
+plus display colour and marker size) from a table into one structured NumPy
+array. Orbit-class selection is then a vectorized mask instead of a list
+comprehension over dictionaries.
+
+Supported formats, chosen by file extension:
+- .csv: header row with the column names below (missing columns get defaults)
+- .npy: a saved structured array with CATALOG_DTYPE fields
+- .parquet: requires the optional pyarrow package
+
+Columns:
+    id, altitude (km), inclination (deg), period, phase (rad),
+    longitude (deg, geostationary only; empty otherwise), color, size,
+    raan (deg, rotation of the orbit plane about the pole; default 0)
+
+walker_delta() generates large Walker-delta constellations in the same layout,
+and orbit_positions() evaluates every entry's position in one vectorized call.
+"""
+
+import os
+
+import numpy as np
+
+from satellite_tracker import EARTH_MU_KM3_S2, EARTH_RADIUS_KM
+
+CATALOG_DTYPE = np.dtype([
+    ('id', 'U24'),
+    ('altitude', 'f8'),
+    ('inclination', 'f8'),
+    ('period', 'f8'),
+    ('phase', 'f8'),
+    ('longitude', 'f8'),
+    ('color', 'U9'),
+    ('size', 'f8'),
+    ('raan', 'f8'),
+])
+
+_DEFAULTS = {'inclination': 0.0, 'period': np.nan, 'phase': 0.0, 'longitude': np.nan,
+             'color': '#FFFFFF', 'size': 60.0, 'raan': 0.0}
+
+# Orbit classes by altitude in km: (lower, upper), both exclusive
+ORBIT_CLASSES = {
+    'leo': (-np.inf, 1000),
+    'meo': (1000, 30000),
+    'geo': (30000, 100000),
+    'deep': (100000, np.inf),
+}
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalogs')
+
+
+def _from_columns(columns, length):
+    """Build a catalog array from a {name: sequence} mapping, filling defaults."""
+    catalog = np.zeros(length, dtype=CATALOG_DTYPE)
+    for name in CATALOG_DTYPE.names:
+        if name in columns:
+            values = np.asarray(columns[name])
+            if catalog.dtype[name].kind == 'f' and values.dtype.kind in 'UO':
+                values = np.array([float(v) if str(v).strip() else _DEFAULTS.get(name, np.nan)
+                                   for v in values])
+            catalog[name] = values
+        elif name in _DEFAULTS:
+            catalog[name] = _DEFAULTS[name]
+        else:
+            raise ValueError(f"Element catalog is missing required column '{name}'")
+    return catalog
+
+
+def load_element_catalog(path):
+    """
+    Load an element catalog into a structured array.
+
+    Args:
+        path (str): .csv, .npy or .parquet file
+
+    Returns:
+        numpy.ndarray: Structured array with CATALOG_DTYPE fields
+    """
+    if path.endswith('.npy'):
+        data = np.load(path, allow_pickle=False)
+        return _from_columns({name: data[name] for name in data.dtype.names}, len(data))
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(f"Reading Parquet catalogs requires pyarrow ({e}); "
+                              "install it with: pip install pyarrow") from e
+        table = pq.read_table(path)
+        return _from_columns({name: table.column(name).to_numpy(zero_copy_only=False)
+                              for name in table.column_names}, table.num_rows)
+
+    with open(path, encoding='utf-8') as f:
+        names = [name.strip() for name in f.readline().split(',')]
+    dtype = [(name, CATALOG_DTYPE[name] if name in CATALOG_DTYPE.names else 'U64') for name in names]
+    filling = {idx: _DEFAULTS.get(name, np.nan) for idx, (name, kind) in enumerate(dtype)
+               if np.dtype(kind).kind == 'f'}
+    data = np.genfromtxt(path, delimiter=',', skip_header=1, dtype=dtype, encoding='utf-8',
+                         comments=None, autostrip=True, filling_values=filling)
+    data = np.atleast_1d(data)
+    return _from_columns({name: data[name] for name in names}, len(data))
+
+
+def save_element_catalog(catalog, path):
+    """Save a catalog as .npy (binary, fastest to load) or .csv."""
+    if path.endswith('.npy'):
+        np.save(path, np.asarray(catalog, dtype=CATALOG_DTYPE))
+        return
+    with open(path, 'w') as f:
+        f.write(','.join(CATALOG_DTYPE.names) + '\n')
+        for row in catalog:
+            f.write(','.join('' if isinstance(v, float) and np.isnan(v) else f'{v:g}' if isinstance(v, float)
+                             else str(v) for v in row.tolist()) + '\n')
+
+
+def orbit_class_mask(catalog, orbit_class):
+    """
+    Boolean mask of catalog entries in an orbit class.
+
+    Args:
+        catalog (numpy.ndarray): Element catalog
+        orbit_class (str): 'leo', 'meo', 'geo', 'deep' or 'all'
+
+    Returns:
+        numpy.ndarray: Boolean mask
+    """
+    if orbit_class == 'all':
+        return np.ones(len(catalog), dtype=bool)
+    lower, upper = ORBIT_CLASSES[orbit_class]
+    return (catalog['altitude'] > lower) & (catalog['altitude'] < upper)
+
+
+def select_orbit_class(catalog, orbit_class):
+    """Return the catalog entries in an orbit class ('leo', 'meo', 'geo', 'deep' or 'all')."""
+    return catalog[orbit_class_mask(catalog, orbit_class)]
+
+
+def is_geostationary(catalog):
+    """Return a mask of entries pinned to a fixed longitude."""
+    return np.isfinite(catalog['longitude'])
+
+
+def walker_delta(planes, per_plane, inclination, altitude, phasing=1, prefix='WALKER',
+                 color='#00BFFF', size=10.0):
+    """
+    Generate a Walker-delta constellation (i: t/p/f) as an element catalog.
+
+    Args:
+        planes (int): Number of orbit planes p, spread evenly in RAAN over 360 deg
+        per_plane (int): Satellites per plane (t = planes * per_plane)
+        inclination (float): Inclination in degrees
+        altitude (float): Altitude in km
+        phasing (int): Walker phasing factor f; plane j is shifted by
+                       360 * f * j / t deg in argument of latitude (default: 1)
+        prefix (str): ID prefix; entries are named PREFIX-PLANE-SLOT
+        color (str): Marker color for every entry
+        size (float): Marker size for every entry
+
+    Returns:
+        numpy.ndarray: Element catalog with planes * per_plane entries; the
+                       period is the circular-orbit period in minutes
+    """
+    total = planes * per_plane
+    plane, slot = np.divmod(np.arange(total), per_plane)
+    catalog = np.zeros(total, dtype=CATALOG_DTYPE)
+    catalog['id'] = np.char.add(f'{prefix}-', np.char.add(np.char.zfill(plane.astype(str), 3),
+                                                          np.char.add('-', np.char.zfill(slot.astype(str), 3))))
+    catalog['altitude'] = altitude
+    catalog['inclination'] = inclination
+    catalog['period'] = 2 * np.pi * np.sqrt((EARTH_RADIUS_KM + altitude)**3 / EARTH_MU_KM3_S2) / 60
+    catalog['phase'] = 2 * np.pi * (slot / per_plane + phasing * plane / total)
+    catalog['longitude'] = np.nan
+    catalog['color'] = color
+    catalog['size'] = size
+    catalog['raan'] = 360.0 * plane / planes
+    return catalog
+
+
+def orbit_positions(catalog, angle):
+    """
+    Positions of catalog entries on their circular orbits, vectorized.
+
+    The orbit plane is tilted by the inclination and then rotated about the
+    pole by the RAAN. Geostationary entries stay at their fixed longitude.
+
+    Args:
+        catalog (numpy.ndarray): Element catalog, shape (n,) (or a broadcastable view)
+        angle (array): Argument of latitude in radians, broadcastable against
+                       the catalog (e.g. (n,) for one instant or (n, k) for trails)
+
+    Returns:
+        tuple: (x, y, z) arrays in km
+    """
+    radius = EARTH_RADIUS_KM + catalog['altitude']
+    inclination = np.radians(catalog['inclination'])
+    raan = np.radians(catalog['raan'])
+    cos_a = radius * np.cos(angle)
+    x0 = cos_a * np.cos(inclination)
+    y0 = radius * np.sin(angle)
+    z = cos_a * np.sin(inclination)
+    x = x0 * np.cos(raan) - y0 * np.sin(raan)
+    y = x0 * np.sin(raan) + y0 * np.cos(raan)
+
+    fixed = np.isfinite(catalog['longitude'])
+    if np.any(fixed):
+        longitude = np.radians(catalog['longitude'])
+        x = np.where(fixed, radius * np.cos(longitude), x)
+        y = np.where(fixed, radius * np.sin(longitude), y)
+        z = np.where(fixed, 0.0, z)
+    return x, y, z
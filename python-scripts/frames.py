@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Coordinate Frame Conversions
+
+Vectorized rotations between the Earth-centred frames SSC reports positions in,
+so one fetched frame (normally GEO) can be converted to the others locally
+without another request. Every function takes an (n, 3) position array and an
+(n,) array of UTC epoch seconds, builds the (n, 3, 3) rotation matrices in one
+pass and applies them with a single einsum.
+
+The Sun direction uses the low-precision Astronomical Almanac formulae
+(about 0.01 degree accuracy between 1950 and 2050) and the dipole axis uses a
+fixed IGRF-2020 pole. This is good enough for plotting and screening, but it
+will differ slightly from SSC's own GSE/GSM values.
+
+Supported frames: 'geo', 'gei' (true-of-date equatorial), 'gse', 'gsm'.
+"""
+
+import numpy as np
+
+J2000_EPOCH = 946728000.0  # 2000-01-01T12:00:00Z in UTC epoch seconds
+SECONDS_PER_DAY = 86400.0
+
+# IGRF-2020 geomagnetic north pole (geographic latitude/longitude, degrees)
+DIPOLE_POLE_LAT = 80.65
+DIPOLE_POLE_LON = -72.68
+
+FRAMES = ('geo', 'gei', 'gse', 'gsm')
+
+
+def _days_since_j2000(epochs):
+    return (np.asarray(epochs, dtype=np.float64) - J2000_EPOCH) / SECONDS_PER_DAY
+
+
+def gmst(epochs):
+    """
+    Greenwich mean sidereal time.
+
+    Args:
+        epochs (array): UTC epoch seconds
+
+    Returns:
+        numpy.ndarray: GMST angle in radians, in [0, 2π)
+    """
+    d = _days_since_j2000(epochs)
+    return np.radians((280.46061837 + 360.98564736629 * d) % 360.0)
+
+
+def obliquity(epochs):
+    """Return the mean obliquity of the ecliptic in radians."""
+    return np.radians(23.439 - 4.0e-7 * _days_since_j2000(epochs))
+
+
+def sun_direction_gei(epochs):
+    """
+    Unit vector from Earth to the Sun in the equatorial (GEI) frame.
+
+    Args:
+        epochs (array): UTC epoch seconds
+
+    Returns:
+        numpy.ndarray: (n, 3) unit vectors
+    """
+    d = _days_since_j2000(epochs)
+    mean_longitude = np.radians((280.460 + 0.9856474 * d) % 360.0)
+    mean_anomaly = np.radians((357.528 + 0.9856003 * d) % 360.0)
+    ecliptic_longitude = (mean_longitude + np.radians(1.915) * np.sin(mean_anomaly)
+                          + np.radians(0.020) * np.sin(2 * mean_anomaly))
+    eps = obliquity(epochs)
+    return np.stack([
+        np.cos(ecliptic_longitude),
+        np.cos(eps) * np.sin(ecliptic_longitude),
+        np.sin(eps) * np.sin(ecliptic_longitude),
+    ], axis=-1)
+
+
+def sun_distance_km(epochs):
+    """Return the Earth-Sun distance in km."""
+    mean_anomaly = np.radians((357.528 + 0.9856003 * _days_since_j2000(epochs)) % 360.0)
+    au = 1.00014 - 0.01671 * np.cos(mean_anomaly) - 0.00014 * np.cos(2 * mean_anomaly)
+    return au * 149597870.7
+
+
+def _apply(matrices, xyz):
+    return np.einsum('nij,nj->ni', matrices, np.asarray(xyz, dtype=np.float64))
+
+
+def _geo_to_gei_matrices(epochs):
+    theta = gmst(epochs)
+    c, s = np.cos(theta), np.sin(theta)
+    m = np.zeros((len(theta), 3, 3))
+    m[:, 0, 0], m[:, 0, 1] = c, -s
+    m[:, 1, 0], m[:, 1, 1] = s, c
+    m[:, 2, 2] = 1.0
+    return m
+
+
+def _gei_to_gse_matrices(epochs):
+    x_axis = sun_direction_gei(epochs)
+    eps = obliquity(epochs)
+    z_axis = np.stack([np.zeros_like(eps), -np.sin(eps), np.cos(eps)], axis=-1)
+    y_axis = np.cross(z_axis, x_axis)
+    return np.stack([x_axis, y_axis, z_axis], axis=1)
+
+
+def dipole_axis_geo():
+    """Return the unit dipole (geomagnetic north) axis in GEO."""
+    lat, lon = np.radians(DIPOLE_POLE_LAT), np.radians(DIPOLE_POLE_LON)
+    return np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _gse_to_gsm_matrices(epochs):
+    dipole_gei = _apply(_geo_to_gei_matrices(epochs), np.tile(dipole_axis_geo(), (len(epochs), 1)))
+    dipole_gse = _apply(_gei_to_gse_matrices(epochs), dipole_gei)
+    psi = np.arctan2(dipole_gse[:, 1], dipole_gse[:, 2])
+    c, s = np.cos(psi), np.sin(psi)
+    m = np.zeros((len(psi), 3, 3))
+    m[:, 0, 0] = 1.0
+    m[:, 1, 1], m[:, 1, 2] = c, -s
+    m[:, 2, 1], m[:, 2, 2] = s, c
+    return m
+
+
+def geo_to_frame_matrices(frame, epochs):
+    """
+    Build rotation matrices taking GEO vectors into another frame.
+
+    Args:
+        frame (str): Target frame ('geo', 'gei', 'gse' or 'gsm')
+        epochs (array): UTC epoch seconds, one per vector
+
+    Returns:
+        numpy.ndarray: (n, 3, 3) rotation matrices
+    """
+    epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+    if frame == 'geo':
+        return np.broadcast_to(np.eye(3), (len(epochs), 3, 3))
+    m = _geo_to_gei_matrices(epochs)
+    if frame == 'gei':
+        return m
+    m = np.matmul(_gei_to_gse_matrices(epochs), m)
+    if frame == 'gse':
+        return m
+    if frame == 'gsm':
+        return np.matmul(_gse_to_gsm_matrices(epochs), m)
+    raise ValueError(f"Unsupported frame: {frame} (choose from {', '.join(FRAMES)})")
+
+
+def convert(xyz, epochs, from_frame, to_frame):
+    """
+    Rotate position vectors between frames.
+
+    Args:
+        xyz (array): (n, 3) positions in from_frame
+        epochs (array): (n,) UTC epoch seconds
+        from_frame (str): Source frame
+        to_frame (str): Target frame
+
+    Returns:
+        numpy.ndarray: (n, 3) positions in to_frame
+    """
+    if from_frame == to_frame:
+        return np.array(xyz, dtype=np.float64)
+    to_geo = np.transpose(geo_to_frame_matrices(from_frame, epochs), (0, 2, 1))
+    return _apply(np.matmul(geo_to_frame_matrices(to_frame, epochs), to_geo), xyz)
+
+
+def lat_lon(xyz):
+    """Return (latitude, longitude) in degrees for (n, 3) vectors, longitude in [0, 360)."""
+    xyz = np.asarray(xyz, dtype=np.float64)
+    r = np.linalg.norm(xyz, axis=-1)
+    lat = np.degrees(np.arcsin(np.clip(xyz[:, 2] / np.where(r == 0, 1, r), -1, 1)))
+    lon = np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0])) % 360
+    return lat, lon
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Hybrid SSC-Anchored Propagation
+
+Keeps displayed positions current between sparse SSC fetches. For every
+satellite, a two-body state is fitted to its latest SSC samples and then
+propagated locally to the display time. A satellite is refetched (and
+re-anchored) only when its predicted error passes a threshold.
+
+- Anchor: the velocity at the newest sample is solved by shooting so that a
+  two-body arc through the newest sample also passes through the one before
+  it (a few vectorized Newton steps with the f and g functions). Fitting is
+  done in the inertial GEI frame, where orbits really are close to conics.
+- Propagate: universal-variable Kepler propagation, vectorized over all
+  satellites, so elliptic, near-parabolic and hyperbolic states share one path.
+- Error model: the anchored arc is also propagated back to a third, older
+  sample. The miss distance there shows how far the real motion departs from
+  two-body (drag, J2, third bodies, interpolation). The arc is pinned at both
+  anchor samples, so the error behaves like k * t * (t + gap), where t is the
+  time since the newest sample and gap is the spacing of the two anchor
+  samples. k is calibrated from that miss distance.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from frames import convert as convert_frame
+from frames import lat_lon
+from satellite_tracker import EARTH_MU_KM3_S2, EARTH_RADIUS_KM, fetch_satellite_positions, times_to_epoch_seconds
+
+DEFAULT_THRESHOLD_KM = 1.0
+DEFAULT_MAX_AGE_S = 1800.0
+DEFAULT_RETRY_S = 60.0
+_SHOOTING_STEPS = 4
+
+
+def _stumpff(z):
+    """Return Stumpff functions C(z) and S(z), with series near zero."""
+    c = np.empty_like(z)
+    s = np.empty_like(z)
+    pos, neg = z > 1e-6, z < -1e-6
+    small = ~(pos | neg)
+    sq = np.sqrt(z[pos])
+    c[pos] = (1 - np.cos(sq)) / z[pos]
+    s[pos] = (sq - np.sin(sq)) / sq**3
+    sq = np.sqrt(-z[neg])
+    c[neg] = (np.cosh(sq) - 1) / -z[neg]
+    s[neg] = (np.sinh(sq) - sq) / sq**3
+    c[small] = 1 / 2 - z[small] / 24
+    s[small] = 1 / 6 - z[small] / 120
+    return c, s
+
+
+def kepler_propagate(r0, v0, dt, mu=EARTH_MU_KM3_S2, iterations=30):
+    """
+    Two-body propagation with universal variables.
+
+    Args:
+        r0 (array): (n, 3) positions in km (inertial frame)
+        v0 (array): (n, 3) velocities in km/s
+        dt (array): (n,) or scalar time offsets in seconds (may be negative)
+        mu (float): Gravitational parameter in km^3/s^2
+        iterations (int): Newton iterations for the universal anomaly
+
+    Returns:
+        tuple: ((n, 3) positions, (n, 3) velocities) after dt
+    """
+    r0 = np.asarray(r0, dtype=np.float64)
+    v0 = np.asarray(v0, dtype=np.float64)
+    dt = np.broadcast_to(np.asarray(dt, dtype=np.float64), r0.shape[:1])
+    r0n = np.linalg.norm(r0, axis=1)
+    vr0 = np.einsum('ni,ni->n', r0, v0) / r0n
+    alpha = 2 / r0n - np.einsum('ni,ni->n', v0, v0) / mu
+    sqrt_mu = np.sqrt(mu)
+
+    # Newton iteration for the universal anomaly chi
+    chi = sqrt_mu * np.abs(alpha) * dt
+    for _ in range(iterations):
+        z = alpha * chi**2
+        c, s = _stumpff(z)
+        f = (r0n * vr0 / sqrt_mu * chi**2 * c + (1 - alpha * r0n) * chi**3 * s
+             + r0n * chi - sqrt_mu * dt)
+        df = (r0n * vr0 / sqrt_mu * chi * (1 - z * s) + (1 - alpha * r0n) * chi**2 * c + r0n)
+        step = f / df
+        chi = chi - step
+        if np.all(np.abs(step) < 1e-10):
+            break
+
+    z = alpha * chi**2
+    c, s = _stumpff(z)
+    f = 1 - chi**2 / r0n * c
+    g = dt - chi**3 / sqrt_mu * s
+    r = f[:, None] * r0 + g[:, None] * v0
+    rn = np.linalg.norm(r, axis=1)
+    fdot = sqrt_mu / (rn * r0n) * (alpha * chi**3 * s - chi)
+    gdot = 1 - chi**2 / rn * c
+    v = fdot[:, None] * r0 + gdot[:, None] * v0
+    return r, v
+
+
+def fit_anchor(epochs, gei):
+    """
+    Fit two-body states to the newest samples of each satellite.
+
+    Args:
+        epochs (array): (n, 3) epoch seconds of the three newest samples, oldest first
+        gei (array): (n, 3, 3) matching GEI positions in km
+
+    Returns:
+        tuple: ((n, 3) position and (n, 3) velocity at the newest sample,
+                (n,) error growth coefficient k in km/s^2 (see module docstring),
+                (n,) spacing of the two newest samples in seconds)
+    """
+    r2 = gei[:, 2]
+    h = epochs[:, 1] - epochs[:, 2]  # negative: back to the previous sample
+    v2 = (gei[:, 2] - gei[:, 1]) / -h[:, None]
+
+    # Shooting: correct v2 until the back-propagated arc hits the previous sample
+    for _ in range(_SHOOTING_STEPS):
+        r1_pred, _ = kepler_propagate(r2, v2, h)
+        r2n = np.linalg.norm(r2, axis=1)
+        g = h - EARTH_MU_KM3_S2 * h**3 / (6 * r2n**3)
+        v2 = v2 + (gei[:, 1] - r1_pred) / g[:, None]
+
+    horizon = epochs[:, 0] - epochs[:, 2]
+    r0_pred, _ = kepler_propagate(r2, v2, horizon)
+    residual = np.linalg.norm(r0_pred - gei[:, 0], axis=1)
+    growth = residual / np.maximum(horizon * (horizon - h), 1.0)
+    return r2, v2, growth, -h
+
+
+class HybridTracker:
+    """
+    Display-rate positions from locally propagated, SSC-anchored states.
+
+    Args:
+        satellite_ids (list): Satellite IDs to track
+        time_window_hours (float): Track window fetched for trails and anchoring (default: 1)
+        client: SSC client (default: None, the shared client)
+        threshold_km (float): Refetch a satellite once its predicted error exceeds this
+        max_age_s (float): Refetch a satellite at least this often regardless of error
+    """
+
+    def __init__(self, satellite_ids, time_window_hours=1, client=None,
+                 threshold_km=DEFAULT_THRESHOLD_KM, max_age_s=DEFAULT_MAX_AGE_S):
+        self.satellite_ids = list(satellite_ids)
+        self.time_window_hours = time_window_hours
+        self.client = client
+        self.threshold_km = threshold_km
+        self.max_age_s = max_age_s
+        self.tracks = {}
+        self.ids = []
+        self.anchor_epoch = np.zeros(0)
+        self.r = np.zeros((0, 3))
+        self.v = np.zeros((0, 3))
+        self.growth = np.zeros(0)
+        self.gap = np.zeros(0)
+        self.fetch_calls = 0
+        self.fetched_satellites = 0
+        self._attempted = {}
+
+    def _anchor(self):
+        """Refit anchors for every track with at least three samples."""
+        sats = [sat for sat in self.tracks.values() if len(sat['times']) >= 3]
+        self.ids = [sat['id'] for sat in sats]
+        if not sats:
+            return
+        epochs = np.array([times_to_epoch_seconds(sat['times'][-3:]) for sat in sats])
+        geo = np.array([np.column_stack([sat['x'][-3:], sat['y'][-3:], sat['z'][-3:]]) for sat in sats])
+        gei = convert_frame(geo.reshape(-1, 3), epochs.reshape(-1), 'geo', 'gei').reshape(-1, 3, 3)
+        self.r, self.v, self.growth, self.gap = fit_anchor(epochs, gei)
+        self.anchor_epoch = epochs[:, 2]
+
+    def predicted_error(self, now):
+        """Return the predicted position error in km of every anchored satellite at epoch now."""
+        age = np.abs(now - self.anchor_epoch)
+        return self.growth * age * (age + self.gap)
+
+    def due(self, now):
+        """
+        Return IDs that need a refetch.
+
+        A satellite is due when it has no anchor yet (retried at most every
+        DEFAULT_RETRY_S), or when its predicted error exceeds the threshold or
+        its anchor is older than max_age_s. In the latter cases it must also
+        be at least one sample spacing since the anchor, so that SSC has a
+        newer sample to return.
+        """
+        anchored = set(self.ids)
+        age = now - self.anchor_epoch
+        stale = ((self.predicted_error(now) > self.threshold_km) | (age > self.max_age_s)) & (age >= self.gap)
+        missing = [sat_id for sat_id in self.satellite_ids
+                   if sat_id not in anchored and now - self._attempted.get(sat_id, -np.inf) >= DEFAULT_RETRY_S]
+        return missing + [sat_id for sat_id, is_stale in zip(self.ids, stale) if is_stale]
+
+    def refresh(self, now):
+        """
+        Refetch and re-anchor only the satellites that are due.
+
+        Returns:
+            list: IDs that were refetched
+        """
+        due = self.due(now)
+        if due:
+            self._attempted.update(dict.fromkeys(due, now))
+            fetched = fetch_satellite_positions(due, self.time_window_hours, self.client,
+                                                raise_errors=True, verbose=False)
+            self.fetch_calls += 1
+            self.fetched_satellites += len(due)
+            for sat in fetched:
+                self.tracks[sat['id']] = sat
+            self._anchor()
+        return due
+
+    def positions(self, now):
+        """
+        Propagate every anchor to epoch now.
+
+        Returns:
+            tuple: (ids, (n, 3) GEO positions in km, (n,) predicted error in km)
+        """
+        if not self.ids:
+            return [], np.zeros((0, 3)), np.zeros(0)
+        gei, _ = kepler_propagate(self.r, self.v, now - self.anchor_epoch)
+        geo = convert_frame(gei, np.full(len(gei), now), 'gei', 'geo')
+        return list(self.ids), geo, self.predicted_error(now)
+
+    def current_tracks(self, now):
+        """
+        Refresh what is due, then return tracks ending at the propagated position for now.
+
+        Returns:
+            list: Satellite data dictionaries in fetch_satellite_positions() layout
+                  (GEO only), each extended by one predicted sample at now
+        """
+        self.refresh(now)
+        ids, geo, _ = self.positions(now)
+        lat, lon = lat_lon(geo)
+        alt = np.linalg.norm(geo, axis=1) - EARTH_RADIUS_KM
+        stamp = datetime.fromtimestamp(now, timezone.utc)
+
+        tracks = []
+        for idx, sat_id in enumerate(ids):
+            sat = self.tracks[sat_id]
+            track = {
+                'id': sat_id,
+                'latitudes': np.append(sat['latitudes'], lat[idx]),
+                'longitudes': np.append(sat['longitudes'], lon[idx]),
+                'altitudes': np.append(sat['altitudes'], alt[idx]),
+                'x': np.append(sat['x'], geo[idx, 0]),
+                'y': np.append(sat['y'], geo[idx, 1]),
+                'z': np.append(sat['z'], geo[idx, 2]),
+                'times': list(sat['times']) + [stamp],
+            }
+            track['coordinates'] = {'geo': {'x': track['x'], 'y': track['y'], 'z': track['z']}}
+            tracks.append(track)
+        return tracks
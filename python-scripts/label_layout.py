@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Screen-Space Label Decluttering
+
+Text with a bbox is one of the most expensive things matplotlib draws, and
+with hundreds of satellites the labels overlap into an unreadable blob. This
+module decides which labels to draw before any text artist is rendered:
+
+1. Label anchors are projected to screen pixels (2D map or 3D axes).
+2. Label boxes are sized from the text length and font size (an estimate; no
+   text layout is done).
+3. Labels are placed greedily in priority order. Selected satellites come
+   first, then the closest ones (3D) or the input order (2D). A label is
+   dropped if its box overlaps one already placed or falls off the axes.
+
+Overlap tests use a uniform grid of label-sized cells. Each label is compared
+only with the labels already placed in the cells its box covers, so a label
+that clashes falls through to the next one in priority order, also within the
+same cell. The number of drawn labels, and the work per label, is therefore
+bounded by the screen area rather than the number of satellites.
+
+Anchors are projected to pixels, so decluttering has to run after anything
+that moves the axes, such as tight_layout().
+"""
+
+import numpy as np
+
+# Average glyph advance of bold DejaVu Sans capitals, as a fraction of the font size
+GLYPH_ASPECT = 0.68
+LINE_SPACING = 1.2
+DEFAULT_MARGIN_PX = 2.0
+
+
+def estimate_label_sizes(texts, fontsize, dpi, pad=0.0):
+    """
+    Estimate label box sizes in pixels without laying out any text.
+
+    Args:
+        texts (list): Label strings (may contain newlines)
+        fontsize (float): Font size in points
+        dpi (float): Figure resolution
+        pad (float): Bbox padding in multiples of the font size (as in boxstyle 'round,pad=...')
+
+    Returns:
+        numpy.ndarray: (n, 2) widths and heights in pixels
+    """
+    em = fontsize * dpi / 72.0
+    chars = np.array([max((len(line) for line in text.split('\n')), default=0) for text in texts], dtype=float)
+    lines = np.array([text.count('\n') + 1 for text in texts], dtype=float)
+    return np.column_stack([chars * GLYPH_ASPECT * em + 2 * pad * em,
+                            lines * LINE_SPACING * em + 2 * pad * em])
+
+
+def place_labels(anchors, sizes, priority=None, origin=(0.0, 0.0), offset=(0.0, 0.0), bounds=None,
+                 margin=DEFAULT_MARGIN_PX):
+    """
+    Choose non-overlapping labels by greedy priority placement on a uniform grid.
+
+    Args:
+        anchors (array): (n, 2) anchor positions in pixels
+        sizes (array): (n, 2) label box widths and heights in pixels
+        priority (array): (n,) higher is placed first (default: input order)
+        origin (tuple): Point of the box at the anchor, as fractions of its width
+                        and height ((0, 0) lower left, (0.5, 0) bottom centre)
+        offset (tuple): Shift of the box from the anchor in pixels
+        bounds (tuple): (x0, y0, x1, y1) screen area labels must lie within (default: no limit)
+        margin (float): Minimum gap between boxes in pixels
+
+    Returns:
+        numpy.ndarray: Indices of the labels to draw, highest priority first
+    """
+    anchors = np.asarray(anchors, dtype=float).reshape(-1, 2)
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+    if len(anchors) == 0:
+        return np.zeros(0, dtype=int)
+    lo = anchors + np.asarray(offset, dtype=float) - sizes * np.asarray(origin, dtype=float) - margin / 2
+    hi = lo + sizes + margin
+
+    valid = np.isfinite(lo).all(axis=1) & np.isfinite(hi).all(axis=1)
+    if bounds is not None:
+        x0, y0, x1, y1 = bounds
+        valid &= (lo[:, 0] >= x0) & (lo[:, 1] >= y0) & (hi[:, 0] <= x1) & (hi[:, 1] <= y1)
+    if priority is None:
+        priority = -np.arange(len(anchors), dtype=float)
+    order = np.flatnonzero(valid)
+    order = order[np.argsort(-np.asarray(priority, dtype=float)[order], kind='stable')]
+    if len(order) == 0:
+        return order
+
+    # Uniform grid of typical label size
+    cell = np.maximum(np.median(hi[order] - lo[order], axis=0), 1.0)
+    lo_cell = np.floor(lo / cell).astype(np.int64)
+    hi_cell = np.floor(hi / cell).astype(np.int64)
+    center = np.floor((lo + hi) / 2 / cell).astype(np.int64)
+    center_keys = (center[:, 0] * 1_000_003 + center[:, 1]).tolist()
+    # Two boxes at least a cell wide and high whose centres share a cell always
+    # overlap, so once such a label is placed the rest of its cell can be skipped
+    full_size = (hi - lo >= cell).all(axis=1).tolist()
+    bx0, by0, bx1, by1 = (column.tolist() for column in (lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1]))
+    cx0, cy0, cx1, cy1 = (column.tolist() for column in (lo_cell[:, 0], lo_cell[:, 1],
+                                                         hi_cell[:, 0], hi_cell[:, 1]))
+
+    # Greedy exact placement against labels already in the covered cells; a
+    # label that clashes falls through to the next one, also in the same cell
+    occupied = {}
+    settled = set()
+    placed = []
+    for idx in order.tolist():
+        if full_size[idx] and center_keys[idx] in settled:
+            continue
+        x0, y0, x1, y1 = bx0[idx], by0[idx], bx1[idx], by1[idx]
+        cells = [(cx, cy) for cx in range(cx0[idx], cx1[idx] + 1) for cy in range(cy0[idx], cy1[idx] + 1)]
+        clash = False
+        for key in cells:
+            for other in occupied.get(key, ()):
+                if x0 < bx1[other] and bx0[other] < x1 and y0 < by1[other] and by0[other] < y1:
+                    clash = True
+                    break
+            if clash:
+                break
+        if clash:
+            continue
+        for key in cells:
+            occupied.setdefault(key, []).append(idx)
+        if full_size[idx]:
+            settled.add(center_keys[idx])
+        placed.append(idx)
+    return np.array(placed, dtype=int)
+
+
+def selection_priority(ids, selected=None, base=None):
+    """
+    Combine a base priority with a boost for selected satellites.
+
+    Args:
+        ids (list): Satellite IDs, one per label
+        selected (list): IDs whose labels are placed before all others (default: none)
+        base (array): Priority among the rest, higher first (default: input order)
+
+    Returns:
+        numpy.ndarray: (n,) priorities for place_labels()
+    """
+    base = -np.arange(len(ids), dtype=float) if base is None else np.asarray(base, dtype=float)
+    if not selected:
+        return base
+    chosen = {str(sat_id).lower() for sat_id in selected}
+    boost = np.array([str(sat_id).lower() in chosen for sat_id in ids], dtype=float)
+    return base + boost * (np.ptp(base) + 1 if len(base) else 1)
+
+
+def axes_bounds(ax):
+    """Return the axes area in pixels as (x0, y0, x1, y1)."""
+    box = ax.get_window_extent()
+    return box.x0, box.y0, box.x1, box.y1
+
+
+def project_2d(ax, lon, lat):
+    """
+    Project longitudes/latitudes on a cartopy map to screen pixels.
+
+    Returns:
+        numpy.ndarray: (n, 2) pixel positions
+    """
+    import cartopy.crs as ccrs
+
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    projected = ax.projection.transform_points(ccrs.PlateCarree(), lon, lat)[:, :2]
+    return ax.transData.transform(projected)
+
+
+def project_3d(ax, x, y, z):
+    """
+    Project data points on 3D axes to screen pixels.
+
+    Returns:
+        tuple: ((n, 2) pixel positions, (n,) depth; smaller is closer to the viewer)
+    """
+    from mpl_toolkits.mplot3d import proj3d
+
+    ax.apply_aspect()
+    px, py, depth = proj3d.proj_transform(np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+                                          np.asarray(z, dtype=float), ax.get_proj())
+    return ax.transData.transform(np.column_stack([px, py])), np.asarray(depth)
+
+
+def declutter_3d(ax, texts, ids=None, selected=None, fontsize=None, pad=0.0, origin=(0.5, 0.0)):
+    """
+    Show only the 3D text labels that fit at the current view.
+
+    Labels of selected satellites are placed first, then the closest ones.
+    Dropped labels are hidden rather than removed, so calling this again
+    after the view changes (see connect_declutter_3d()) brings them back.
+
+    Args:
+        ax: matplotlib 3D axes object
+        texts (list): Text3D artists to declutter
+        ids (list): Satellite ID per label, for the selected boost (default: the label text)
+        selected (list): IDs whose labels are placed before all others (default: none)
+        fontsize (float): Font size in points (default: that of the first text)
+        pad (float): Bbox padding in multiples of the font size
+        origin (tuple): Box point at the anchor (see place_labels())
+
+    Returns:
+        int: Number of labels shown
+    """
+    if not texts:
+        return 0
+    xyz = np.array([text.get_position_3d() for text in texts])
+    anchors, depth = project_3d(ax, xyz[:, 0], xyz[:, 1], xyz[:, 2])
+    strings = [text.get_text() for text in texts]
+    sizes = estimate_label_sizes(strings, fontsize or texts[0].get_fontsize(), ax.figure.dpi, pad)
+    priority = selection_priority(ids if ids is not None else strings, selected, -depth)
+    keep = np.zeros(len(texts), dtype=bool)
+    keep[place_labels(anchors, sizes, priority, origin=origin, bounds=axes_bounds(ax))] = True
+    for text, visible in zip(texts, keep):
+        text.set_visible(visible)
+    return int(keep.sum())
+
+
+def declutter_sprite(renderer, texts, points, ids=None, selected=None, fontsize=None, pad=0.0,
+                     offset_px=6.0):
+    """
+    Place text labels over a sprite_renderer image, showing only those that fit.
+
+    The texts live in the data coordinates (image pixels, y downwards) of
+    an imshow that shows one image pixel per screen pixel at 100 dpi (see
+    sprite_renderer.SpriteView). Labels of satellites behind the
+    Earth or outside the image are hidden.
+
+    Args:
+        renderer (SpriteRenderer): Renderer whose current camera made the image
+        texts (list): Text artists, one per point
+        points (array): (n, 3) labelled positions in km
+        ids (list): Satellite ID per label, for the selected boost (default: the label text)
+        selected (list): IDs whose labels are placed before all others (default: none)
+        fontsize (float): Font size in points (default: that of the first text)
+        pad (float): Bbox padding in multiples of the font size
+        offset_px (float): Gap between the point and the bottom of its label
+
+    Returns:
+        int: Number of labels shown
+    """
+    if not texts:
+        return 0
+    pixels, depth, shown = renderer.screen_positions(points)
+    anchors = np.column_stack([pixels[:, 0], renderer.height - pixels[:, 1]])
+    strings = [text.get_text() for text in texts]
+    sizes = estimate_label_sizes(strings, fontsize or texts[0].get_fontsize(), 100.0, pad)
+    priority = selection_priority(ids if ids is not None else strings, selected, -depth)
+    keep = np.zeros(len(texts), dtype=bool)
+    index = np.flatnonzero(shown)
+    keep[index[place_labels(anchors[index], sizes[index], priority[index], origin=(0.5, 0.0),
+                            offset=(0.0, offset_px), bounds=(0, 0, renderer.width, renderer.height))]] = True
+    for text, (x, y), visible in zip(texts, pixels, keep):
+        text.set_visible(visible)
+        if visible:
+            text.set_position((x, y - offset_px))
+    return int(keep.sum())
+
+
+def sprite_labels(ax, strings, colors, fontsize=8, pad=0.2):
+    """
+    Create hidden satellite labels for declutter_sprite() to place.
+
+    Args:
+        ax: matplotlib axes showing the sprite image
+        strings (list): Label text per satellite
+        colors (list): Bbox colour per label
+        fontsize (float): Font size in points (default: 8)
+        pad (float): Bbox padding in multiples of the font size; pass the same
+                     value to declutter_sprite() (default: 0.2)
+
+    Returns:
+        list: Text artists, one per string
+    """
+    return [ax.text(0, 0, string, fontsize=fontsize, fontweight='bold', color='white',
+                    ha='center', va='bottom', visible=False,
+                    bbox=dict(boxstyle=f'round,pad={pad}', facecolor=color, alpha=0.8,
+                              edgecolor='white', linewidth=1))
+            for string, color in zip(strings, colors)]
+
+
+def connect_declutter_3d(ax, texts, **kwargs):
+    """
+    Declutter 3D labels now and again whenever the user finishes rotating or zooming.
+
+    Args:
+        ax: matplotlib 3D axes object
+        texts (list): Text3D artists to declutter
+        **kwargs: Passed to declutter_3d()
+
+    Returns:
+        int: Callback connection id
+    """
+    declutter_3d(ax, texts, **kwargs)
+
+    def on_release(event):
+        if event.inaxes is ax or event.name == 'scroll_event':
+            declutter_3d(ax, texts, **kwargs)
+            ax.figure.canvas.draw_idle()
+
+    ax.figure.canvas.mpl_connect('scroll_event', on_release)
+    return ax.figure.canvas.mpl_connect('button_release_event', on_release)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Memory Accounting and Budgeted Fetching
+
+Two tools for large requests such as `--satellites all` over a long window:
+
+- MemoryReport records, with tracemalloc, how much Python and NumPy heap
+  each stage of a run leaves allocated and how high it peaked while the
+  stage ran, plus the source lines holding the most memory at the end.
+- plan_fetch() estimates a request's size from the satellite count, each
+  satellite's catalog resolution and the number of columns kept per sample.
+  When the estimate exceeds a budget, the request is split into chunks of
+  whole satellites (and into time slices for a satellite too large on its
+  own). The chunks are fetched one at a time, and each is processed and
+  released before the next arrives. A TrackReducer keeps each satellite's
+  latest sample exactly, plus an evenly thinned copy of its track for the
+  stages that need whole windows (plots, conjunctions, snapshots).
+
+Usage:
+    report = MemoryReport()
+    satellite_data = fetch_satellite_positions(...)
+    report.checkpoint('fetch')
+    report.print_report()
+
+    plan = plan_fetch(satellite_ids, 24 * 30, parse_size('500M'))
+    reducer = TrackReducer(plan)
+    for chunk in plan.fetch():
+        ...                      # per-chunk processing
+        reducer.add(chunk)
+    satellite_data = reducer.tracks()
+"""
+
+import math
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from satellite_tracker import DEFAULT_RESOLUTION_S, catalog_resolutions, fetch_satellite_positions
+
+TIME_BYTES = 56  # One datetime object plus its list slot
+COLUMN_BYTES = 8  # float64
+TRACK_COLUMNS = 6  # latitudes, longitudes, altitudes, x, y, z
+FRAME_COLUMNS = 3  # x, y, z of each extra coordinate frame
+RESPONSE_FACTOR = 2.0  # The client's decoded response is alive while the tracks are built
+CHUNK_SHARE = 0.4  # Budget share for the chunk being fetched and processed
+RETAINED_SHARE = 0.25  # Budget share for the thinned tracks kept across chunks
+MIN_KEEP = 2
+_SIZE_UNITS = {'': 1e6, 'B': 1, 'K': 1e3, 'KB': 1e3, 'M': 1e6, 'MB': 1e6, 'G': 1e9, 'GB': 1e9}
+
+
+def parse_size(text):
+    """
+    Parse a memory size such as '500M', '2G' or '1.5GB' into bytes.
+
+    A plain number is read as megabytes. Units are decimal (1M = 10^6 bytes).
+    """
+    match = re.fullmatch(r'(\d+(?:\.\d*)?)\s*([KMG]?B?)', str(text).strip().upper())
+    if match is None:
+        raise ValueError(f"Invalid memory size: {text!r} (use e.g. 500M or 2G)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_bytes(count):
+    """Return a byte count as a short decimal string (e.g. '12.3 MB')."""
+    for unit, scale in (('GB', 1e9), ('MB', 1e6), ('kB', 1e3)):
+        if abs(count) >= scale:
+            return f"{count / scale:.1f} {unit}"
+    return f"{count:.0f} B"
+
+
+def sample_bytes(frames=1, extra_columns=0):
+    """Return the estimated bytes held per fetched sample with the given frames and columns."""
+    columns = TRACK_COLUMNS + FRAME_COLUMNS * (frames - 1) + extra_columns
+    return TIME_BYTES + COLUMN_BYTES * columns
+
+
+class MemoryReport:
+    """
+    Per-stage heap accounting with tracemalloc.
+
+    Call checkpoint(name) after each stage; the stage's row holds the memory
+    still allocated after it, the change since the previous checkpoint and
+    the peak reached while it ran. tracemalloc slows allocation-heavy code
+    down, so a disabled report does nothing at all.
+
+    Args:
+        enabled (bool): Trace allocations (default: True)
+        frames (int): Stack frames stored per allocation (default: 1)
+    """
+
+    def __init__(self, enabled=True, frames=1):
+        self.enabled = enabled
+        self.stages = []
+        if not enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        tracemalloc.reset_peak()
+        self._previous = tracemalloc.get_traced_memory()[0]
+        self._baseline = self._previous
+        self._started = time.perf_counter()
+
+    def checkpoint(self, name):
+        """Close the current stage under name and start the next one."""
+        if not self.enabled:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        now = time.perf_counter()
+        self.stages.append({'stage': name, 'current': current - self._baseline,
+                            'change': current - self._previous, 'peak': peak - self._baseline,
+                            'seconds': now - self._started})
+        tracemalloc.reset_peak()
+        self._previous = current
+        self._started = now
+
+    def print_report(self, stream=None, top=5):
+        """
+        Print the stage table and the top allocation sites, then stop tracing.
+
+        Args:
+            stream: Text stream to write to (default: sys.stdout)
+            top (int): Source lines to list by memory still allocated (default: 5)
+        """
+        if not self.enabled:
+            return
+        stream = sys.stdout if stream is None else stream
+        lines = ["\nMemory by stage (tracemalloc, relative to the start):",
+                 f"  {'Stage':<24} {'Held after':>12} {'Change':>12} {'Peak during':>12} {'Time':>8}"]
+        for row in self.stages:
+            lines.append(f"  {row['stage']:<24} {format_bytes(row['current']):>12} "
+                         f"{format_bytes(row['change']):>12} {format_bytes(row['peak']):>12} "
+                         f"{row['seconds']:7.2f}s")
+        if tracemalloc.is_tracing():
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:top]
+            if statistics:
+                lines.append("  Largest allocation sites still held:")
+                for stat in statistics:
+                    frame = stat.traceback[0]
+                    lines.append(f"    {format_bytes(stat.size):>10}  {frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}")
+            tracemalloc.stop()
+        stream.write("\n".join(lines) + "\n")
+
+
+class FetchPlan:
+    """
+    Chunked fetch of one time window within a memory budget.
+
+    Built by plan_fetch(). Attributes: estimate (bytes for a single fetch),
+    budget, streaming (True when the estimate exceeds the budget), chunks
+    ((satellite IDs, start, end) per fetch, naive UTC), samples (expected
+    samples by satellite ID) and keep_samples (samples per satellite the
+    TrackReducer keeps).
+    """
+
+    def __init__(self, estimate, budget, chunks, samples, keep_samples, client=None, frames=1):
+        self.estimate = estimate
+        self.budget = budget
+        self.streaming = estimate > budget
+        self.chunks = chunks
+        self.samples = samples
+        self.keep_samples = keep_samples
+        self.client = client
+        self.frames = frames
+
+    def fetch(self, coords=('geo',), derive_coords=False, log=None):
+        """Yield the satellite data of each chunk in turn (see fetch_satellite_positions())."""
+        for satellite_ids, start, end in self.chunks:
+            yield fetch_satellite_positions(satellite_ids, client=self.client, start_time=start, end_time=end,
+                                            verbose=False, coords=coords, derive_coords=derive_coords,
+                                            log=log)
+
+
+def plan_fetch(satellite_ids, time_window_hours, budget, client=None, frames=1, end_time=None,
+               resolutions=None, log=None):
+    """
+    Estimate a request's size and split it into chunks that fit a budget.
+
+    The estimate is satellites x samples x bytes per sample, with samples
+    from each satellite's catalog resolution and bytes per sample from the
+    columns kept (see sample_bytes()) times RESPONSE_FACTOR. When it
+    exceeds the budget, satellites are grouped in order into chunks of at
+    most CHUNK_SHARE of the budget. A satellite larger than that on its own
+    is fetched in consecutive time slices.
+
+    Args:
+        satellite_ids (list): Satellite IDs
+        time_window_hours (float): Window length in hours, ending at end_time
+        budget (int): Memory budget in bytes
+        client: SSC client for the catalog and the chunk fetches (default: None, the shared client)
+        frames (int): Coordinate frames fetched per sample (default: 1, GEO only)
+        end_time (datetime): Naive UTC window end (default: now)
+        resolutions (dict): Resolution in seconds by satellite ID (default: read from the catalog)
+        log: Stream for catalog errors (default: None, sys.stdout)
+
+    Returns:
+        FetchPlan: The estimate and the chunks
+    """
+    end_time = datetime.utcnow().replace(microsecond=0) if end_time is None else end_time
+    start_time = end_time - timedelta(hours=time_window_hours)
+    if resolutions is None:
+        resolutions = catalog_resolutions(client, log)
+    window_s = time_window_hours * 3600
+    samples = {sat_id: int(window_s // resolutions.get(sat_id, DEFAULT_RESOLUTION_S)) + 1
+               for sat_id in satellite_ids}
+    per_sample = sample_bytes(frames) * RESPONSE_FACTOR
+    estimate = int(sum(samples.values()) * per_sample)
+
+    kept = sample_bytes(frames, extra_columns=1)  # Room for an illumination column
+    keep_samples = max(MIN_KEEP, int(budget * RETAINED_SHARE / max(len(satellite_ids), 1) / kept))
+    if estimate <= budget:
+        return FetchPlan(estimate, budget, [(list(satellite_ids), start_time, end_time)], samples,
+                         max(samples.values(), default=MIN_KEEP), client, frames)
+
+    chunk_budget = budget * CHUNK_SHARE
+    chunks, group, group_bytes = [], [], 0.0
+    for sat_id in satellite_ids:
+        size = samples[sat_id] * per_sample
+        if size > chunk_budget:
+            # Time slices, each starting one second after the previous one ends
+            slices = math.ceil(size / chunk_budget)
+            bounds = [start_time + (end_time - start_time) * i / slices for i in range(slices + 1)]
+            chunks += [([sat_id], bounds[i] + timedelta(seconds=1 if i else 0), bounds[i + 1])
+                       for i in range(slices)]
+            continue
+        if group and group_bytes + size > chunk_budget:
+            chunks.append((group, start_time, end_time))
+            group, group_bytes = [], 0.0
+        group.append(sat_id)
+        group_bytes += size
+    if group:
+        chunks.append((group, start_time, end_time))
+    return FetchPlan(estimate, budget, chunks, samples, keep_samples, client, frames)
+
+
+def _select(value, index, count, memo):
+    """
+    Index every per-sample array (length count) in a track value, recursing into dicts.
+
+    An array reached twice (x and the GEO frame's x share one) is indexed
+    once, so the selection shares it too.
+    """
+    if isinstance(value, dict):
+        return {key: _select(item, index, count, memo) for key, item in value.items()}
+    if isinstance(value, (list, np.ndarray)) and len(value) == count:
+        if id(value) not in memo:
+            memo[id(value)] = np.asarray(value)[index]
+        return memo[id(value)]
+    return value
+
+
+def _join(pieces, memo):
+    """Concatenate the per-sample arrays of several selections of one track, keeping shared arrays shared."""
+    first = pieces[0]
+    if isinstance(first, dict):
+        return {key: _join([piece[key] for piece in pieces], memo) for key in first}
+    if isinstance(first, np.ndarray):
+        if id(first) not in memo:
+            memo[id(first)] = np.concatenate(pieces)
+        return memo[id(first)]
+    return first
+
+
+class TrackReducer:
+    """
+    Thinned copy of streamed tracks, with each satellite's latest sample exact.
+
+    Each satellite keeps every k-th sample in fetch order, with k chosen from
+    its expected sample count so about plan.keep_samples remain, plus its
+    newest sample. Every per-sample column is thinned the same way,
+    including 'coordinates' frames and an 'illumination' column added by
+    per-chunk processing.
+
+    Args:
+        plan (FetchPlan): Plan whose chunks are added
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self._pieces = {}
+        self._seen = {}
+        self._latest = {}
+
+    def add(self, satellite_data):
+        """Keep the thinned samples of one chunk's tracks."""
+        for sat in satellite_data:
+            count = len(sat['times'])
+            if count == 0:
+                continue
+            sat_id = sat['id']
+            step = max(1, math.ceil(self.plan.samples.get(sat_id, count) / self.plan.keep_samples))
+            offset = self._seen.get(sat_id, 0)
+            index = np.flatnonzero((offset + np.arange(count)) % step == 0)
+            self._pieces.setdefault(sat_id, []).append(_select(sat, index, count, {}))
+            self._latest[sat_id] = (offset + count - 1, _select(sat, [count - 1], count, {}))
+            self._seen[sat_id] = offset + count
+
+    def tracks(self):
+        """
+        Return the thinned tracks, handing them over: the reducer is empty afterwards.
+
+        Returns:
+            list: Satellite data dictionaries in the order satellites first arrived
+        """
+        satellite_data = []
+        while self._pieces:
+            sat_id = next(iter(self._pieces))
+            pieces = self._pieces.pop(sat_id)
+            position, latest = self._latest.pop(sat_id)
+            step = max(1, math.ceil(self.plan.samples.get(sat_id, self._seen[sat_id]) / self.plan.keep_samples))
+            if position % step:
+                pieces.append(latest)
+            satellite_data.append(_join(pieces, {}))
+        return satellite_data
+
+    def sample_count(self):
+        """Return the number of samples seen across all chunks."""
+        return sum(self._seen.values())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Bulk Machine-Readable Position Output
+
+Formats satellite positions as CSV, NDJSON or an aligned text table for
+piping into other tools. Either the latest position of every satellite or
+every sample is written. Rows are not formatted one at a time: times are
+rendered with np.datetime_as_string, the columns of a block of rows are
+interleaved into one flat sequence, and the whole block is formatted with a
+single %-operation on the row template repeated once per row. Each chunk is
+then one buffered write.
+
+Columns: id, time (ISO 8601 UTC), lat, lon (0-360), alt (km), x, y, z (km, GEO)
+
+Usage:
+    write_positions(satellite_data, 'csv')                       # latest, to stdout
+    write_positions(satellite_data, 'ndjson', all_samples=True)  # every sample
+"""
+
+import io
+import json
+import sys
+
+import numpy as np
+
+OUTPUT_FORMATS = ('table', 'csv', 'ndjson')
+COLUMNS = (('lat', 'latitudes', 5), ('lon', 'longitudes', 5), ('alt', 'altitudes', 3),
+           ('x', 'x', 3), ('y', 'y', 3), ('z', 'z', 3))
+CHUNK_ROWS = 1 << 16
+BLOCK_ROWS = 1 << 13  # Rows formatted by one %-operation
+TABLE_WIDTH = 12
+# Text for NaN/inf values (the table prints them right-aligned as 'nan'/'inf')
+MISSING = {'csv': '', 'ndjson': 'null'}
+
+
+def _time_strings(epochs):
+    """Render epoch seconds as ISO 8601 UTC text without the trailing 'Z' (milliseconds only if any)."""
+    millis = np.round(np.asarray(epochs, dtype=np.float64) * 1e3).astype('datetime64[ms]')
+    fractional = bool(np.any(millis.astype(np.int64) % 1000))
+    return np.datetime_as_string(millis, unit='ms' if fractional else 's')
+
+
+def _number_column(values, spec, missing):
+    """
+    Return a column for the row tuple and its %-spec.
+
+    Finite columns are formatted by the row template itself; a column with
+    NaN/inf values is pre-formatted so those values can become the missing text.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    if missing is None or finite.all():
+        return values, spec
+    text = np.array([spec % value for value in values[finite].tolist()] if finite.any() else [], dtype=object)
+    column = np.full(len(values), missing, dtype=object)
+    column[finite] = text
+    return column, '%s'
+
+
+def _gather(satellite_data, all_samples):
+    """Collect rows as (ids, epoch seconds, {column: values}), latest sample only unless all_samples."""
+    from satellite_tracker import times_to_epoch_seconds
+
+    satellites = [sat for sat in satellite_data if len(sat['times']) > 0]
+    if all_samples:
+        counts = [len(sat['times']) for sat in satellites]
+        ids = np.repeat(np.array([sat['id'] for sat in satellites], dtype=object), counts)
+        times = np.concatenate([times_to_epoch_seconds(sat['times']) for sat in satellites]) \
+            if satellites else np.zeros(0)
+        values = {name: np.concatenate([np.asarray(sat[field], dtype=np.float64) for sat in satellites])
+                  if satellites else np.zeros(0) for name, field, _ in COLUMNS}
+    else:
+        ids = np.array([sat['id'] for sat in satellites], dtype=object)
+        times = times_to_epoch_seconds([sat['times'][-1] for sat in satellites])
+        values = {name: np.array([sat[field][-1] for sat in satellites], dtype=np.float64)
+                  for name, field, _ in COLUMNS}
+    values['lon'] = np.mod(values['lon'], 360.0)
+    return ids, times, values
+
+
+def format_rows(ids, times, values, fmt, header=True):
+    """
+    Format columns as CSV, NDJSON or table rows in one pass.
+
+    Args:
+        ids (array): Satellite ID per row
+        times (array): Epoch seconds per row
+        values (dict): Float array per column name in COLUMNS
+        fmt (str): 'csv', 'ndjson' or 'table'
+        header (bool): Include the header line (CSV and table)
+
+    Returns:
+        bytes: Formatted rows, newline-terminated
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}' (expected one of {', '.join(OUTPUT_FORMATS)})")
+    names = [name for name, _, _ in COLUMNS]
+    if fmt == 'table':
+        head = f"{'ID':<15} {'TIME (UTC)':<24}" + ''.join(f" {name.upper():>{TABLE_WIDTH}}" for name in names)
+    elif fmt == 'csv':
+        head = ','.join(['id', 'time'] + names)
+    else:
+        head = None
+    head = (head + '\n').encode() if header and head else b''
+
+    rows = len(ids)
+    if rows == 0:
+        return head
+    ids = np.asarray(ids, dtype=object)
+    if fmt == 'ndjson':
+        # Escape each distinct ID once
+        unique, inverse = np.unique(ids.astype(str), return_inverse=True)
+        ids = np.array([json.dumps(sat_id)[1:-1] for sat_id in unique.tolist()], dtype=object)[inverse]
+
+    columns = [ids, _time_strings(times)]
+    specs = []
+    for name, _, decimals in COLUMNS:
+        width = TABLE_WIDTH if fmt == 'table' else ''
+        column, spec = _number_column(values[name], f'%{width}.{decimals}f', MISSING.get(fmt))
+        columns.append(column)
+        specs.append(spec)
+
+    if fmt == 'table':
+        template = '%-15s %-24s' + ''.join(' ' + spec for spec in specs) + '\n'
+        columns[1] = np.char.add(columns[1], 'Z')
+    elif fmt == 'csv':
+        template = ','.join(['%s', '%sZ'] + specs) + '\n'
+    else:
+        template = '{"id":"%s","time":"%sZ"' + ''.join(f',"{name}":{spec}' for name, spec in zip(names, specs)) + '}\n'
+
+    # Interleave the columns row by row and format the whole block at once
+    table = np.empty((rows, len(columns)), dtype=object)
+    for index, column in enumerate(columns):
+        table[:, index] = column
+    return head + ((template * rows) % tuple(table.ravel().tolist())).encode()
+
+
+def write_positions(satellite_data, fmt, all_samples=False, stream=None, header=True):
+    """
+    Write positions in a machine-readable format with buffered bulk writes.
+
+    Args:
+        satellite_data (list): Satellite data dictionaries from fetch_satellite_positions()
+        fmt (str): 'csv', 'ndjson' or 'table'
+        all_samples (bool): Write every sample instead of each satellite's latest
+        stream: Binary or text stream (default: sys.stdout)
+        header (bool): Start with the CSV or table header; False continues
+                       earlier output, e.g. when writing fetched chunks (default: True)
+
+    Returns:
+        int: Number of rows written
+    """
+    stream = stream or sys.stdout
+    target = getattr(stream, 'buffer', None)
+    if target is not None:
+        stream.flush()  # Keep ordering with text already written to the stream
+        write = target.write
+    elif isinstance(stream, io.TextIOBase):
+        target = stream
+        write = lambda data: stream.write(data.decode())
+    else:
+        target = stream
+        write = stream.write
+
+    if not all_samples:
+        chunks = [satellite_data]
+    else:
+        # Stream in chunks of whole satellites so memory stays bounded
+        chunks, chunk, rows = [], [], 0
+        for sat in satellite_data:
+            chunk.append(sat)
+            rows += len(sat['times'])
+            if rows >= CHUNK_ROWS:
+                chunks.append(chunk)
+                chunk, rows = [], 0
+        if chunk or not chunks:
+            chunks.append(chunk)
+
+    written = 0
+    for index, chunk in enumerate(chunks):
+        ids, times, values = _gather(chunk, all_samples)
+        blocks = [format_rows(ids[start:start + BLOCK_ROWS], times[start:start + BLOCK_ROWS],
+                              {name: column[start:start + BLOCK_ROWS] for name, column in values.items()},
+                              fmt, header=header and index == 0 and start == 0)
+                  for start in range(0, max(len(ids), 1), BLOCK_ROWS)]
+        write(b''.join(blocks))
+        written += len(ids)
+    target.flush()
+    return written
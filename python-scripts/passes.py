@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Ground-Station Pass Prediction
+
+Computes topocentric elevation and azimuth for every (station, satellite,
+sample) triple in one vectorized operation over the fetched GEO tracks and
+turns the above-horizon intervals into AOS/LOS pass windows.
+
+Tracks are packed into one (n_sats, n_samples, 3) array. Stations are
+processed in chunks so the (stations x satellites x samples) intermediates
+stay under a fixed memory budget.
+
+Stations can be given on the command line as NAME:LAT:LON[:ALT_KM] or loaded
+from a CSV file with name,lat,lon,alt_km columns.
+"""
+
+import csv
+
+import numpy as np
+
+from satellite_tracker import times_to_epoch_seconds
+
+# WGS-84 ellipsoid
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+DEFAULT_CHUNK_BYTES = 256 * 1024 * 1024
+
+
+def parse_station(spec):
+    """
+    Parse a NAME:LAT:LON[:ALT_KM] station specification.
+
+    Returns:
+        dict: Station with 'name', 'lat', 'lon' (degrees) and 'alt' (km)
+    """
+    parts = spec.split(':')
+    if len(parts) not in (3, 4):
+        raise ValueError(f"Station must be NAME:LAT:LON[:ALT_KM], got {spec!r}")
+    return {'name': parts[0], 'lat': float(parts[1]), 'lon': float(parts[2]),
+            'alt': float(parts[3]) if len(parts) == 4 else 0.0}
+
+
+def load_stations(path):
+    """Load stations from a CSV file with name,lat,lon[,alt_km] columns."""
+    with open(path, newline='') as f:
+        return [{'name': row['name'], 'lat': float(row['lat']), 'lon': float(row['lon']),
+                 'alt': float(row.get('alt_km') or 0.0)} for row in csv.DictReader(f)]
+
+
+def station_frames(stations):
+    """
+    Return station positions and local East-North-Up axes in GEO.
+
+    Args:
+        stations (list): Station dictionaries
+
+    Returns:
+        tuple: (positions (s, 3) km, enu (s, 3, 3) with rows east, north, up)
+    """
+    lat = np.radians([st['lat'] for st in stations])
+    lon = np.radians([st['lon'] for st in stations])
+    alt = np.array([st['alt'] for st in stations], dtype=np.float64)
+
+    n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * np.sin(lat) ** 2)
+    positions = np.stack([
+        (n + alt) * np.cos(lat) * np.cos(lon),
+        (n + alt) * np.cos(lat) * np.sin(lon),
+        (n * (1 - WGS84_E2) + alt) * np.sin(lat),
+    ], axis=-1)
+    east = np.stack([-np.sin(lon), np.cos(lon), np.zeros_like(lon)], axis=-1)
+    north = np.stack([-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)], axis=-1)
+    up = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+    return positions, np.stack([east, north, up], axis=1)
+
+
+def pack_tracks(satellite_data):
+    """
+    Pack tracks into padded arrays.
+
+    Returns:
+        tuple: (ids, epochs (n, T) with NaN padding, GEO xyz (n, T, 3) km with NaN padding)
+    """
+    sats = [sat for sat in satellite_data if len(sat['times']) > 0]
+    length = max((len(sat['times']) for sat in sats), default=0)
+    epochs = np.full((len(sats), length), np.nan)
+    xyz = np.full((len(sats), length, 3), np.nan)
+    for idx, sat in enumerate(sats):
+        count = len(sat['times'])
+        epochs[idx, :count] = times_to_epoch_seconds(sat['times'])
+        xyz[idx, :count] = np.column_stack([sat['x'], sat['y'], sat['z']])
+    return [sat['id'] for sat in sats], epochs, xyz
+
+
+def look_angles(station_positions, station_enu, xyz):
+    """
+    Elevation, azimuth and range for every (station, satellite, sample).
+
+    Args:
+        station_positions (array): (s, 3) GEO station positions in km
+        station_enu (array): (s, 3, 3) station East-North-Up axes
+        xyz (array): (n, T, 3) GEO satellite positions in km
+
+    Returns:
+        tuple: (elevation, azimuth, range) arrays of shape (s, n, T); angles in degrees
+    """
+    # One GEMM rotates every sample into every station's ENU axes:
+    # enu = R_s (xyz - p_s) = R_s xyz - R_s p_s
+    n_stations = len(station_positions)
+    n_sats, length, _ = xyz.shape
+    axes = station_enu.reshape(-1, 3)
+    enu = xyz.reshape(-1, 3) @ axes.T - (station_enu @ station_positions[:, :, None]).reshape(-1)
+    enu = enu.reshape(n_sats, length, n_stations, 3).transpose(2, 3, 0, 1)
+
+    distance = np.sqrt(enu[:, 0] ** 2 + enu[:, 1] ** 2 + enu[:, 2] ** 2)
+    elevation = np.degrees(np.arcsin(enu[:, 2] / distance))
+    azimuth = np.degrees(np.arctan2(enu[:, 0], enu[:, 1])) % 360
+    return elevation, azimuth, distance
+
+
+def _windows(visible):
+    """Return (row, start, end) index arrays of runs of True along the last axis."""
+    rows, length = visible.shape
+    padded = np.zeros((rows, length + 2), dtype=np.int8)
+    padded[:, 1:-1] = visible
+    edges = np.diff(padded, axis=1)
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return start_rows, starts, ends - 1
+
+
+def predict_passes(satellite_data, stations, min_elevation=10.0, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Predict AOS/LOS pass windows for every station and satellite.
+
+    Args:
+        satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        stations (list): Station dictionaries ('name', 'lat', 'lon', 'alt')
+        min_elevation (float): Elevation mask in degrees (default: 10)
+        chunk_bytes (int): Approximate memory budget for one batch of stations
+
+    Returns:
+        list: Pass dictionaries sorted by AOS, each with 'station', 'satellite',
+              'aos', 'los', 'tca' (epoch seconds of maximum elevation),
+              'max_elevation' and 'aos_azimuth'/'los_azimuth' (degrees)
+    """
+    ids, epochs, xyz = pack_tracks(satellite_data)
+    if not ids or not stations:
+        return []
+    station_positions, station_enu = station_frames(stations)
+
+    # ~8 float64 arrays of shape (n, T) are live per station
+    per_station = 8 * 8 * xyz.shape[0] * xyz.shape[1]
+    chunk = max(1, int(chunk_bytes // max(per_station, 1)))
+
+    passes = []
+    for first in range(0, len(stations), chunk):
+        last = min(first + chunk, len(stations))
+        elevation, azimuth, _ = look_angles(station_positions[first:last], station_enu[first:last], xyz)
+        visible = np.nan_to_num(elevation, nan=-90.0) >= min_elevation
+
+        s_count, n_sats, length = visible.shape
+        rows, starts, ends = _windows(visible.reshape(-1, length))
+        station_idx, sat_idx = np.divmod(rows, n_sats)
+
+        flat_elevation = np.where(visible, elevation, -np.inf).reshape(-1, length)
+        flat_azimuth = azimuth.reshape(-1, length)
+        for row, st, sat, start, end in zip(rows, station_idx, sat_idx, starts, ends):
+            peak = start + int(np.argmax(flat_elevation[row, start:end + 1]))
+            passes.append({
+                'station': stations[first + st]['name'],
+                'satellite': ids[sat],
+                'aos': float(epochs[sat, start]),
+                'los': float(epochs[sat, end]),
+                'tca': float(epochs[sat, peak]),
+                'max_elevation': float(flat_elevation[row, peak]),
+                'aos_azimuth': float(flat_azimuth[row, start]),
+                'los_azimuth': float(flat_azimuth[row, end]),
+            })
+
+    passes.sort(key=lambda p: (p['aos'], p['station'], p['satellite']))
+    return passes
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Indexed Position-at-Time Queries over Stored Tracks
+
+Answers "where was satellite X at time T" for arbitrary batches of
+(id, time) pairs from the local TrackStore, instead of fetching a window
+relative to now. Each satellite's stored samples are loaded once into a
+sorted time index with precomputed velocities. A batch of queries is then
+grouped by satellite, located with np.searchsorted and interpolated with
+cubic Hermite splines, all as whole-array operations.
+
+SSC is only called on a cache miss. That happens when a query falls outside
+the stored samples and its (satellite, UTC day) unit is not in the store, or
+is today's and may still be growing. Missing days are fetched in contiguous
+runs and written to the store, so the next query for them is local.
+
+Usage:
+    index = PositionIndex(TrackStore('tracks/'))
+    result = index.query(['iss', 'ace', 'iss'], [t0, t1, t2])   # epoch seconds
+    result['latitudes'], result['x'], ...                       # NaN where unknown
+
+    python position_query.py --store tracks/ -s iss --at 2025-01-01T12:00:00
+    python position_query.py --benchmark
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from satellite_tracker import fetch_satellite_positions, times_to_epoch_seconds
+from track_store import TrackStore, day_bounds
+
+QUERY_FIELDS = ('latitudes', 'longitudes', 'altitudes', 'x', 'y', 'z')
+_LON_ROW = QUERY_FIELDS.index('longitudes')
+DAY_S = 86400
+DEFAULT_GAP_FACTOR = 3.0
+
+
+def track_samples(sat, fields=QUERY_FIELDS):
+    """
+    Return a track's samples sorted by time, with duplicate stamps dropped.
+
+    Longitudes are unwrapped, so interpolating between two samples on either
+    side of the antimeridian does not sweep the other way round the globe.
+
+    Args:
+        sat (dict): Satellite data dictionary ('times' as datetimes or epoch seconds)
+        fields (tuple): Value fields to return (default: QUERY_FIELDS)
+
+    Returns:
+        tuple: ((n,) epoch seconds, (n, len(fields)) values)
+    """
+    times = np.asarray(times_to_epoch_seconds(sat['times']), dtype=np.float64)
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    keep = np.concatenate(([True], np.diff(times) > 0))
+    values = np.column_stack([np.asarray(sat[field], dtype=np.float64)[order][keep] for field in fields])
+    if 'longitudes' in fields:
+        lon = fields.index('longitudes')
+        values[:, lon] = np.unwrap(values[:, lon], period=360.0)
+    return times[keep], values
+
+
+def gap_limit(times, gap_factor=DEFAULT_GAP_FACTOR):
+    """Return the longest gap to interpolate across: gap_factor times the median sample interval."""
+    return gap_factor * float(np.median(np.diff(times))) if len(times) > 1 else 0.0
+
+
+class _SatelliteTrack:
+    """
+    Sorted samples of one satellite over a range of stored days.
+
+    Each interval between samples holds the cubic Hermite polynomial through
+    its end points (tangents from central differences), as (4, 6) Horner
+    coefficients per interval, so a query gathers one contiguous row.
+    """
+
+    def __init__(self, sat, first_day, last_day):
+        self.first_day = first_day
+        self.last_day = last_day
+        self.lon_base = 0.0
+        self.max_gap = 0.0
+        if sat is None or len(sat['times']) == 0:
+            self.times = np.zeros(0)
+            self.coefficients = np.zeros((0, 4, len(QUERY_FIELDS)))
+            return
+        self.lon_base = -180.0 if np.nanmin(np.asarray(sat['longitudes'], dtype=np.float64), initial=0.0) < 0 else 0.0
+        self.times, values = track_samples(sat)
+
+        # Per interval: p(s) = a + b s + c s^2 + d s^3 for s in [0, 1]
+        self.coefficients = np.zeros((len(self.times), 4, len(QUERY_FIELDS)))
+        self.coefficients[:, 0] = values  # The last row answers a query exactly at the last sample
+        if len(self.times) > 1:
+            span = np.diff(self.times)[:, None]
+            tangents = np.gradient(values, self.times, axis=0)
+            p0, p1 = values[:-1], values[1:]
+            m0, m1 = tangents[:-1] * span, tangents[1:] * span
+            self.coefficients[:-1, 1] = m0
+            self.coefficients[:-1, 2] = 3 * (p1 - p0) - 2 * m0 - m1
+            self.coefficients[:-1, 3] = 2 * (p0 - p1) + m0 + m1
+            self.max_gap = gap_limit(self.times)
+
+    def covers(self, first_day, last_day):
+        return self.first_day <= first_day and last_day <= self.last_day
+
+    def interpolate(self, query_times, out, rows):
+        """
+        Interpolate at query times into out[rows]; return a mask of the queries answered.
+
+        Queries inside an interval no longer than max_gap are interpolated,
+        and a query exactly at a sample time is answered even if it is isolated.
+        """
+        times = self.times
+        if len(times) == 0:
+            return np.zeros(len(query_times), dtype=bool)
+        lo = np.searchsorted(times, query_times, side='right') - 1
+        np.clip(lo, 0, len(times) - 1, out=lo)
+        t0 = times[lo]
+        t1 = times[np.minimum(lo + 1, len(times) - 1)]
+        span = t1 - t0
+        s = (query_times - t0) / np.where(span > 0, span, 1.0)
+        answered = (s >= 0) & (((s <= 1) & (span <= self.max_gap)) | (s == 0))
+
+        c = self.coefficients[lo]
+        s = s[:, None]
+        values = ((c[:, 3] * s + c[:, 2]) * s + c[:, 1]) * s + c[:, 0]
+        values[:, _LON_ROW] = (values[:, _LON_ROW] - self.lon_base) % 360.0 + self.lon_base
+        values[~answered] = np.nan
+        out[rows] = values
+        return answered
+
+
+def _epoch_days(epochs):
+    """Return UTC day numbers (days since 1970-01-01) of epoch seconds."""
+    return np.floor(np.asarray(epochs, dtype=np.float64) / DAY_S).astype(np.int64)
+
+
+def _to_date(day_number):
+    return date(1970, 1, 1) + timedelta(days=int(day_number))
+
+
+class PositionIndex:
+    """
+    Batched position-at-time lookups over a TrackStore, fetching from SSC on misses.
+
+    Args:
+        store (TrackStore): Local track store used as the cache
+        client: SSC client for misses (default: None, the shared client)
+        fetch (bool): Fetch missing (satellite, day) units from SSC (default: True)
+        log: Stream for fetch errors (default: None, sys.stderr)
+    """
+
+    def __init__(self, store, client=None, fetch=True, log=None):
+        self.store = store
+        self.client = client
+        self.fetch = fetch
+        self.log = log or sys.stderr
+        self.fetch_calls = 0
+        self._tracks = {}
+
+    def _load(self, satellite_id, first_day, last_day):
+        """Return the satellite's index, (re)loading it from the store to cover the days."""
+        key = satellite_id.lower()
+        track = self._tracks.get(key)
+        if track is None or not track.covers(first_day, last_day):
+            if track is not None:
+                first_day, last_day = min(first_day, track.first_day), max(last_day, track.last_day)
+            # One day of margin on each side for the samples bracketing midnight
+            start = (first_day - 1) * DAY_S
+            end = (last_day + 2) * DAY_S
+            sat = self.store.read_track(satellite_id, start, end)
+            track = self._tracks[key] = _SatelliteTrack(sat, first_day, last_day)
+        return track
+
+    def _fetch_days(self, satellite_id, day_numbers):
+        """Fetch missing days in contiguous runs and write one unit per day."""
+        day_numbers = np.unique(day_numbers)
+        runs = np.split(day_numbers, np.flatnonzero(np.diff(day_numbers) > 1) + 1)
+        for run in runs:
+            start_time, _ = day_bounds(_to_date(run[0]))
+            _, end_time = day_bounds(_to_date(run[-1]))
+            try:
+                satellite_data = fetch_satellite_positions(
+                    [satellite_id], client=self.client, start_time=start_time,
+                    end_time=end_time - timedelta(seconds=1), raise_errors=True, verbose=False)
+            except Exception as e:
+                print(f"Could not fetch {satellite_id} for {_to_date(run[0])}..{_to_date(run[-1])}: {e}", file=self.log)
+                continue
+            self.fetch_calls += 1
+            sat = next((s for s in satellite_data if s['id'].lower() == satellite_id.lower()), None)
+            epochs = None
+            if sat is not None:
+                epochs = times_to_epoch_seconds(sat['times'])
+            for day_number in run:
+                day_sat = None
+                if epochs is not None:
+                    in_day = _epoch_days(epochs) == day_number
+                    day_sat = {'id': sat['id'], 'times': epochs[in_day]}
+                    day_sat.update({field: np.asarray(sat[field])[in_day] for field in QUERY_FIELDS})
+                self.store.write_unit(satellite_id, _to_date(day_number), day_sat)
+        self._tracks.pop(satellite_id.lower(), None)
+
+    def codes(self, ids):
+        """
+        Map satellite IDs to integer codes for query().
+
+        Args:
+            ids (array): Satellite ID per query (strings)
+
+        Returns:
+            tuple: (list of unique satellite IDs, (n,) int array of indices into it)
+        """
+        ids = np.asarray(ids).reshape(-1)
+        if ids.dtype.kind != 'U' or len(ids) == 0:
+            unique, inverse = np.unique(ids.astype(str), return_inverse=True)
+            return [str(sat_id) for sat_id in unique], inverse.reshape(-1)
+        # Sorting integer hashes of the fixed-width strings is much faster than sorting
+        # the strings; a hash collision is detected below and falls back to np.unique
+        chars = ids.view(np.uint32).reshape(len(ids), -1)
+        hashes = np.zeros(len(ids), dtype=np.uint64)
+        for column in chars.T:
+            hashes = hashes * np.uint64(1000003) + column
+        _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        unique = ids[first]
+        if not np.array_equal(unique[inverse], ids):
+            unique, inverse = np.unique(ids, return_inverse=True)
+        return [str(sat_id) for sat_id in unique], inverse.reshape(-1)
+
+    def query(self, ids, times, satellite_ids=None):
+        """
+        Interpolated positions for a batch of (satellite, time) pairs.
+
+        Args:
+            ids (array): Satellite ID per query; a single ID applies to every
+                         query, and integer codes index into satellite_ids
+                         (see codes(); the fastest form for very large batches)
+            times (array): Query times as epoch seconds (or datetime64)
+            satellite_ids (list): Satellite IDs the integer codes refer to
+
+        Returns:
+            dict: (n,) float arrays for 'latitudes', 'longitudes', 'altitudes'
+                  and 'x', 'y', 'z' (km, GEO); NaN where no position is known
+        """
+        times = np.asarray(times)
+        if times.dtype.kind == 'M':
+            times = times.astype('datetime64[us]').astype(np.int64) / 1e6
+        times = np.atleast_1d(times.astype(np.float64))
+        if isinstance(ids, str):
+            satellite_ids, codes = [ids], np.zeros(len(times), dtype=np.int64)
+        elif satellite_ids is None:
+            satellite_ids, codes = self.codes(ids)
+        else:
+            codes = np.asarray(ids, dtype=np.int64)
+
+        out = np.full((len(times), len(QUERY_FIELDS)), np.nan)
+        # Group queries by satellite; small integer keys take numpy's radix sort
+        sort_keys = codes.astype(np.uint16) if len(satellite_ids) <= np.iinfo(np.uint16).max else codes
+        order = np.argsort(sort_keys, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(satellite_ids) + 1))
+        today = _epoch_days(datetime.now(timezone.utc).timestamp())
+        for code, satellite_id in enumerate(satellite_ids):
+            rows = order[bounds[code]:bounds[code + 1]]
+            if len(rows) == 0:
+                continue
+            query_times = times[rows]
+            days = _epoch_days(query_times)
+            first_day, last_day = int(days.min()), int(days.max())
+            track = self._load(satellite_id, first_day, last_day)
+            answered = track.interpolate(query_times, out, rows)
+            if not self.fetch:
+                continue
+
+            # Cache misses: fetch days never stored, or today's (still growing) unit. A
+            # second round picks up the neighbouring day when the bracketing sample lies
+            # across midnight, which is only known once the sample spacing is.
+            fetched = set()
+            for _ in range(2):
+                if answered.all():
+                    break
+                missed_times = query_times[~answered]
+                missed = np.unique(np.concatenate([_epoch_days(missed_times + offset)
+                                                   for offset in (-track.max_gap, 0.0, track.max_gap)]))
+                wanted = np.array([day not in fetched and not (day < today and
+                                                               self.store.has_unit(satellite_id, _to_date(day)))
+                                   for day in missed], dtype=bool)
+                if not wanted.any():
+                    break
+                self._fetch_days(satellite_id, missed[wanted])
+                fetched.update(missed.tolist())
+                first_day, last_day = min(first_day, int(missed[0])), max(last_day, int(missed[-1]))
+                track = self._load(satellite_id, first_day, last_day)
+                retry = np.flatnonzero(~answered)
+                answered[retry] = track.interpolate(query_times[retry], out, rows[retry])
+        return dict(zip(QUERY_FIELDS, out.T))
+
+
+def benchmark(queries=1_000_000, satellite_count=300, days=2):
+    """
+    Time a batch of random (satellite, time) queries over a stand-in backfilled store.
+
+    Args:
+        queries (int): Queries in the batch (default: 1,000,000)
+        satellite_count (int): Satellites in the store (default: 300)
+        days (int): Days of one-minute tracks per satellite (default: 2)
+
+    Returns:
+        dict: 'build_s', 'query_s' (integer codes), 'query_ids_s' (string IDs)
+              and 'queries_per_s'
+    """
+    import tempfile
+
+    from ssc_standin import StandInSscWs, benchmark_satellites
+
+    rng = np.random.default_rng(2)
+    satellites = benchmark_satellites(satellite_count, seed=2)
+    satellite_ids = [s[0] for s in satellites]
+    client = StandInSscWs(satellites)
+    first = date(2025, 1, 1)
+    with tempfile.TemporaryDirectory() as root:
+        index = PositionIndex(TrackStore(root), client)
+        start = datetime(first.year, first.month, first.day, tzinfo=timezone.utc).timestamp()
+        warm = np.repeat(np.arange(satellite_count), 2)
+        warm_times = np.tile([start, start + (days - 1) * DAY_S], satellite_count)
+        started = time.perf_counter()
+        index.query(warm, warm_times, satellite_ids)  # Fetches every day once, then builds the indexes
+        build_s = time.perf_counter() - started
+        print(f"Store: {satellite_count} satellites x {days} days fetched and indexed in {build_s:.2f}s "
+              f"({index.fetch_calls} SSC calls)")
+
+        codes = rng.integers(0, satellite_count, queries)
+        query_times = start + rng.uniform(0, days * DAY_S - 60, queries)
+        calls = index.fetch_calls
+        started = time.perf_counter()
+        result = index.query(codes, query_times, satellite_ids)
+        query_s = time.perf_counter() - started
+        ids = np.array(satellite_ids)[codes]
+        started = time.perf_counter()
+        index.query(ids, query_times)
+        query_ids_s = time.perf_counter() - started
+        answered = np.isfinite(result['x']).mean()
+        print(f"{queries:,} queries: {query_s * 1000:.0f} ms with integer codes, {query_ids_s * 1000:.0f} ms "
+              f"with string IDs ({queries / query_s / 1e6:.1f} M queries/s, {answered:.1%} answered, "
+              f"{index.fetch_calls - calls} SSC calls)")
+
+        # Accuracy against positions fetched exactly at the query times
+        sample = rng.choice(queries, 200, replace=False)
+        errors = []
+        for i in sample:
+            exact = client._positions(client.satellites[satellite_ids[codes[i]]], np.array([query_times[i]]))
+            xyz = np.array([exact['X'][0], exact['Y'][0], exact['Z'][0]]) * 6378.16
+            errors.append(np.linalg.norm(xyz - [result['x'][i], result['y'][i], result['z'][i]]))
+        print(f"Interpolation error vs exact positions: median {np.median(errors) * 1000:.1f} m, "
+              f"max {np.max(errors) * 1000:.1f} m")
+    return {'build_s': build_s, 'query_s': query_s, 'query_ids_s': query_ids_s,
+            'queries_per_s': queries / query_s}
+
+
+def main():
+    """Main function with command line options."""
+    parser = argparse.ArgumentParser(description='Position-at-time queries over stored satellite tracks')
+    parser.add_argument('--store', default='tracks',
+                        help='Track store directory (default: tracks)')
+    parser.add_argument('--satellites', '-s', nargs='+', default=[],
+                        help='Satellite IDs to look up (space-separated)')
+    parser.add_argument('--at', nargs='+', default=[],
+                        help='UTC times to look up (ISO 8601, e.g. 2025-01-01T12:00:00)')
+    parser.add_argument('--no-fetch', action='store_true',
+                        help='Answer from the store only; never call SSC')
+    parser.add_argument('--standin', action='store_true',
+                        help='Fetch misses from the local SSC stand-in instead of NASA SSC')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time one million random queries over a stand-in store')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+    if not args.satellites or not args.at:
+        parser.error('--satellites and --at are required (or use --benchmark)')
+
+    client = None
+    if args.standin:
+        from ssc_standin import StandInSscWs
+        client = StandInSscWs()
+    index = PositionIndex(TrackStore(args.store), client, fetch=not args.no_fetch)
+    epochs = [datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp() for value in args.at]
+    ids = np.repeat(args.satellites, len(epochs))
+    result = index.query(ids, np.tile(epochs, len(args.satellites)))
+    print(f"{'Satellite':<15} {'Time (UTC)':<20} {'Lat':>9} {'Lon':>9} {'Alt (km)':>10}")
+    for i, (sat_id, epoch) in enumerate(zip(ids, np.tile(epochs, len(args.satellites)))):
+        stamp = datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"{sat_id.upper():<15} {stamp:<20} {result['latitudes'][i]:9.3f} "
+              f"{result['longitudes'][i]:9.3f} {result['altitudes'][i]:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
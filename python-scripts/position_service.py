@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Local Satellite Position Service
+
+Keeps one shared, incrementally refreshed position state for all tracked
+satellites and serves it to any number of browser clients:
+
+    GET /snapshot.bin    compact binary snapshot (see snapshot.py)
+    GET /snapshot.json   JSON fallback with the same fields
+    GET /health          refresh status and upstream call counters
+    GET /ws              WebSocket; sends the full latest state, then deltas
+    GET /region?lat_min=&lat_max=&lon_min=&lon_max=   satellites over a lat/lon box
+    GET /nearest?id=&k=  k satellites nearest to a satellite
+    GET /pairs?km=       satellite pairs closer than km
+    GET /at?ids=&t=      interpolated positions at arbitrary times from the
+                         track store (--store only; see position_query.py)
+
+Snapshots carry an ETag derived from their content and honour If-None-Match,
+so polling clients get a 304 until the positions change, also across service
+restarts. WebSocket clients that fall behind have their queued deltas
+replaced by one full message instead of growing an unbounded backlog. Only the refresher thread talks to SSC, so N
+clients cost one upstream fetch per interval instead of N.
+
+Usage:
+    python position_service.py --standin              # offline, synthetic orbits
+    python position_service.py --tle active.tle        # offline, SGP4 from element sets
+    python position_service.py -s iss ace -u 30 --port 8765
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import queue
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from satellite_tracker import fetch_satellite_positions, get_ssc_client, times_to_epoch_seconds
+from snapshot import LATEST_COLUMNS, build_snapshot, encode_binary, encode_json, json_number
+from spatial_index import SpatialIndex
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+TRACK_FIELDS = ('latitudes', 'longitudes', 'altitudes', 'x', 'y', 'z')
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+class PositionState:
+    """
+    Shared position state refreshed incrementally from SSC.
+
+    Each refresh only requests samples newer than the oldest "latest" sample
+    held, appends them to the cached tracks and trims anything that has fallen
+    out of the time window. Encoded snapshots are built once per refresh and
+    shared by every client.
+
+    Args:
+        satellite_ids (list): Satellite IDs to track
+        time_window_hours (float): Length of the track window kept in memory
+        client: SSC client passed to fetch_satellite_positions() (default: None, shared client)
+        track_step (int): Decimation of tracks included in snapshots (default: None, no tracks)
+        store (TrackStore): Track store answering /at queries (default: None, disabled)
+    """
+
+    def __init__(self, satellite_ids, time_window_hours=1, client=None, track_step=None, store=None):
+        self.satellite_ids = list(satellite_ids)
+        self.time_window_hours = time_window_hours
+        self.client = client
+        self.track_step = track_step
+        self.tracks = {}
+        self.index = SpatialIndex()
+        self.version = 0
+        self.last_refresh = None
+        self.upstream_calls = 0
+        self.failed_calls = 0
+        self._encoded = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.positions = None
+        if store is not None:
+            from position_query import PositionIndex
+            self.positions = PositionIndex(store, client)
+        self._positions_lock = threading.Lock()
+
+    def _fetch_range(self):
+        """Return (start, end) naive UTC datetimes for the next incremental fetch."""
+        end_time = datetime.utcnow()
+        window_start = end_time - timedelta(hours=self.time_window_hours)
+        latest = [track['times'][-1] for track in self.tracks.values() if len(track['times'])]
+        if not latest:
+            return window_start, end_time
+        oldest_latest = min(latest)
+        start_time = datetime.fromtimestamp(oldest_latest + 1, timezone.utc).replace(tzinfo=None)
+        return max(start_time, window_start), end_time
+
+    def _merge(self, satellite_data, cutoff):
+        """Append new samples to the cached tracks and return the changed satellite IDs."""
+        changed = []
+        for sat in satellite_data:
+            epochs = times_to_epoch_seconds(sat['times'])
+            track = self.tracks.get(sat['id'])
+            if track is None:
+                track = {'id': sat['id'], 'times': np.zeros(0)}
+                track.update({field: np.zeros(0) for field in TRACK_FIELDS})
+                self.tracks[sat['id']] = track
+
+            last = track['times'][-1] if len(track['times']) else -np.inf
+            new = epochs > last
+            if np.any(new):
+                changed.append(sat['id'])
+            keep = np.concatenate([track['times'], epochs[new]]) >= cutoff
+            track['times'] = np.concatenate([track['times'], epochs[new]])[keep]
+            for field in TRACK_FIELDS:
+                values = np.asarray(sat.get(field, np.full(len(epochs), np.nan)), dtype=np.float64)
+                track[field] = np.concatenate([track[field], values[new]])[keep]
+        return changed
+
+    def refresh(self):
+        """
+        Fetch new samples from SSC, update the shared state and notify WebSocket clients.
+
+        Only successful fetches count as upstream calls; a failed one is
+        counted in failed_calls and re-raised for the caller to log.
+
+        Returns:
+            int: Number of satellites whose latest position changed
+        """
+        start_time, end_time = self._fetch_range()
+        try:
+            satellite_data = fetch_satellite_positions(
+                self.satellite_ids, client=self.client, start_time=start_time, end_time=end_time,
+                raise_errors=True, verbose=False
+            )
+        except Exception:
+            self.failed_calls += 1
+            raise
+        self.upstream_calls += 1
+        cutoff = (end_time.replace(tzinfo=timezone.utc) - timedelta(hours=self.time_window_hours)).timestamp()
+
+        with self._lock:
+            changed = self._merge(satellite_data, cutoff)
+            self.last_refresh = time.time()
+            if not changed and self._encoded:
+                return 0
+            self.version += 1
+            self.index.update_from_satellite_data(list(self.tracks.values()))
+            snapshot = build_snapshot(list(self.tracks.values()), self.track_step)
+            self._encoded = {
+                fmt: (body, content_type, f'"{hashlib.sha1(body).hexdigest()[:20]}-{fmt}"')
+                for fmt, body, content_type in (
+                    ('bin', encode_binary(snapshot), 'application/octet-stream'),
+                    ('json', encode_json(snapshot), 'application/json'),
+                )
+            }
+            message = self._delta_message(changed)
+            full = None
+            if any(subscriber.full() for subscriber in self._subscribers):
+                full = self._delta_message(list(self.tracks), kind='full')
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # A slow client: collapse its backlog into one full-state message
+                _drain(subscriber)
+                if full is None:
+                    with self._lock:
+                        full = self._delta_message(list(self.tracks), kind='full')
+                subscriber.put_nowait(full)
+        return len(changed)
+
+    def _delta_message(self, sat_ids, kind='delta'):
+        """Build a JSON message with the latest sample of each given satellite."""
+        positions = []
+        for sat_id in sat_ids:
+            track = self.tracks[sat_id]
+            if not len(track['times']):
+                continue
+            latest = [track['times'][-1]] + [track[field][-1] for field in TRACK_FIELDS]
+            entry = {name: json_number(value) for name, value in zip(LATEST_COLUMNS, latest)}
+            entry['id'] = sat_id
+            positions.append(entry)
+        return json.dumps({'type': kind, 'version': self.version, 'positions': positions},
+                          separators=(',', ':'), allow_nan=False)
+
+    def encoded(self, fmt):
+        """Return (body, content_type, etag) for the current snapshot in the given format."""
+        with self._lock:
+            if fmt not in self._encoded:
+                return None
+            return self._encoded[fmt]
+
+    def query(self, path, params):
+        """
+        Run a spatial query against the latest positions.
+
+        Args:
+            path (str): '/region', '/nearest', '/pairs' or '/at'
+            params (dict): Query parameters (single values)
+
+        Returns:
+            dict: JSON-serializable result
+        """
+        if path == '/at':
+            return self.query_at(params)
+        with self._lock:
+            if path == '/region':
+                ids = self.index.query_region(float(params['lat_min']), float(params['lat_max']),
+                                              float(params['lon_min']), float(params['lon_max']))
+                return {'version': self.version, 'satellites': ids}
+            if path == '/nearest':
+                idx = list(self.index.ids).index(params['id'])
+                neighbours = self.index.query_nearest(self.index.xyz[idx], int(params.get('k', 5)) + 1)
+                return {'version': self.version,
+                        'neighbours': [{'id': i, 'km': round(d, 3)} for i, d in neighbours if i != params['id']]}
+            pairs = self.index.close_pairs(float(params['km']))
+            return {'version': self.version,
+                    'pairs': [{'a': a, 'b': b, 'km': round(d, 3)} for a, b, d in pairs]}
+
+    def query_at(self, params):
+        """
+        Look up positions at arbitrary times in the track store.
+
+        Args:
+            params (dict): 'ids' and 't' as comma-separated lists (epoch seconds);
+                           a single ID or time applies to every entry of the other
+
+        Returns:
+            dict: JSON-serializable result with one position per (id, t) pair
+        """
+        if self.positions is None:
+            raise ValueError("position lookups need the service to run with --store")
+        ids = params['ids'].split(',')
+        times = [float(value) for value in params['t'].split(',')]
+        if len(ids) == 1:
+            ids = ids * len(times)
+        elif len(times) == 1:
+            times = times * len(ids)
+        if len(ids) != len(times):
+            raise ValueError("ids and t must have the same length, or one of them a single value")
+        with self._positions_lock:
+            result = self.positions.query(np.array(ids), np.array(times))
+        columns = {field: np.round(result[field], 5) for field in TRACK_FIELDS}
+        return {'positions': [dict({'id': sat_id, 't': t},
+                                   **{field: (None if np.isnan(columns[field][i]) else float(columns[field][i]))
+                                      for field in TRACK_FIELDS})
+                              for i, (sat_id, t) in enumerate(zip(ids, times))]}
+
+    def subscribe(self):
+        """Register a WebSocket client and return its bounded queue, primed with the full state."""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            subscriber.put(self._delta_message(list(self.tracks), kind='full'))
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a WebSocket client queue."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def status(self):
+        """Return a small dictionary describing the service state."""
+        with self._lock:
+            return {
+                'version': self.version,
+                'satellites': len(self.tracks),
+                'last_refresh': self.last_refresh,
+                'upstream_calls': self.upstream_calls,
+                'failed_calls': self.failed_calls,
+                'websocket_clients': len(self._subscribers),
+            }
+
+
+def _drain(subscriber):
+    """Discard every message waiting in a subscriber queue."""
+    while True:
+        try:
+            subscriber.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _refresh_loop(state, update_interval, stop_event):
+    """Refresh the shared state every update_interval seconds until stop_event is set."""
+    while not stop_event.is_set():
+        try:
+            changed = state.refresh()
+            print(f"Refreshed at {datetime.utcnow().strftime('%H:%M:%S')} UTC "
+                  f"(version {state.version}, {changed} satellites updated)")
+        except Exception as e:
+            print(f"Error refreshing positions: {e}")
+        stop_event.wait(update_interval)
+
+
+def _encode_ws_frame(payload, opcode=0x1):
+    """Encode a single unmasked server-to-client WebSocket frame."""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack('>H', length)
+    else:
+        header += bytes([127]) + struct.pack('>Q', length)
+    return header + payload
+
+
+def _read_ws_frame(rfile):
+    """Read one masked client-to-server WebSocket frame and return (opcode, payload)."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return 0x8, b''
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        (length,) = struct.unpack('>H', rfile.read(2))
+    elif length == 127:
+        (length,) = struct.unpack('>Q', rfile.read(8))
+    mask = rfile.read(4) if head[1] & 0x80 else b'\0\0\0\0'
+    payload = bytearray(rfile.read(length))
+    for i in range(len(payload)):
+        payload[i] ^= mask[i % 4]
+    return opcode, bytes(payload)
+
+
+class PositionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/WebSocket handler serving a shared PositionState."""
+
+    state = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        """Silence per-request logging; refreshes are logged instead."""
+
+    def _send(self, status, body=b'', content_type='text/plain', headers=None):
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ('/snapshot.bin', '/snapshot.json'):
+            encoded = self.state.encoded(path.rsplit('.', 1)[1])
+            if encoded is None:
+                self._send(503, b'No data yet', headers={'Retry-After': '5'})
+                return
+            body, content_type, etag = encoded
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, headers={'ETag': etag})
+            else:
+                self._send(200, body, content_type, {'ETag': etag})
+        elif path in ('/region', '/nearest', '/pairs', '/at'):
+            params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+            try:
+                result = self.state.query(path, params)
+            except (KeyError, ValueError) as e:
+                self._send(400, f"Bad query: {e}".encode('utf-8'))
+                return
+            self._send(200, json.dumps(result).encode('utf-8'), 'application/json')
+        elif path == '/health':
+            self._send(200, json.dumps(self.state.status()).encode('utf-8'), 'application/json')
+        elif path == '/ws' and self.headers.get('Upgrade', '').lower() == 'websocket':
+            self._serve_websocket()
+        else:
+            self._send(404, b'Not found')
+
+    def _serve_websocket(self):
+        key = self.headers.get('Sec-WebSocket-Key', '')
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        self.send_response(101, 'Switching Protocols')
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept)
+        self.end_headers()
+        self.close_connection = True
+
+        subscriber = self.state.subscribe()
+        closed = threading.Event()
+        write_lock = threading.Lock()
+        reader = threading.Thread(target=self._read_client_frames, args=(closed, write_lock), daemon=True)
+        reader.start()
+        try:
+            while not closed.is_set():
+                try:
+                    message = subscriber.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                with write_lock:
+                    self.wfile.write(_encode_ws_frame(message.encode('utf-8')))
+                    self.wfile.flush()
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            closed.set()
+            self.state.unsubscribe(subscriber)
+
+    def _read_client_frames(self, closed, write_lock):
+        """
+        Answer pings and close frames from the client until the connection closes.
+
+        Frames are read through the same buffered rfile as the HTTP request,
+        so frames already buffered there are not missed.
+        """
+        try:
+            while not closed.is_set():
+                opcode, payload = _read_ws_frame(self.rfile)
+                if opcode == 0x8:
+                    with write_lock:
+                        self.wfile.write(_encode_ws_frame(b'', opcode=0x8))
+                        self.wfile.flush()
+                    break
+                if opcode == 0x9:
+                    with write_lock:
+                        self.wfile.write(_encode_ws_frame(payload, opcode=0xA))
+                        self.wfile.flush()
+        except (ConnectionError, OSError, ValueError, struct.error):
+            pass
+        finally:
+            closed.set()
+
+
+def serve(state, host='127.0.0.1', port=8765, update_interval=60):
+    """
+    Start the refresher thread and serve HTTP/WebSocket clients until interrupted.
+
+    Args:
+        state (PositionState): Shared position state
+        host (str): Interface to bind (default: 127.0.0.1)
+        port (int): Port to bind (default: 8765)
+        update_interval (float): Seconds between upstream refreshes (default: 60)
+
+    Returns:
+        ThreadingHTTPServer: The server (after shutdown)
+    """
+    handler = type('BoundPositionRequestHandler', (PositionRequestHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    stop_event = threading.Event()
+    refresher = threading.Thread(target=_refresh_loop, args=(state, update_interval, stop_event), daemon=True)
+    refresher.start()
+
+    print(f"Serving satellite positions on http://{host}:{server.server_address[1]}")
+    print("Endpoints: /snapshot.bin /snapshot.json /health /ws")
+    print("Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nPosition service stopped by user.")
+    finally:
+        stop_event.set()
+        server.server_close()
+    return server
+
+
+def main():
+    """Main function with command line options."""
+    parser = argparse.ArgumentParser(description='Local satellite position HTTP/WebSocket service')
+    parser.add_argument('--satellites', '-s', nargs='+', default=['all'],
+                        help='Satellite IDs to serve (space-separated, default: all)')
+    parser.add_argument('--time-window', '-t', type=float, default=1,
+                        help='Track window kept in memory, in hours (default: 1)')
+    parser.add_argument('--update-interval', '-u', type=float, default=60,
+                        help='Seconds between upstream refreshes (default: 60)')
+    parser.add_argument('--track-step', type=int, default=None,
+                        help='Include tracks in snapshots, keeping every Nth sample')
+    parser.add_argument('--store', metavar='DIR',
+                        help='Track store answering /at position-at-time queries (fetches misses from SSC)')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind (default: 8765)')
+    parser.add_argument('--standin', action='store_true',
+                        help='Serve synthetic orbits from a local SSC stand-in (no network)')
+    parser.add_argument('--tle', nargs='+', metavar='FILE',
+                        help='Serve SGP4 positions propagated from TLE/OMM element files (no network)')
+    args = parser.parse_args()
+    if args.track_step is not None and args.track_step < 1:
+        parser.error('--track-step must be at least 1')
+
+    if args.standin:
+        from ssc_standin import StandInSscWs
+        client = StandInSscWs()
+    elif args.tle:
+        from tle_backend import TleClient
+        client = TleClient(args.tle)
+    else:
+        client = get_ssc_client()
+
+    satellite_ids = args.satellites
+    if 'all' in satellite_ids:
+        satellite_ids = [obs['Id'] for obs in client.get_observatories()['Observatory']]
+    print(f"Serving {len(satellite_ids)} satellites")
+
+    store = None
+    if args.store:
+        from track_store import TrackStore
+        store = TrackStore(args.store)
+    state = PositionState(satellite_ids, args.time_window, client, args.track_step, store)
+    serve(state, args.host, args.port, args.update_interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,46 +10,50 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.animation as animation
 import argparse
+import os
+import time
+
+from element_catalog import (CATALOG_DIR, load_element_catalog, orbit_class_mask, orbit_positions,
+                             select_orbit_class, walker_delta)
+from label_layout import declutter_3d
 
 # Constants
 EARTH_RADIUS_KM = 6378.16
+DEFAULT_CATALOG = os.path.join(CATALOG_DIR, 'realistic.csv')
 
-def create_realistic_satellite_data():
-    """Create data for satellites with REAL orbital parameters."""
-    
-    satellites = [
-        # Low Earth Orbit (LEO) - 400-800 km altitude
-        {'id': 'ISS', 'altitude': 408, 'inclination': 51.6, 'period': 92.5, 'phase': 0, 'color': '#00BFFF', 'size': 120},
-        {'id': 'HUBBLE', 'altitude': 540, 'inclination': 28.5, 'period': 95.4, 'phase': np.pi/3, 'color': '#FFD700', 'size': 100},
-        {'id': 'LANDSAT8', 'altitude': 705, 'inclination': 98.2, 'period': 98.8, 'phase': 2*np.pi/3, 'color': '#32CD32', 'size': 90},
-        {'id': 'AQUA', 'altitude': 705, 'inclination': 98.2, 'period': 98.8, 'phase': np.pi, 'color': '#00CED1', 'size': 90},
-        {'id': 'TERRA', 'altitude': 705, 'inclination': 98.2, 'period': 98.8, 'phase': 4*np.pi/3, 'color': '#228B22', 'size': 90},
-        {'id': 'AURA', 'altitude': 705, 'inclination': 98.2, 'period': 98.8, 'phase': 5*np.pi/3, 'color': '#20B2AA', 'size': 90},
-        {'id': 'SENTINEL1A', 'altitude': 693, 'inclination': 98.2, 'period': 98.6, 'phase': np.pi/6, 'color': '#FF69B4', 'size': 85},
-        {'id': 'SENTINEL2A', 'altitude': 786, 'inclination': 98.2, 'period': 99.1, 'phase': np.pi/4, 'color': '#FF1493', 'size': 85},
-        {'id': 'SENTINEL3A', 'altitude': 814, 'inclination': 98.2, 'period': 99.3, 'phase': np.pi/2, 'color': '#FF6347', 'size': 85},
-        {'id': 'NOAA20', 'altitude': 824, 'inclination': 98.2, 'period': 99.4, 'phase': 3*np.pi/4, 'color': '#FF4500', 'size': 85},
-        
-        # Medium Earth Orbit (MEO) - GPS constellation at ~20,200 km
-        {'id': 'GPS1', 'altitude': 20200, 'inclination': 55, 'period': 43200, 'phase': 0, 'color': '#FF6347', 'size': 80},
-        {'id': 'GPS2', 'altitude': 20200, 'inclination': 55, 'period': 43200, 'phase': np.pi/6, 'color': '#FF6347', 'size': 80},
-        {'id': 'GPS3', 'altitude': 20200, 'inclination': 55, 'period': 43200, 'phase': np.pi/3, 'color': '#FF6347', 'size': 80},
-        {'id': 'GPS4', 'altitude': 20200, 'inclination': 55, 'period': 43200, 'phase': np.pi/2, 'color': '#FF6347', 'size': 80},
-        {'id': 'GPS5', 'altitude': 20200, 'inclination': 55, 'period': 43200, 'phase': 2*np.pi/3, 'color': '#FF6347', 'size': 80},
-        {'id': 'GPS6', 'altitude': 20200, 'inclination': 55, 'period': 43200, 'phase': 5*np.pi/6, 'color': '#FF6347', 'size': 80},
-        
-        # Geostationary Orbit (GEO) - ~35,786 km altitude
-        {'id': 'GOES16', 'altitude': 35786, 'longitude': -75, 'period': 86400, 'color': '#FF8C00', 'size': 100},
-        {'id': 'GOES17', 'altitude': 35786, 'longitude': -137, 'period': 86400, 'color': '#FF8C00', 'size': 100},
-        {'id': 'METEOSAT11', 'altitude': 35786, 'longitude': 0, 'period': 86400, 'color': '#FFA500', 'size': 100},
-        {'id': 'HIMAWARI8', 'altitude': 35786, 'longitude': 140, 'period': 86400, 'color': '#FFB347', 'size': 100},
-        
-        # Deep Space Missions - L1 point (~1.5 million km)
-        {'id': 'ACE', 'altitude': 1500000, 'inclination': 0, 'period': 365*86400, 'phase': 0, 'color': '#DC143C', 'size': 60},
-        {'id': 'SOHO', 'altitude': 1500000, 'inclination': 0, 'period': 365*86400, 'phase': np.pi/4, 'color': '#B22222', 'size': 60},
-    ]
-    
-    return satellites
+# Per-filter view settings: (title, Earth scale, default zoom factor)
+VIEW_SETTINGS = {
+    'leo': ('LEO Only', 0.1, 0.3),   # Earth much smaller, zoomed in to see small differences
+    'meo': ('MEO Only', 0.3, 0.8),
+    'geo': ('GEO Only', 0.5, 1.0),
+    'all': ('All Orbits', 0.2, 1.0),
+}
+
+# Catalogs up to MAX_LABELLED satellites label and trail everything; larger
+# ones (stress mode) only DEFAULT_LABELLED of them
+MAX_LABELLED = 40
+DEFAULT_LABELLED = 20
+BENCHMARK_COUNTS = (1000, 10000, 50000)
+
+def create_realistic_satellite_data(catalog_path=None):
+    """
+    Load satellites with REAL orbital parameters from an element catalog.
+    
+    Args:
+        catalog_path (str): CSV/NPY/Parquet element catalog
+                            (default: catalogs/realistic.csv)
+    
+    Returns:
+        numpy.ndarray: Structured array of satellites (see element_catalog.py)
+    """
+    return load_element_catalog(catalog_path or DEFAULT_CATALOG)
+
+def altitude_range(catalog, orbit_class):
+    """Return the (min, max) altitude in km of an orbit class, NaN if it is empty."""
+    altitudes = catalog['altitude'][orbit_class_mask(catalog, orbit_class)]
+    if len(altitudes) == 0:
+        return np.nan, np.nan
+    return altitudes.min(), altitudes.max()
 
 def create_realistic_earth(scale_factor=1.0):
     """Create a realistic Earth with proper scale."""
@@ -63,27 +67,55 @@ def create_realistic_earth(scale_factor=1.0):
     return earth_x, earth_y, earth_z, earth_radius
 
 def calculate_satellite_position(sat, time_factor):
-    """Calculate satellite position at given time."""
-    radius = EARTH_RADIUS_KM + sat['altitude']
-    
-    if 'longitude' in sat:  # Geostationary satellites
-        longitude = np.radians(sat['longitude'])
-        x = radius * np.cos(longitude)
-        y = radius * np.sin(longitude)
-        z = 0
-    else:  # Orbital satellites
-        # Calculate orbital position based on time
-        orbital_phase = (time_factor * 2 * np.pi / sat['period']) + sat['phase']
-        inclination = np.radians(sat['inclination'])
-        
-        x = radius * np.cos(orbital_phase) * np.cos(inclination)
-        y = radius * np.sin(orbital_phase)
-        z = radius * np.cos(orbital_phase) * np.sin(inclination)
-    
-    return x, y, z
+    """
+    Calculate satellite positions at given time.
+    
+    Args:
+        sat: One catalog entry or a whole catalog array (vectorized)
+        time_factor (float): Animation time
+    
+    Returns:
+        tuple: (x, y, z) in km, scalars or arrays matching sat
+    """
+    orbital_phase = (time_factor * 2 * np.pi / sat['period']) + sat['phase']
+    return orbit_positions(sat, orbital_phase)
 
-def create_animated_viewer(satellite_filter='all', manual_zoom=None):
-    """Create animated satellite viewer with proper scales and filtering."""
+def select_labelled(satellites, count=None):
+    """
+    Pick the satellites that get a label and a trail.
+    
+    Args:
+        satellites (numpy.ndarray): Catalog being drawn
+        count (int): Number to label (default: all up to MAX_LABELLED, else DEFAULT_LABELLED)
+    
+    Returns:
+        numpy.ndarray: Indices into satellites, spread evenly over the catalog
+    """
+    if count is None:
+        count = len(satellites) if len(satellites) <= MAX_LABELLED else DEFAULT_LABELLED
+    count = min(count, len(satellites))
+    return np.unique(np.linspace(0, len(satellites) - 1, count).round().astype(int)) if count else np.zeros(0, int)
+
+def build_animated_viewer(satellite_filter='all', manual_zoom=None, catalog_path=None,
+                          catalog=None, labels=None):
+    """
+    Build the animated viewer figure without showing it.
+    
+    All satellites are drawn as one point collection, so tens of thousands of
+    objects animate with one vectorized position update per frame. Labels and
+    orbit trails are only drawn for a subset (see select_labelled()), and of
+    those labels only the ones that do not overlap are shown on each frame.
+    
+    Args:
+        satellite_filter (str): Orbit class to show ('all', 'leo', 'meo', 'geo')
+        manual_zoom (float): Zoom factor (default: per-filter setting)
+        catalog_path (str): Element catalog to load (default: catalogs/realistic.csv)
+        catalog (numpy.ndarray): Already loaded catalog, e.g. from walker_delta()
+        labels (int): Number of satellites to label and trail (default: see select_labelled())
+    
+    Returns:
+        tuple: (figure, animate function taking a frame number)
+    """
     
     # Create figure
     fig = plt.figure(figsize=(16, 12), facecolor='black')
@@ -98,73 +130,39 @@ def create_animated_viewer(satellite_filter='all', manual_zoom=None):
     ax._axis3don = False
     
     # Get satellite data and filter
-    all_satellites = create_realistic_satellite_data()
-    
-    if satellite_filter == 'leo':
-        satellites = [s for s in all_satellites if s['altitude'] < 1000]
-        title_suffix = f"LEO Only ({len(satellites)} satellites)"
-        earth_scale = 0.1  # Make Earth much smaller for LEO view
-        zoom_factor = manual_zoom if manual_zoom is not None else 0.3  # Zoom in to see small differences
-    elif satellite_filter == 'meo':
-        satellites = [s for s in all_satellites if 1000 < s['altitude'] < 30000]
-        title_suffix = f"MEO Only ({len(satellites)} satellites)"
-        earth_scale = 0.3
-        zoom_factor = manual_zoom if manual_zoom is not None else 0.8
-    elif satellite_filter == 'geo':
-        satellites = [s for s in all_satellites if 30000 < s['altitude'] < 100000]
-        title_suffix = f"GEO Only ({len(satellites)} satellites)"
-        earth_scale = 0.5
-        zoom_factor = manual_zoom if manual_zoom is not None else 1.0
-    else:  # 'all'
-        satellites = all_satellites
-        title_suffix = f"All Orbits ({len(satellites)} satellites)"
-        earth_scale = 0.2
-        zoom_factor = manual_zoom if manual_zoom is not None else 1.0
+    all_satellites = catalog if catalog is not None else create_realistic_satellite_data(catalog_path)
+    satellites = select_orbit_class(all_satellites, satellite_filter)
+    title, earth_scale, default_zoom = VIEW_SETTINGS[satellite_filter]
+    title_suffix = f"{title} ({len(satellites):,} satellites)"
+    zoom_factor = manual_zoom if manual_zoom is not None else default_zoom
+    labelled = select_labelled(satellites, labels)
+    dense = len(satellites) > MAX_LABELLED
     
     # Create Earth (smaller for better satellite visibility)
     earth_x, earth_y, earth_z, earth_radius = create_realistic_earth(earth_scale)
     ax.plot_surface(earth_x, earth_y, earth_z, 
                    color='#4A90E2', alpha=0.8, shade=True)
     
-    # Create orbital trails (static)
-    trail_lines = []
-    for sat in satellites:
-        radius = EARTH_RADIUS_KM + sat['altitude']
-        
-        if 'longitude' in sat:  # Geostationary - just a point
-            longitude = np.radians(sat['longitude'])
-            x = radius * np.cos(longitude)
-            y = radius * np.sin(longitude)
-            z = 0
-            trail_line, = ax.plot([x], [y], [z], 
-                                 color=sat['color'], linewidth=2, alpha=0.7)
-        else:  # Orbital satellites
-            times = np.linspace(0, 2*np.pi, 100)
-            inclination = np.radians(sat['inclination'])
-            x = radius * np.cos(times + sat['phase']) * np.cos(inclination)
-            y = radius * np.sin(times + sat['phase'])
-            z = radius * np.cos(times + sat['phase']) * np.sin(inclination)
-            trail_line, = ax.plot(x, y, z, 
-                                 color=sat['color'], linewidth=2, alpha=0.7)
-        
-        trail_lines.append(trail_line)
-    
-    # Create satellite markers (will be animated)
-    satellite_markers = []
+    # Create orbital trails (static) for the labelled subset
+    shown = satellites[labelled]
+    times = np.linspace(0, 2*np.pi, 100)
+    trail_x, trail_y, trail_z = orbit_positions(shown[:, None], shown['phase'][:, None] + times)
+    for sat, x, y, z in zip(shown, trail_x, trail_y, trail_z):
+        ax.plot(x, y, z, color=sat['color'], linewidth=2, alpha=0.7)
+    
+    # Create satellite markers (will be animated): one collection for all
+    x, y, z = calculate_satellite_position(satellites, 0)
+    satellite_markers = ax.scatter(x, y, z,
+                                   c=satellites['color'].tolist(), s=satellites['size'], alpha=0.9,
+                                   edgecolors='none' if dense else 'white',
+                                   linewidth=0 if dense else 2, depthshade=not dense,
+                                   antialiased=not dense)
+    
+    # Labels
     satellite_labels = []
-    
-    for sat in satellites:
-        # Initial position
-        x, y, z = calculate_satellite_position(sat, 0)
-        
-        # Satellite marker
-        marker = ax.scatter([x], [y], [z], 
-                           c=sat['color'], s=sat['size'], alpha=0.9, 
-                           edgecolors='white', linewidth=2)
-        satellite_markers.append(marker)
-        
-        # Label
-        label = ax.text(x, y, z + 1000,
+    for idx in labelled:
+        sat = satellites[idx]
+        label = ax.text(x[idx], y[idx], z[idx] + 1000,
                        sat['id'],
                        fontsize=8, fontweight='bold', color='white',
                        ha='center', va='bottom',
@@ -174,7 +172,7 @@ def create_animated_viewer(satellite_filter='all', manual_zoom=None):
         satellite_labels.append(label)
     
     # Set proper scale based on highest altitude and zoom factor
-    max_altitude = max(sat['altitude'] for sat in satellites)
+    max_altitude = satellites['altitude'].max()
     max_range = (EARTH_RADIUS_KM + max_altitude + 10000) * zoom_factor
     
     ax.set_xlim([-max_range, max_range])
@@ -195,30 +193,31 @@ def create_animated_viewer(satellite_filter='all', manual_zoom=None):
     
     # Scale legend
     if satellite_filter == 'leo':
+        # One example per distinct altitude, lowest first
+        _, first = np.unique(satellites['altitude'], return_index=True)
+        examples = '\n'.join(f"🛰️ {sat['id']}: {sat['altitude']:,.0f} km, {sat['period']:.1f} min"
+                             for sat in satellites[first[:5]])
         scale_text = f"""
 LEO ZOOMED VIEW:
 🌍 Earth radius: {earth_radius:,.0f} km (scaled down for visibility)
-🛰️ LEO range: {min(s['altitude'] for s in satellites):,} - {max(s['altitude'] for s in satellites):,} km
-🛰️ Orbital periods: {min(s['period'] for s in satellites):.1f} - {max(s['period'] for s in satellites):.1f} minutes
+🛰️ LEO range: {satellites['altitude'].min():,.0f} - {satellites['altitude'].max():,.0f} km
+🛰️ Orbital periods: {satellites['period'].min():.1f} - {satellites['period'].max():.1f} minutes
 🔍 Zoom factor: {zoom_factor:.1f}x (zoomed in to see small differences)
 
 LEO SATELLITES (showing small orbital variations):
-🛰️ ISS: {satellites[0]['altitude']:,} km, {satellites[0]['period']:.1f} min
-🛰️ Hubble: {satellites[1]['altitude']:,} km, {satellites[1]['period']:.1f} min
-🛰️ Landsat: {satellites[2]['altitude']:,} km, {satellites[2]['period']:.1f} min
-🛰️ Sentinel: {satellites[6]['altitude']:,} km, {satellites[6]['period']:.1f} min
-🛰️ NOAA: {satellites[9]['altitude']:,} km, {satellites[9]['period']:.1f} min
+{examples}
 
 Note: Earth is scaled down to show subtle orbital differences
         """
     else:
+        ranges = {cls: altitude_range(all_satellites, cls) for cls in ('leo', 'meo', 'geo', 'deep')}
         scale_text = f"""
 SCALE REFERENCE:
 🌍 Earth radius: {EARTH_RADIUS_KM:,} km
-🛰️ LEO: {min(s['altitude'] for s in all_satellites if s['altitude'] < 1000):,} - {max(s['altitude'] for s in all_satellites if s['altitude'] < 1000):,} km
-🛰️ MEO: {min(s['altitude'] for s in all_satellites if 1000 < s['altitude'] < 30000):,} km  
-🛰️ GEO: {min(s['altitude'] for s in all_satellites if s['altitude'] > 30000):,} km
-🛰️ Deep Space: {min(s['altitude'] for s in all_satellites if s['altitude'] > 100000):,} km
+🛰️ LEO: {ranges['leo'][0]:,.0f} - {ranges['leo'][1]:,.0f} km
+🛰️ MEO: {ranges['meo'][0]:,.0f} km  
+🛰️ GEO: {ranges['geo'][0]:,.0f} km
+🛰️ Deep Space: {ranges['deep'][0]:,.0f} km
 
 ORBITAL PERIODS:
 🛰️ LEO: ~90-100 minutes (fast)
@@ -238,16 +237,93 @@ ORBITAL PERIODS:
     def animate(frame):
         time_factor = frame * 0.05  # Slower animation for better visibility
         
-        for i, sat in enumerate(satellites):
-            x, y, z = calculate_satellite_position(sat, time_factor)
-            
-            # Update satellite position
-            satellite_markers[i]._offsets3d = ([x], [y], [z])
-            
-            # Update label position
-            satellite_labels[i].set_position_3d((x, y, z + 1000))
+        # Update all satellite positions at once
+        x, y, z = calculate_satellite_position(satellites, time_factor)
+        satellite_markers._offsets3d = (x, y, z)
+        
+        # Update label positions, then hide those that overlap (closest kept)
+        for label, idx in zip(satellite_labels, labelled):
+            label.set_position_3d((x[idx], y[idx], z[idx] + 1000))
+        declutter_3d(ax, satellite_labels, pad=0.2)
         
-        return satellite_markers + satellite_labels
+        return [satellite_markers] + satellite_labels
+    
+    return fig, animate
+
+def build_sprite_viewer(satellite_filter='all', manual_zoom=None, catalog_path=None,
+                        catalog=None, labels=None, width=1200, height=900):
+    """
+    Build the animated viewer on the NumPy sprite renderer instead of mplot3d.
+    
+    Each frame is one RGBA image (see sprite_renderer.py) copied to the
+    canvas, so the cost per frame grows with the pixels covered rather than
+    with the number of artists. step() only moves the satellites; the view
+    puts the frame on screen (SpriteView.update() or SpriteView.animate()).
+    Dragging rotates the view and scrolling zooms.
+    
+    Args:
+        satellite_filter (str): Orbit class to show ('all', 'leo', 'meo', 'geo')
+        manual_zoom (float): Zoom factor (default: per-filter setting)
+        catalog_path (str): Element catalog to load (default: catalogs/realistic.csv)
+        catalog (numpy.ndarray): Already loaded catalog, e.g. from walker_delta()
+        labels (int): Number of satellites to label and trail (default: see select_labelled())
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+    
+    Returns:
+        tuple: (SpriteView, step function taking a frame number)
+    """
+    from matplotlib.colors import to_rgba_array
+    from label_layout import declutter_sprite, sprite_labels
+    from sprite_renderer import SpriteRenderer, SpriteView
+    
+    all_satellites = catalog if catalog is not None else create_realistic_satellite_data(catalog_path)
+    satellites = select_orbit_class(all_satellites, satellite_filter)
+    title, earth_scale, default_zoom = VIEW_SETTINGS[satellite_filter]
+    zoom_factor = manual_zoom if manual_zoom is not None else default_zoom
+    labelled = select_labelled(satellites, labels)
+    
+    max_range = (EARTH_RADIUS_KM + satellites['altitude'].max() + 10000) * zoom_factor
+    renderer = SpriteRenderer(width, height, extent=max_range, earth_scale=earth_scale)
+    colors = to_rgba_array(satellites['color'].tolist()).astype(np.float32)
+    radii = np.clip(np.sqrt(satellites['size']) / 3, 1.0, 4.0)  # scatter sizes are in points^2
+    
+    # Static orbit trails for the labelled subset
+    shown = satellites[labelled]
+    trail = np.stack(orbit_positions(shown[:, None], shown['phase'][:, None] + np.linspace(0, 2*np.pi, 100)),
+                     axis=-1)
+    trail_colors = colors[labelled].copy()
+    trail_colors[:, 3] = 0.7
+    
+    state = {'points': np.column_stack(calculate_satellite_position(satellites, 0))}
+    texts = []
+    
+    def draw():
+        image = renderer.render(state['points'], colors, radii, trail, trail_colors, 2.0)
+        declutter_sprite(renderer, texts, state['points'][labelled], ids=shown['id'].tolist(), pad=0.2)
+        return image
+    
+    view = SpriteView(renderer, draw,
+                      title=f'REALISTIC SATELLITE VIEWER - {title} ({len(satellites):,} satellites)')
+    texts += sprite_labels(view.ax, shown['id'].tolist(), colors[labelled])
+    view.image.set_data(draw())
+    
+    def step(frame):
+        state['points'] = np.column_stack(calculate_satellite_position(satellites, frame * 0.05))
+    
+    return view, step
+
+def create_animated_viewer(satellite_filter='all', manual_zoom=None, catalog_path=None,
+                           catalog=None, labels=None, renderer='mplot3d'):
+    """Create animated satellite viewer with proper scales and filtering (mplot3d or sprite renderer)."""
+    if renderer == 'sprite':
+        # Frames are blitted by the view on its own timer rather than by FuncAnimation
+        view, step = build_sprite_viewer(satellite_filter, manual_zoom, catalog_path, catalog, labels)
+        timer = view.animate(step, interval_ms=100)
+        plt.show()
+        return timer
+    
+    fig, animate = build_animated_viewer(satellite_filter, manual_zoom, catalog_path, catalog, labels)
     
     # Create animation
     anim = animation.FuncAnimation(fig, animate, frames=1000, 
@@ -256,6 +332,50 @@ ORBITAL PERIODS:
     plt.show()
     return anim
 
+def walker_grid(count):
+    """Split count satellites into (planes, per_plane) with planes the largest divisor <= sqrt(count)."""
+    planes = next(p for p in range(int(np.sqrt(count)), 0, -1) if count % p == 0)
+    return planes, count // planes
+
+def benchmark_frame_rate(counts=BENCHMARK_COUNTS, frames=20, inclination=53.0, altitude=550.0,
+                         renderer='mplot3d'):
+    """
+    Measure animation frame rate for Walker-delta constellations of several sizes.
+    
+    Each frame is one position update plus putting the result on the canvas:
+    a full canvas draw for mplot3d, the sprite viewer's own blit otherwise.
+    
+    Args:
+        counts (tuple): Constellation sizes to measure
+        frames (int): Frames to time per size
+        inclination (float): Constellation inclination in degrees
+        altitude (float): Constellation altitude in km
+        renderer (str): 'mplot3d' or 'sprite' (see build_sprite_viewer())
+    
+    Returns:
+        dict: Frames per second by constellation size
+    """
+    results = {}
+    for count in counts:
+        planes, per_plane = walker_grid(count)
+        catalog = walker_delta(planes, per_plane, inclination, altitude)
+        if renderer == 'sprite':
+            view, step = build_sprite_viewer('all', catalog=catalog)
+            fig, show = view.fig, view.update
+        else:
+            fig, step = build_animated_viewer('all', catalog=catalog)
+            show = fig.canvas.draw
+        step(0)
+        fig.canvas.draw()
+        start = time.perf_counter()
+        for frame in range(1, frames + 1):
+            step(frame)
+            show()
+        results[count] = frames / (time.perf_counter() - start)
+        plt.close(fig)
+        print(f"{count:>8,} objects ({planes} x {per_plane}): {results[count]:6.1f} fps")
+    return results
+
 def main():
     """Main function with command line options."""
     parser = argparse.ArgumentParser(description='Realistic Animated Satellite Viewer')
@@ -267,34 +387,70 @@ def main():
                        type=float,
                        default=None,
                        help='Manual zoom factor (smaller = more zoomed in, default: auto)')
+    parser.add_argument('--catalog', '-c',
+                       default=None,
+                       help='Element catalog to load (.csv, .npy or .parquet, default: catalogs/realistic.csv)')
+    parser.add_argument('--walker', '-w',
+                       metavar='PLANES:PER_PLANE:INC:ALT_KM[:F]',
+                       default=None,
+                       help='Show a generated Walker-delta constellation instead of a catalog, '
+                            'e.g. 72:22:53:550 (F = phasing factor, default: 1)')
+    parser.add_argument('--labels',
+                       type=int,
+                       default=None,
+                       help=f'Number of satellites to label and trail (default: all up to {MAX_LABELLED}, '
+                            f'else {DEFAULT_LABELLED})')
+    parser.add_argument('--renderer',
+                       choices=['mplot3d', 'sprite'],
+                       default='mplot3d',
+                       help='3D backend: mplot3d artists, or the NumPy sprite renderer for '
+                            'large scenes (default: mplot3d)')
+    parser.add_argument('--benchmark',
+                       action='store_true',
+                       help='Report frame rate for ' + ', '.join(f'{n:,}' for n in BENCHMARK_COUNTS) +
+                            '-object Walker constellations and exit')
     
     args = parser.parse_args()
     
+    if args.benchmark:
+        print(f"Measuring animation frame rate with {args.renderer} (position update + canvas update per frame)...")
+        benchmark_frame_rate(renderer=args.renderer)
+        return
+    
     print("Creating Realistic Animated Satellite Viewer...")
     print("Proper orbital scales and realistic movement!")
     
-    all_satellites = create_realistic_satellite_data()
+    if args.walker:
+        fields = args.walker.split(':')
+        if len(fields) not in (4, 5):
+            parser.error(f"--walker expects PLANES:PER_PLANE:INC:ALT_KM[:F], got '{args.walker}'")
+        planes, per_plane = int(fields[0]), int(fields[1])
+        catalog = walker_delta(planes, per_plane, float(fields[2]), float(fields[3]),
+                               phasing=int(fields[4]) if len(fields) == 5 else 1)
+        print(f"\n🛰️ Walker-delta constellation: {len(catalog):,} satellites "
+              f"({planes} planes x {per_plane}, {fields[2]} deg, {fields[3]} km)")
+    else:
+        catalog = create_realistic_satellite_data(args.catalog)
+    satellites = select_orbit_class(catalog, args.filter)
     
     if args.filter == 'leo':
-        satellites = [s for s in all_satellites if s['altitude'] < 1000]
         print(f"\n🛰️ LEO View: {len(satellites)} satellites")
         print("Shows small differences in LEO orbits (400-800 km altitude)")
     elif args.filter == 'meo':
-        satellites = [s for s in all_satellites if 1000 < s['altitude'] < 30000]
         print(f"\n🛰️ MEO View: {len(satellites)} satellites")
         print("Shows GPS constellation at ~20,200 km altitude")
     elif args.filter == 'geo':
-        satellites = [s for s in all_satellites if 30000 < s['altitude'] < 100000]
         print(f"\n🛰️ GEO View: {len(satellites)} satellites")
         print("Shows geostationary satellites at ~35,786 km altitude")
     else:
-        satellites = all_satellites
         print(f"\n🛰️ All Orbits: {len(satellites)} satellites")
         print("Shows all orbital types with proper scales")
     
     print(f"\nLoaded {len(satellites)} satellites with REAL orbital parameters:")
     
-    if args.filter == 'leo':
+    if args.walker:
+        print(f"🛰️ Drawn as one point collection; {len(select_labelled(satellites, args.labels))} labelled with trails")
+    elif args.filter == 'leo':
         print("🛰️ LEO (400-800 km): ISS, Hubble, Landsat, Aqua, Terra, Aura, Sentinel, NOAA")
         print("🛰️ Small altitude differences create visible orbital variations")
     elif args.filter == 'meo':
@@ -308,24 +464,25 @@ def main():
         print("🛰️ Deep Space (1.5M km): ACE, SOHO")
     
     print("\nOrbital periods:")
-    leo_sats = [s for s in satellites if s['altitude'] < 1000]
-    meo_sats = [s for s in satellites if 1000 < s['altitude'] < 30000]
-    geo_sats = [s for s in satellites if 30000 < s['altitude'] < 100000]
-    deep_sats = [s for s in satellites if s['altitude'] > 100000]
+    leo_sats = select_orbit_class(satellites, 'leo')
+    meo_sats = select_orbit_class(satellites, 'meo')
+    geo_sats = select_orbit_class(satellites, 'geo')
+    deep_sats = select_orbit_class(satellites, 'deep')
     
-    if leo_sats:
+    if len(leo_sats):
         print(f"🛰️ LEO: {len(leo_sats)} satellites, ~{leo_sats[0]['period']:.1f} min periods")
-    if meo_sats:
+    if len(meo_sats):
         print(f"🛰️ MEO: {len(meo_sats)} satellites, ~{meo_sats[0]['period']/3600:.1f} hour periods")
-    if geo_sats:
+    if len(geo_sats):
         print(f"🛰️ GEO: {len(geo_sats)} satellites, ~{geo_sats[0]['period']/3600:.1f} hour periods")
-    if deep_sats:
+    if len(deep_sats):
         print(f"🛰️ Deep Space: {len(deep_sats)} satellites, ~{deep_sats[0]['period']/(365*24*3600):.1f} year periods")
     
     print(f"\nCreating {args.filter.upper()} animated visualization...")
     if args.zoom is not None:
         print(f"🔍 Using manual zoom factor: {args.zoom:.2f}x")
-    anim = create_animated_viewer(args.filter, args.zoom)
+    anim = create_animated_viewer(args.filter, args.zoom, catalog=catalog, labels=args.labels,
+                                  renderer=args.renderer)
     
     print("✅ Realistic animated satellite viewer created!")
     print("\nFeatures:")
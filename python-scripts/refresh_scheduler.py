@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Resolution-Aware Refresh Scheduling
+
+Real-time mode normally refetches every satellite's whole window on one
+global update interval. A geostationary satellite is then fetched as often as
+the ISS, and satellites whose SSC resolution is coarser than the interval are
+fetched again before SSC has a newer sample to return.
+
+RefreshScheduler gives every satellite its own refresh interval instead:
+
+- Resolution: SSC publishes a satellite's positions at its catalog
+  Resolution (seconds), so it is never refreshed more often than that.
+- Motion: the time it takes to move the display tolerance (default 0.5
+  degrees of arc) at the satellite's fastest expected ground-track rate. That
+  rate is the larger of the fastest rate seen over the stored window and the
+  rate at perigee of the two-body orbit through its two newest samples (less
+  Earth's rotation), so an eccentric orbit seen near apogee is not left
+  alone until it has swept through perigee. A satellite that needs longer
+  than its resolution to move that far is refreshed at that slower cadence,
+  up to a maximum interval. LEO satellites therefore keep their native
+  resolution, while geostationary and distant satellites are refreshed
+  rarely.
+
+Next-due times are kept in a heap. On each tick every satellite that is due
+is popped, together with satellites due before the next tick that already
+have a new sample. They are fetched in as few get_locations calls as
+possible, each covering only the gap since the newest stored samples of its
+satellites: satellites whose newest samples lie within a few resolution
+steps of each other share a call, so a satellite refreshed rarely does not
+make the others refetch everything since its older sample. The new samples
+are appended to the cached tracks, which are trimmed to the time window.
+"""
+
+import heapq
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+from frames import convert as convert_frame
+from satellite_tracker import (DEFAULT_RESOLUTION_S, EARTH_MU_KM3_S2, catalog_resolutions, fetch_satellite_positions,
+                               times_to_epoch_seconds)
+
+DEFAULT_TOLERANCE_DEG = 0.5
+DEFAULT_MAX_INTERVAL_S = 1800.0
+DEFAULT_RETRY_S = 60.0
+DEFAULT_REFETCH_STEPS = 4
+EARTH_ROTATION_DEG_S = 360.0 / 86164.0905
+_TRACK_FIELDS = ('latitudes', 'longitudes', 'altitudes', 'x', 'y', 'z')
+
+
+def angular_rate(epochs, xyz):
+    """
+    Return the angular rate of each satellite between its two newest samples.
+
+    Args:
+        epochs (array): (n, 2) epoch seconds of the two newest samples
+        xyz (array): (n, 2, 3) matching GEO positions
+
+    Returns:
+        numpy.ndarray: (n,) degrees of arc per second as seen from Earth's centre
+    """
+    a, b = xyz[:, 0], xyz[:, 1]
+    angle = np.arctan2(np.linalg.norm(np.cross(a, b), axis=1), np.einsum('ni,ni->n', a, b))
+    return np.degrees(angle) / np.maximum(epochs[:, 1] - epochs[:, 0], 1e-9)
+
+
+def window_rate(tracks):
+    """
+    Return the fastest angular rate between consecutive samples of each track.
+
+    Args:
+        tracks (list): Cached tracks with 'epochs', 'x', 'y' and 'z' arrays,
+                       each with at least two samples
+
+    Returns:
+        numpy.ndarray: (n,) degrees of arc per second
+    """
+    epochs = np.concatenate([track['epochs'] for track in tracks])
+    xyz = np.column_stack([np.concatenate([track[axis] for track in tracks]) for axis in ('x', 'y', 'z')])
+    ends = np.cumsum([len(track['epochs']) for track in tracks])
+    pairs = np.ones(len(epochs) - 1, dtype=bool)
+    pairs[ends[:-1] - 1] = False  # No pair across two tracks
+    rate = angular_rate(np.column_stack([epochs[:-1], epochs[1:]])[pairs],
+                        np.stack([xyz[:-1], xyz[1:]], axis=1)[pairs])
+    return np.maximum.reduceat(rate, np.concatenate([[0], ends[:-1] - np.arange(1, len(tracks))]))
+
+
+def perigee_rate(epochs, xyz):
+    """
+    Return the ground-track rate at perigee of the orbit through two samples.
+
+    The two GEO samples are rotated into GEI, a chord velocity gives the
+    two-body angular momentum h and eccentricity e, and the angular rate at
+    perigee is h / r_p**2 with r_p = h**2 / (mu (1 + e)). Earth's rotation is
+    subtracted (clipped at zero), so a geostationary satellite stays at rest.
+
+    Args:
+        epochs (array): (n, 2) epoch seconds of the two newest samples
+        xyz (array): (n, 2, 3) matching GEO positions in km
+
+    Returns:
+        numpy.ndarray: (n,) degrees of arc per second
+    """
+    gei = convert_frame(xyz.reshape(-1, 3), epochs.reshape(-1), 'geo', 'gei').reshape(-1, 2, 3)
+    r = (gei[:, 0] + gei[:, 1]) / 2
+    v = (gei[:, 1] - gei[:, 0]) / np.maximum(epochs[:, 1] - epochs[:, 0], 1e-9)[:, None]
+    h = np.linalg.norm(np.cross(r, v), axis=1)
+    energy = np.einsum('ni,ni->n', v, v) / 2 - EARTH_MU_KM3_S2 / np.linalg.norm(r, axis=1)
+    e = np.sqrt(np.maximum(1 + 2 * energy * h**2 / EARTH_MU_KM3_S2**2, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.degrees(EARTH_MU_KM3_S2**2 * (1 + e)**2 / h**3)
+    return np.maximum(np.nan_to_num(rate, nan=0.0) - EARTH_ROTATION_DEG_S, 0)
+
+
+def refresh_intervals(resolution, rate, tolerance_deg=DEFAULT_TOLERANCE_DEG,
+                      max_interval_s=DEFAULT_MAX_INTERVAL_S):
+    """
+    Return refresh intervals from resolutions and observed angular rates.
+
+    The interval is the time to move tolerance_deg, clipped to
+    [resolution, max(resolution, max_interval_s)] and rounded down to a whole
+    number of resolution steps (SSC samples fall on multiples of it).
+
+    Args:
+        resolution (array): (n,) catalog resolutions in seconds
+        rate (array): (n,) angular rates in degrees per second
+        tolerance_deg (float): Display tolerance in degrees of arc
+        max_interval_s (float): Longest interval for slow satellites
+
+    Returns:
+        numpy.ndarray: (n,) intervals in seconds
+    """
+    resolution = np.asarray(resolution, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        interval = tolerance_deg / np.asarray(rate, dtype=np.float64)
+    interval = np.clip(interval, resolution, np.maximum(resolution, max_interval_s))
+    return np.floor(interval / resolution) * resolution
+
+
+def fetch_groups(last, resolution, window_start, refetch_steps=DEFAULT_REFETCH_STEPS):
+    """
+    Split satellites into fetches that each start at the oldest newest sample of their members.
+
+    Satellites are taken in order of their newest sample, and one joins the
+    current group while that costs it at most refetch_steps samples it already
+    has. Satellites without a sample are fetched over the whole window.
+
+    Args:
+        last (dict): Epoch seconds of the newest stored sample (or None) by satellite ID
+        resolution (dict): Resolution in seconds by satellite ID
+        window_start (float): Epoch seconds where the window starts
+        refetch_steps (int): Stored samples a satellite may fetch again to share a call
+
+    Returns:
+        list: (satellite IDs, start epoch seconds) tuples
+    """
+    groups = []
+    for sat_id in sorted((sat_id for sat_id, t in last.items() if t is not None), key=last.get):
+        start = max(window_start, last[sat_id])
+        if groups and start - groups[-1][1] <= refetch_steps * resolution[sat_id]:
+            groups[-1][0].append(sat_id)
+        else:
+            groups.append(([sat_id], start))
+    missing = [sat_id for sat_id, t in last.items() if t is None]
+    return ([(missing, window_start)] if missing else []) + groups
+
+
+def _merge(old, new, window_start):
+    """
+    Append a fetched track to a cached one.
+
+    Returns:
+        tuple: (merged track with an 'epochs' array, trimmed to start at
+                window_start; number of samples that were new)
+    """
+    new_epochs = times_to_epoch_seconds(new['times'])
+    if old is not None and len(old['epochs']):
+        newer = new_epochs > old['epochs'][-1]
+    else:
+        newer = np.ones(len(new_epochs), dtype=bool)
+    epochs = new_epochs[newer] if old is None else np.concatenate([old['epochs'], new_epochs[newer]])
+    keep = int(np.searchsorted(epochs, window_start, side='left'))
+
+    def join(previous, values):
+        values = np.asarray(values)[newer]
+        return (values if previous is None else np.concatenate([previous, values]))[keep:]
+
+    track = {'id': new['id'], 'epochs': epochs[keep:]}
+    for field in _TRACK_FIELDS:
+        track[field] = join(None if old is None else old[field], new[field])
+    track['times'] = ([] if old is None else list(old['times'])) + [t for t, is_new in zip(new['times'], newer) if is_new]
+    track['times'] = track['times'][keep:]
+    track['coordinates'] = {
+        frame: {axis: join(None if old is None else old['coordinates'][frame][axis], block[axis])
+                for axis in ('x', 'y', 'z')}
+        for frame, block in new['coordinates'].items()
+    }
+    return track, int(newer.sum())
+
+
+class RefreshScheduler:
+    """
+    Per-satellite refresh cadence with batched fetches of the due satellites.
+
+    Args:
+        satellite_ids (list): Satellite IDs to track
+        time_window_hours (float): Track window kept for each satellite (default: 1)
+        client: SSC client (default: None, the shared client)
+        tick_s (float): Seconds between calls to current_tracks(); satellites due
+                        before the next tick are fetched early when SSC already
+                        has a new sample for them (default: 0, no look-ahead)
+        tolerance_deg (float): Angular motion allowed between refreshes
+        max_interval_s (float): Refresh every satellite at least this often
+        coords (tuple): Coordinate frames to fetch (default: ('geo',))
+        resolutions (dict): Resolution in seconds by ID (default: read from the catalog)
+        refetch_steps (int): Stored samples a satellite may fetch again to share
+                             a call with satellites whose newest samples are older
+        log: Stream for error messages (default: None, sys.stderr)
+    """
+
+    def __init__(self, satellite_ids, time_window_hours=1, client=None, tick_s=0.0,
+                 tolerance_deg=DEFAULT_TOLERANCE_DEG, max_interval_s=DEFAULT_MAX_INTERVAL_S,
+                 coords=('geo',), resolutions=None, refetch_steps=DEFAULT_REFETCH_STEPS,
+                 log=None):
+        self.satellite_ids = list(satellite_ids)
+        self.time_window_hours = time_window_hours
+        self.client = client
+        self.tick_s = tick_s
+        self.tolerance_deg = tolerance_deg
+        self.max_interval_s = max_interval_s
+        self.coords = coords
+        self.refetch_steps = refetch_steps
+        self.log = log or sys.stderr
+        if resolutions is None:
+            resolutions = catalog_resolutions(client, self.log)
+        self.resolution = {sat_id: resolutions.get(sat_id, DEFAULT_RESOLUTION_S) for sat_id in self.satellite_ids}
+        self.interval = dict(self.resolution)
+        self.tracks = {}
+        self.fetch_calls = 0
+        self.fetched_satellites = 0
+        self.fetched_samples = 0
+        self._queue = [(-np.inf, sat_id) for sat_id in self.satellite_ids]
+        heapq.heapify(self._queue)
+        self._due_at = dict.fromkeys(self.satellite_ids, -np.inf)
+
+    def _last_epoch(self, sat_id):
+        track = self.tracks.get(sat_id)
+        return track['epochs'][-1] if track is not None and len(track['epochs']) else None
+
+    def _schedule(self, sat_id, when):
+        self._due_at[sat_id] = when
+        heapq.heappush(self._queue, (when, sat_id))
+
+    def due(self, now):
+        """
+        Pop and return the satellites to fetch at epoch now.
+
+        Satellites due by now are always included; those due before the next
+        tick are included too when their resolution says SSC already has a
+        sample newer than the stored one.
+        """
+        due, waiting = [], []
+        while self._queue and self._queue[0][0] <= now + self.tick_s:
+            when, sat_id = heapq.heappop(self._queue)
+            if when != self._due_at[sat_id]:
+                continue  # Superseded entry
+            last = self._last_epoch(sat_id)
+            if when > now and last is not None and now < last + self.resolution[sat_id]:
+                waiting.append((when, sat_id))  # Nothing new to fetch yet
+            else:
+                due.append(sat_id)
+        for entry in waiting:
+            heapq.heappush(self._queue, entry)
+        return due
+
+    def refresh(self, now):
+        """
+        Fetch the due satellites in as few calls as possible and reschedule them.
+
+        Satellites without a cached track are fetched over the whole window;
+        the others in calls grouped by their newest samples (see fetch_groups()).
+
+        Returns:
+            list: IDs that were refetched
+        """
+        due = self.due(now)
+        if not due:
+            return due
+        window_start = now - self.time_window_hours * 3600
+        groups = fetch_groups({sat_id: self._last_epoch(sat_id) for sat_id in due}, self.resolution,
+                              window_start, self.refetch_steps)
+
+        fetched = []
+        end = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)
+        for ids, start in groups:
+            try:
+                fetched += fetch_satellite_positions(
+                    ids, client=self.client, raise_errors=True, verbose=False, coords=self.coords,
+                    start_time=datetime.fromtimestamp(start, timezone.utc).replace(tzinfo=None), end_time=end)
+                self.fetch_calls += 1
+                self.fetched_satellites += len(ids)
+            except Exception as e:
+                print(f"Error refreshing {len(ids)} satellite(s): {e}", file=self.log)
+
+        self.add(fetched, now, due)
+        return due
+
+    def add(self, satellite_data, now, satellite_ids=None):
+        """
+        Merge fetched tracks into the cache and schedule the next refresh of each satellite.
+
+        Also used to seed the scheduler with an initial full-window fetch.
+
+        Args:
+            satellite_data (list): Satellite data dictionaries from fetch_satellite_positions()
+            now (float): Epoch seconds of the fetch
+            satellite_ids (list): Satellites that were requested, including any that
+                                  returned no data (default: those in satellite_data)
+        """
+        window_start = now - self.time_window_hours * 3600
+        added = {}
+        for sat in satellite_data:
+            if sat['id'] not in self.resolution:
+                continue
+            self.fetched_samples += len(sat['times'])
+            self.tracks[sat['id']], added[sat['id']] = _merge(self.tracks.get(sat['id']), sat, window_start)
+        self._reschedule([sat['id'] for sat in satellite_data if sat['id'] in self.resolution]
+                         if satellite_ids is None else satellite_ids, added, now)
+
+    def _reschedule(self, ids, added, now):
+        """Set new intervals from the expected motion and queue the next refresh of each satellite."""
+        moving = [sat_id for sat_id in ids if sat_id in self.tracks and len(self.tracks[sat_id]['epochs']) >= 2]
+        if moving:
+            epochs = np.array([self.tracks[sat_id]['epochs'][-2:] for sat_id in moving])
+            xyz = np.array([np.column_stack([self.tracks[sat_id][axis][-2:] for axis in ('x', 'y', 'z')])
+                            for sat_id in moving])
+            # Fastest rate seen over the window, or expected at perigee if that is faster
+            rate = np.maximum(window_rate([self.tracks[sat_id] for sat_id in moving]), perigee_rate(epochs, xyz))
+            intervals = refresh_intervals([self.resolution[sat_id] for sat_id in moving], rate,
+                                          self.tolerance_deg, self.max_interval_s)
+            self.interval.update(zip(moving, intervals.tolist()))
+
+        for sat_id in ids:
+            last = self._last_epoch(sat_id)
+            if last is None:
+                self._schedule(sat_id, now + DEFAULT_RETRY_S)
+            elif added.get(sat_id):
+                # The next sample worth fetching is one interval after the newest one
+                self._schedule(sat_id, max(last + self.interval[sat_id], now))
+            else:
+                # SSC had nothing newer yet; try again one resolution step later
+                self._schedule(sat_id, now + self.resolution[sat_id])
+
+    def next_due(self):
+        """Return the earliest next-due epoch, or None if nothing is scheduled."""
+        return min(self._due_at.values()) if self._due_at else None
+
+    def current_tracks(self, now):
+        """
+        Refresh what is due, then return every cached track trimmed to the window.
+
+        Returns:
+            list: Satellite data dictionaries in fetch_satellite_positions() layout
+        """
+        self.refresh(now)
+        window_start = now - self.time_window_hours * 3600
+        tracks = []
+        for sat_id in self.satellite_ids:
+            track = self.tracks.get(sat_id)
+            if track is None:
+                continue
+            keep = int(np.searchsorted(track['epochs'], window_start, side='left'))
+            if keep:
+                self.tracks[sat_id] = track = {
+                    key: (value[keep:] if key not in ('id', 'coordinates') else value)
+                    for key, value in track.items()}
+                track['coordinates'] = {frame: {axis: values[keep:] for axis, values in block.items()}
+                                        for frame, block in track['coordinates'].items()}
+            if len(track['epochs']):
+                tracks.append(track)
+        return tracks
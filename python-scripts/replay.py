@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Time-Accurate Replay of Stored Tracks
+
+Plays back satellite tracks from a local TrackStore (see backfill.py) or
+ring-buffer history (see --history) at a fixed speed-up, without querying
+SSC. Playback is driven by the wall clock rather than by a frame counter:
+frame k is due k / fps seconds after the start and always shows the replay
+time start + k * speed / fps. When a frame takes longer than its budget, the
+frames that fell due in the meantime are skipped instead of played late, so
+the replay keeps time and only its smoothness suffers. The achieved and
+target frame rates and the number of dropped frames are shown while playing
+and printed at the end.
+
+Positions are interpolated linearly between stored samples for all
+satellites at once: every track is packed into one sorted key array, so a
+frame is a single np.searchsorted and a gather. Satellites are hidden while
+the replay time lies outside their samples or in a gap of more than a few
+sample intervals. Frames are drawn with the sprite renderer (see
+sprite_renderer.py).
+
+Usage:
+    python replay.py --store tracks/ --speed 3600
+    python replay.py --store history/ -s iss goes18 --speed 60 --fps 30
+    python replay.py --store tracks/ --start 2025-01-01T00:00:00 --end 2025-01-02T00:00:00
+    python replay.py --benchmark
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from position_query import DEFAULT_GAP_FACTOR, QUERY_FIELDS, gap_limit, track_samples
+from ring_store import RingStore
+from track_store import TrackStore
+
+SPEEDS = (1, 60, 3600)
+DEFAULT_SPEED = 60
+DEFAULT_FPS = 20
+TRAIL_S = 1800  # Replay seconds of track drawn behind each satellite
+TRAIL_POINTS = 24
+_LON_ROW = QUERY_FIELDS.index('longitudes')
+
+
+def load_stored_tracks(path, satellite_ids=None, start=None, end=None):
+    """
+    Read tracks from a TrackStore or RingStore directory.
+
+    A directory holding .ring files is read as a RingStore, anything else as
+    a TrackStore. Nothing is fetched.
+
+    Args:
+        path (str): Store directory
+        satellite_ids (list): Satellite IDs to read (default: None, every stored satellite)
+        start (float): Start epoch seconds, inclusive (default: None, from the first sample)
+        end (float): End epoch seconds, inclusive (default: None, to the last sample)
+
+    Returns:
+        list: Satellite data dictionaries with 'times' as epoch seconds
+              (satellites without samples in the range are left out)
+    """
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No track store at {path}")
+    if any(name.endswith('.ring') for name in os.listdir(path)):
+        store = RingStore(path)
+        read = store.track
+        satellite_ids = None if satellite_ids is None else [sat_id.lower() for sat_id in satellite_ids]
+    else:
+        store = TrackStore(path)
+        read = store.read_track
+    ids = store.satellites() if satellite_ids is None else satellite_ids
+    tracks = (read(sat_id, start, end) for sat_id in ids)
+    return [sat for sat in tracks if sat is not None and len(sat['times'])]
+
+
+class TrackPlayer:
+    """
+    Positions of every stored satellite at arbitrary replay times.
+
+    Each satellite's samples are sorted, deduplicated and shifted into its
+    own band of one concatenated key array (key = t - start + row * stride),
+    so the bracketing samples of all satellites at a time are found with one
+    np.searchsorted. Longitudes are unwrapped before interpolation.
+
+    Args:
+        satellite_data (list): Satellite data dictionaries (see load_stored_tracks();
+                               fetched tracks work as well)
+        gap_factor (float): Hide a satellite inside sample gaps longer than this
+                            many times its median sample interval (default: 3)
+    """
+
+    def __init__(self, satellite_data, gap_factor=DEFAULT_GAP_FACTOR):
+        satellites = [sat for sat in satellite_data if len(sat['times'])]
+        if not satellites:
+            raise ValueError("No stored samples to replay")
+        self.ids = [sat['id'] for sat in satellites]
+        samples = [track_samples(sat) for sat in satellites]
+        self.start = min(float(times[0]) for times, _ in samples)
+        self.end = max(float(times[-1]) for times, _ in samples)
+        self.stride = self.end - self.start + 1.0
+
+        keys, values, counts, gaps = [], [], [], []
+        for row, (times, block) in enumerate(samples):
+            keys.append(times - self.start + row * self.stride)
+            values.append(block.T)
+            counts.append(len(times))
+            gaps.append(gap_limit(times, gap_factor))
+        self._keys = np.concatenate(keys)
+        self._values = np.concatenate(values, axis=1)
+        self._last = np.cumsum(counts) - 1
+        self._first = self._last - np.asarray(counts) + 1
+        self._offsets = np.arange(len(satellites)) * self.stride
+        self._max_gap = np.asarray(gaps)
+
+    def sample(self, times):
+        """
+        Interpolate every satellite at a batch of replay times.
+
+        Args:
+            times (array): (m,) epoch seconds
+
+        Returns:
+            dict: (n, m) float arrays for 'latitudes', 'longitudes', 'altitudes'
+                  and 'x', 'y', 'z' (km, GEO), one row per satellite in self.ids;
+                  NaN where the satellite has no stored position
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        query = (times - self.start)[None, :] + self._offsets[:, None]
+        lo = np.searchsorted(self._keys, query, side='right') - 1
+        np.clip(lo, self._first[:, None], np.maximum(self._last - 1, self._first)[:, None], out=lo)
+        hi = np.minimum(lo + 1, self._last[:, None])
+        t0, t1 = self._keys[lo], self._keys[hi]
+        span = t1 - t0
+        s = (query - t0) / np.where(span > 0, span, 1.0)
+        known = (s >= 0) & (((s <= 1) & (span <= self._max_gap[:, None])) | (query == t0))
+
+        v0 = self._values[:, lo]
+        result = v0 + (self._values[:, hi] - v0) * s
+        result[_LON_ROW] = (result[_LON_ROW] + 180.0) % 360.0 - 180.0
+        result[:, ~known] = np.nan
+        return dict(zip(QUERY_FIELDS, result))
+
+    def positions(self, epoch):
+        """Return (n, 3) GEO positions in km at one replay time (NaN where unknown)."""
+        sampled = self.sample([epoch])
+        return np.column_stack([sampled[axis][:, 0] for axis in ('x', 'y', 'z')])
+
+    def trails(self, epoch, length_s=TRAIL_S, points=TRAIL_POINTS):
+        """Return (n, points, 3) GEO polylines over the length_s seconds up to epoch."""
+        sampled = self.sample(epoch - np.linspace(length_s, 0.0, points))
+        return np.stack([sampled[axis] for axis in ('x', 'y', 'z')], axis=-1)
+
+
+class FrameClock:
+    """
+    Wall-clock frame scheduler for replay at a fixed speed-up.
+
+    Frame k is due k / fps wall seconds after begin() and shows replay time
+    start + k * speed / fps. tick() returns the newest due frame, so frames
+    that fell due while the previous one was being drawn are dropped. With
+    loop=True, reaching end restarts the replay at start.
+
+    Args:
+        start (float): First replay time in epoch seconds
+        end (float): Last replay time in epoch seconds
+        speed (float): Replay seconds per wall-clock second (default: 60)
+        fps (float): Target frames per second (default: 20)
+        loop (bool): Start over after the end (default: True)
+        clock (callable): Wall clock in seconds (default: time.perf_counter)
+    """
+
+    def __init__(self, start, end, speed=DEFAULT_SPEED, fps=DEFAULT_FPS, loop=True, clock=time.perf_counter):
+        if speed <= 0 or fps <= 0:
+            raise ValueError("speed and fps must be positive")
+        self.start = float(start)
+        self.end = float(end)
+        self.speed = float(speed)
+        self.fps = float(fps)
+        self.loop = loop
+        self.clock = clock
+        self.frames = 0
+        self.dropped = 0
+        self.finished = False
+        self._origin = None
+        self._frame = -1
+        self._began = None
+
+    def begin(self, now=None):
+        """Start (or restart) the clock at frame 0."""
+        now = self.clock() if now is None else now
+        self._origin = now
+        self._frame = -1
+        if self._began is None:
+            self._began = now
+
+    def tick(self, now=None):
+        """
+        Return the replay time of the newest due frame, or None if it is already shown.
+
+        Call once per opportunity to draw (e.g. on every GUI timer event). The
+        frames skipped since the previous call are counted as dropped.
+        """
+        if self.finished:
+            return None
+        now = self.clock() if now is None else now
+        if self._origin is None:
+            self.begin(now)
+        frame = int((now - self._origin) * self.fps)
+        if frame <= self._frame:
+            return None
+        epoch = self.start + frame * self.speed / self.fps
+        if epoch > self.end:
+            if not self.loop:
+                self.finished = True
+                return None
+            self.dropped += max(0, int((self.end - self.start) * self.fps / self.speed) - self._frame)
+            self.begin(now)
+            frame, epoch = 0, self.start
+        self.dropped += frame - self._frame - 1
+        self._frame = frame
+        self.frames += 1
+        return epoch
+
+    def delay(self, now=None):
+        """Return the wall-clock seconds until the next frame is due."""
+        now = self.clock() if now is None else now
+        if self._origin is None:
+            return 0.0
+        return max(0.0, self._origin + (self._frame + 1) / self.fps - now)
+
+    def stats(self, now=None):
+        """
+        Return playback statistics since the first frame.
+
+        Returns:
+            dict: 'target_fps', 'achieved_fps', 'frames' (drawn), 'dropped',
+                  'speed' and 'elapsed_s'
+        """
+        now = self.clock() if now is None else now
+        elapsed = 0.0 if self._began is None else now - self._began
+        return {'target_fps': self.fps, 'achieved_fps': self.frames / elapsed if elapsed > 0 else 0.0,
+                'frames': self.frames, 'dropped': self.dropped, 'speed': self.speed, 'elapsed_s': elapsed}
+
+
+def format_stats(stats):
+    """Return a one-line summary of FrameClock.stats()."""
+    total = stats['frames'] + stats['dropped']
+    share = stats['dropped'] / total if total else 0.0
+    return (f"{stats['speed']:g}x: {stats['achieved_fps']:.1f} of {stats['target_fps']:g} fps, "
+            f"{stats['dropped']} of {total} frames dropped ({share:.0%})")
+
+
+def run_headless(clock, draw, duration_s):
+    """
+    Drive a FrameClock from a plain loop, sleeping until each frame is due.
+
+    Args:
+        clock (FrameClock): Frame scheduler
+        draw (callable): Called with the replay time of every frame shown
+        duration_s (float): Wall-clock seconds to run (or until a non-looping clock finishes)
+
+    Returns:
+        dict: FrameClock.stats() at the end
+    """
+    stop = clock.clock() + duration_s
+    clock.begin()
+    while not clock.finished and clock.clock() < stop:
+        epoch = clock.tick()
+        if epoch is not None:
+            draw(epoch)
+        time.sleep(min(clock.delay(), max(0.0, stop - clock.clock())))
+    return clock.stats()
+
+
+def _replay_scene(player, width=1000, height=800, extent=50000.0, colormap='tab20'):
+    """Return (renderer, draw(epoch) -> RGBA image, colours, state with the drawn 'points')."""
+    import matplotlib.pyplot as plt
+
+    from sprite_renderer import SpriteRenderer
+
+    renderer = SpriteRenderer(width, height, extent)
+    cmap = plt.get_cmap(colormap)
+    colors = np.array([cmap(i % cmap.N) for i in range(len(player.ids))], dtype=np.float32)
+    trail_colors = colors.copy()
+    trail_colors[:, 3] = 0.7
+    state = {}
+
+    def draw(epoch):
+        trails = player.trails(epoch)
+        state['points'] = trails[:, -1]
+        return renderer.render(points=state['points'], colors=colors, radii=4.0, trails=trails,
+                               trail_colors=trail_colors, trail_width=1.5)
+
+    return renderer, draw, colors, state
+
+
+def replay_tracks(satellite_data, speed=DEFAULT_SPEED, fps=DEFAULT_FPS, highlight=None, loop=True,
+                  width=1000, height=800):
+    """
+    Play stored tracks back in a window at a fixed speed-up.
+
+    Frames are scheduled by a FrameClock on a GUI timer that polls at twice
+    the target rate. The title shows the replay time, the achieved and
+    target frame rates and the dropped frames; the final statistics are
+    printed when the window is closed.
+
+    Args:
+        satellite_data (list): Satellite data dictionaries (see load_stored_tracks())
+        speed (float): Replay seconds per wall-clock second (default: 60)
+        fps (float): Target frames per second (default: 20)
+        highlight (list): Satellite IDs whose labels are placed first (default: None)
+        loop (bool): Start over after the end of the stored range (default: True)
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+
+    Returns:
+        dict: FrameClock.stats() when the window was closed
+    """
+    import matplotlib.pyplot as plt
+
+    from label_layout import declutter_sprite, sprite_labels
+    from sprite_renderer import SpriteView
+
+    player = TrackPlayer(satellite_data)
+    renderer, render, colors, state = _replay_scene(player, width, height)
+    clock = FrameClock(player.start, player.end, speed, fps, loop=loop)
+    labels = []
+    current = {'epoch': player.start}
+
+    def draw():
+        image = render(current['epoch'])
+        declutter_sprite(renderer, labels, state['points'], ids=player.ids, selected=highlight, pad=0.2)
+        stamp = datetime.fromtimestamp(current['epoch'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+        status.set_text(f"{stamp}   {format_stats(clock.stats())}")
+        return image
+
+    view = SpriteView(renderer, draw, title=f"Replay of {len(player.ids)} satellites at {speed:g}x")
+    status = view.fig.text(0.5, 0.02, '', color='white', ha='center', va='bottom', fontsize=10)
+    labels += sprite_labels(view.ax, [sat_id.upper() for sat_id in player.ids], colors)
+    view.image.set_data(draw())
+
+    def poll(_):
+        epoch = clock.tick()
+        if epoch is None:
+            return False  # No frame due yet
+        current['epoch'] = epoch
+
+    timer = view.animate(poll, interval_ms=max(1, int(500 / fps)))
+    span_h = (player.end - player.start) / 3600
+    print(f"Replaying {len(player.ids)} satellite(s) over {span_h:.1f} h at {speed:g}x "
+          f"({span_h * 3600 / speed:.0f} s per pass), target {fps:g} fps")
+    plt.show()
+    timer.stop()
+    stats = clock.stats()
+    print(f"Replay: {format_stats(stats)}")
+    return stats
+
+
+def replay_store(path, satellite_ids=None, start=None, end=None, **kwargs):
+    """
+    Load tracks with load_stored_tracks() and play them with replay_tracks().
+
+    Returns:
+        dict: FrameClock.stats() when the window was closed
+    """
+    satellite_data = load_stored_tracks(path, satellite_ids, start, end)
+    if not satellite_data:
+        raise ValueError(f"No stored samples in {path} for the requested satellites and range")
+    return replay_tracks(satellite_data, **kwargs)
+
+
+def benchmark(satellite_count=300, hours=24, seconds=3.0, fps=DEFAULT_FPS, speeds=SPEEDS):
+    """
+    Replay a stand-in store headless and report achieved versus target fps.
+
+    Args:
+        satellite_count (int): Satellites in the stand-in store (default: 300)
+        hours (int): Hours of one-minute tracks per satellite (default: 24)
+        seconds (float): Wall-clock seconds to replay per speed (default: 3)
+        fps (float): Target frames per second (default: 20)
+        speeds (tuple): Speed-up factors to measure
+
+    Returns:
+        dict: FrameClock.stats() by speed
+    """
+    from datetime import timedelta
+
+    from satellite_tracker import fetch_satellite_positions
+    from ssc_standin import StandInSscWs, benchmark_satellites
+
+    satellites = benchmark_satellites(satellite_count, seed=3)
+    client = StandInSscWs(satellites)
+    start = datetime(2025, 1, 1)
+    satellite_data = fetch_satellite_positions([s[0] for s in satellites], client=client, verbose=False,
+                                               start_time=start, end_time=start + timedelta(hours=hours))
+    started = time.perf_counter()
+    player = TrackPlayer(satellite_data)
+    print(f"Packed {satellite_count} satellites x {hours} h "
+          f"({sum(len(sat['times']) for sat in satellite_data):,} samples) in "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+    results = {}
+    for speed in speeds:
+        _, render, _, _ = _replay_scene(player)
+        clock = FrameClock(player.start, player.end, speed, fps)
+        results[speed] = run_headless(clock, render, seconds)
+        print(f"  {format_stats(results[speed])}")
+    return results
+
+
+def _parse_epoch(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def main():
+    """Main function with command line options."""
+    parser = argparse.ArgumentParser(description='Time-accurate replay of stored satellite tracks')
+    parser.add_argument('--store', default='tracks',
+                        help='Track store or --history ring directory to replay (default: tracks)')
+    parser.add_argument('--satellites', '-s', nargs='+', default=None,
+                        help='Satellite IDs to replay (default: every stored satellite)')
+    parser.add_argument('--start', default=None,
+                        help='First UTC time to replay (ISO 8601, default: first stored sample)')
+    parser.add_argument('--end', default=None,
+                        help='Last UTC time to replay (ISO 8601, default: last stored sample)')
+    parser.add_argument('--speed', type=float, default=DEFAULT_SPEED,
+                        help=f'Replay seconds per wall-clock second, e.g. {", ".join(map(str, SPEEDS))} '
+                             f'(default: {DEFAULT_SPEED})')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS,
+                        help=f'Target frames per second (default: {DEFAULT_FPS})')
+    parser.add_argument('--once', action='store_true',
+                        help='Stop at the end of the stored range instead of starting over')
+    parser.add_argument('--highlight', nargs='+', default=None,
+                        help='Satellite IDs whose labels are always placed first')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Replay a stand-in store headless at 1x, 60x and 3600x and report fps')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"Measuring replay frame rate (target {args.fps:g} fps, sprite renderer)...")
+        benchmark(fps=args.fps)
+        return
+    start = _parse_epoch(args.start) if args.start else None
+    end = _parse_epoch(args.end) if args.end else None
+    replay_store(args.store, args.satellites, start, end, speed=args.speed, fps=args.fps,
+                 highlight=args.highlight, loop=not args.once)
+
+
+if __name__ == '__main__':
+    main()
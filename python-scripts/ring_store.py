@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Ring-Buffer Track History
+
+Keeps a fixed-capacity history per satellite in a memory-mapped file, for
+real-time tracking that runs for days. Disk use and resident memory are fixed
+by the capacity, appends are O(1), windowed reads return NumPy views into the
+mapping (no copies), and the history survives restarts. A restarted tracker
+therefore only fetches the gap since its newest stored sample.
+
+Each satellite's file holds a small header followed by the columns
+(t, lat, lon, alt, x, y, z) as float64 rows of length 2 * capacity. Every
+sample is written twice, at slot i and i + capacity (a mirrored ring), so the
+newest `capacity` samples are always one contiguous slice and any time window
+is a view even when it spans the wrap-around point. The sample count in the
+header is updated last, so an interrupted append is simply not seen.
+
+Layout:
+    <root>/<satellite_id>.ring
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from satellite_tracker import fetch_satellite_positions, times_to_epoch_seconds
+
+RING_COLUMNS = ('t', 'lat', 'lon', 'alt', 'x', 'y', 'z')
+_RECORD_FIELDS = {'lat': 'latitudes', 'lon': 'longitudes', 'alt': 'altitudes',
+                  'x': 'x', 'y': 'y', 'z': 'z'}
+RING_MAGIC = 0x53415452494E4731  # 'SATRING1'
+HEADER_WORDS = 4  # magic, capacity, samples ever written, reserved
+DEFAULT_CAPACITY = 7 * 24 * 60  # one week at one-minute resolution
+
+
+class TrackRing:
+    """
+    Fixed-capacity, memory-mapped ring buffer of one satellite's samples.
+
+    Args:
+        path (str): Ring file (created if missing)
+        capacity (int): Samples kept for a new file; an existing file keeps its own
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        if os.path.exists(path):
+            header = np.memmap(path, dtype=np.int64, mode='r', shape=(HEADER_WORDS,))
+            if int(header[0]) != RING_MAGIC:
+                raise ValueError(f"{path} is not a track ring file")
+            capacity = int(header[1])
+            del header
+            mode = 'r+'
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            mode = 'w+'
+        self.path = path
+        self.capacity = int(capacity)
+        self._map = np.memmap(path, dtype=np.float64, mode=mode,
+                              shape=(HEADER_WORDS + len(RING_COLUMNS) * 2 * self.capacity,))
+        self.header = self._map[:HEADER_WORDS].view(np.int64)
+        self.columns = self._map[HEADER_WORDS:].reshape(len(RING_COLUMNS), 2 * self.capacity)
+        if mode == 'w+':
+            self.header[:] = (RING_MAGIC, self.capacity, 0, 0)
+
+    @property
+    def written(self):
+        """Number of samples ever appended."""
+        return int(self.header[2])
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def last_time(self):
+        """Return the newest stored epoch in seconds, or None if empty."""
+        written = self.written
+        if written == 0:
+            return None
+        return float(self.columns[0, (written - 1) % self.capacity])
+
+    def append(self, epochs, values):
+        """
+        Append samples newer than the newest stored one.
+
+        Args:
+            epochs (array): (k,) epoch seconds, ascending
+            values (array): (6, k) lat, lon, alt, x, y, z
+
+        Returns:
+            int: Number of samples appended
+        """
+        epochs = np.asarray(epochs, dtype=np.float64)
+        last = self.last_time()
+        if last is not None:
+            newer = epochs > last
+            epochs, values = epochs[newer], np.asarray(values)[:, newer]
+        count = min(len(epochs), self.capacity)
+        if count == 0:
+            return 0
+        epochs, values = epochs[-count:], np.asarray(values)[:, -count:]
+
+        slots = (self.written + np.arange(count)) % self.capacity
+        for offset in (0, self.capacity):
+            self.columns[0, slots + offset] = epochs
+            self.columns[1:, slots + offset] = values
+        self.header[2] += len(epochs)  # Publish after the data is in place
+        return count
+
+    def window(self, start=None, end=None):
+        """
+        Return the stored samples between two epochs as views into the mapping.
+
+        Args:
+            start (float): Start epoch seconds, inclusive (default: oldest sample)
+            end (float): End epoch seconds, inclusive (default: newest sample)
+
+        Returns:
+            numpy.ndarray: (7, n) view with rows t, lat, lon, alt, x, y, z
+        """
+        written = self.written
+        count = min(written, self.capacity)
+        first = written % self.capacity if written >= self.capacity else 0
+        ordered = self.columns[:, first:first + count]
+        lo = 0 if start is None else int(np.searchsorted(ordered[0], start, side='left'))
+        hi = count if end is None else int(np.searchsorted(ordered[0], end, side='right'))
+        return ordered[:, lo:hi]
+
+    def flush(self):
+        """Write dirty pages to disk."""
+        self._map.flush()
+
+
+class RingStore:
+    """
+    Memory-mapped ring-buffer history for a set of satellites.
+
+    Args:
+        root (str): Directory holding one ring file per satellite (created if missing)
+        capacity (int): Samples kept per satellite for newly created rings
+                        (default: one week at one-minute resolution)
+        client: SSC client refresh() fetches with (default: None, the shared client)
+    """
+
+    def __init__(self, root, capacity=DEFAULT_CAPACITY, client=None):
+        self.root = root
+        self.capacity = capacity
+        self.client = client
+        self._rings = {}
+        os.makedirs(root, exist_ok=True)
+
+    def ring(self, satellite_id):
+        """Return (opening or creating) a satellite's ring."""
+        key = satellite_id.lower()
+        if key not in self._rings:
+            self._rings[key] = TrackRing(os.path.join(self.root, f"{key}.ring"), self.capacity)
+        return self._rings[key]
+
+    def satellites(self):
+        """Return the sorted list of satellite IDs with a ring on disk."""
+        return sorted(name[:-5] for name in os.listdir(self.root) if name.endswith('.ring'))
+
+    def append(self, satellite_data):
+        """
+        Append fetched tracks, skipping samples already stored.
+
+        Args:
+            satellite_data (list): Satellite data dictionaries from fetch_satellite_positions()
+
+        Returns:
+            int: Number of new samples stored
+        """
+        added = 0
+        for sat in satellite_data:
+            if len(sat['times']) == 0:
+                continue
+            values = np.vstack([sat[_RECORD_FIELDS[name]] for name in RING_COLUMNS[1:]])
+            added += self.ring(sat['id']).append(times_to_epoch_seconds(sat['times']), values)
+        return added
+
+    def track(self, satellite_id, start=None, end=None):
+        """
+        Read one satellite's samples between two epochs.
+
+        Returns:
+            dict: Satellite data dictionary of views into the ring, with 'times'
+                  as epoch seconds, or None if nothing is stored in the range
+        """
+        block = self.ring(satellite_id).window(start, end)
+        if block.shape[1] == 0:
+            return None
+        sat = {'id': satellite_id, 'times': block[0]}
+        for row, name in enumerate(RING_COLUMNS[1:], start=1):
+            sat[_RECORD_FIELDS[name]] = block[row]
+        return sat
+
+    def tracks(self, satellite_ids, time_window_hours, now=None):
+        """
+        Return the last time window of each satellite in fetch_satellite_positions() layout.
+
+        Position columns are views into the rings; 'times' is converted to
+        datetime64[us] and 'coordinates' holds the GEO frame.
+
+        Args:
+            satellite_ids (list): Satellite IDs
+            time_window_hours (float): Window length in hours, ending at now
+            now (float): Window end in epoch seconds (default: current time)
+
+        Returns:
+            list: Satellite data dictionaries (satellites without samples are left out)
+        """
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        satellite_data = []
+        for satellite_id in satellite_ids:
+            sat = self.track(satellite_id, now - time_window_hours * 3600, now)
+            if sat is None:
+                continue
+            sat['times'] = (sat['times'] * 1e6).astype('datetime64[us]')
+            sat['coordinates'] = {'geo': {'x': sat['x'], 'y': sat['y'], 'z': sat['z']}}
+            satellite_data.append(sat)
+        return satellite_data
+
+    def refresh(self, satellite_ids, time_window_hours, verbose=False, log=None):
+        """
+        Fetch only what is missing since the newest stored samples, then return the window.
+
+        Satellites without history are fetched over the whole window, and
+        the others (in a second call) from the oldest of their newest stored
+        samples. On a warm restart this turns a full-window fetch into a
+        fetch of the gap.
+
+        Args:
+            satellite_ids (list): Satellite IDs
+            time_window_hours (float): Window length in hours, ending now
+            verbose (bool): Print the fetched time range (default: False)
+            log: Stream for progress and error messages (default: None, sys.stdout)
+
+        Returns:
+            tuple: (list of satellite data dictionaries, see tracks();
+                    number of new samples stored)
+        """
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(hours=time_window_hours)
+        last = {sat_id: self.ring(sat_id).last_time() for sat_id in satellite_ids}
+        known = [t for t in last.values() if t is not None]
+        groups = [([sat_id for sat_id, t in last.items() if t is None], window_start)]
+        if known:
+            groups.append(([sat_id for sat_id, t in last.items() if t is not None],
+                           max(window_start, datetime.fromtimestamp(min(known), timezone.utc))))
+
+        added = 0
+        for ids, start in groups:
+            if not ids or (now - start).total_seconds() < 1:
+                continue
+            fetched = fetch_satellite_positions(ids, client=self.client, verbose=verbose, log=log,
+                                                start_time=start.replace(tzinfo=None),
+                                                end_time=now.replace(tzinfo=None))
+            added += self.append(fetched)
+        return self.tracks(satellite_ids, time_window_hours, now.timestamp()), added
+
+    def flush(self):
+        """Write every open ring's dirty pages to disk."""
+        for ring in self._rings.values():
+            ring.flush()
@@ -9,82 +9,208 @@ positions with latitude, longitude, and altitude information.
 
 from sscws.sscws import SscWs
 from sscws.coordinates import CoordinateSystem
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import numpy as np
 import argparse
+import sys
+import threading
 import time
 
+from frames import convert as convert_frame
+
 # Constants
 EARTH_RADIUS_KM = 6378.16
+EARTH_MU_KM3_S2 = 398600.4418
+DEFAULT_RESOLUTION_S = 60.0  # Assumed for satellites without a catalog resolution
+
+# SSC coordinate systems by frame name
+COORDINATE_SYSTEMS = {
+    'geo': CoordinateSystem.GEO,
+    'gei': CoordinateSystem.GEI_TOD,
+    'gse': CoordinateSystem.GSE,
+    'gsm': CoordinateSystem.GSM,
+}
+
+# Process-wide SSC client shared by every fetch (see get_ssc_client)
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_ssc_client():
+    """
+    Return the process-wide SSC client.
+    
+    All SSC calls in the process go through this one client so concurrent
+    identical or overlapping location requests are coalesced into a single
+    upstream call (see ssc_coalescing.py), and every upstream call shares one
+    adaptive rate limiter (see ssc_ratelimit.py).
+    
+    Returns:
+        CoalescingClient: Shared client wrapping a rate-limited SscWs
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            from ssc_coalescing import CoalescingClient
+            from ssc_ratelimit import RateLimitedClient
+            _shared_client = CoalescingClient(RateLimitedClient(SscWs()))
+        return _shared_client
+
+
+def set_ssc_client(client):
+    """
+    Replace the process-wide SSC client.
+    
+    Used to plug in another position backend with the same API, such as the
+    offline SGP4 propagator in tle_backend.py. Subsequent fetches and
+    satellite listings that do not pass an explicit client use it.
+    
+    Args:
+        client: Object implementing get_observatories() and get_locations()
+    """
+    global _shared_client
+    with _shared_client_lock:
+        _shared_client = client
+
+
+def times_to_epoch_seconds(times):
+    """
+    Convert SSC timestamps to UTC epoch seconds.
+    
+    Args:
+        times: Sequence of datetime objects (naive values are treated as UTC)
+               or a numpy datetime64 array
+    
+    Returns:
+        numpy.ndarray: float64 array of seconds since 1970-01-01T00:00:00Z
+    """
+    times = np.asarray(times)
+    if times.size == 0:
+        return np.zeros(0, dtype=np.float64)
+    if np.issubdtype(times.dtype, np.datetime64):
+        return times.astype('datetime64[us]').astype(np.int64) / 1e6
+    if np.issubdtype(times.dtype, np.number):
+        return times.astype(np.float64)
+    return np.array([
+        (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
+        for t in times
+    ], dtype=np.float64)
+
+
+def catalog_resolutions(client=None, log=None):
+    """
+    Return the catalog resolution of every satellite SSC lists.
+    
+    Args:
+        client: SSC client (default: None, the shared client)
+        log: Stream for error messages (default: None, sys.stdout)
+    
+    Returns:
+        dict: Resolution in seconds by satellite ID (empty if the catalog is unavailable)
+    """
+    try:
+        observatories = (client or get_ssc_client()).get_observatories()['Observatory']
+    except Exception as e:
+        print(f"Could not read satellite resolutions, assuming {DEFAULT_RESOLUTION_S:g}s: {e}", file=log)
+        return {}
+    return {obs['Id']: float(obs['Resolution']) for obs in observatories if obs.get('Resolution')}
 
 
-def list_available_satellites():
+def list_available_satellites(log=None):
     """
     Retrieve and display all available satellites from NASA SSC.
     
+    Args:
+        log: Stream for the listing and error messages (default: None, sys.stdout)
+    
     Returns:
         list: List of Observatory objects containing satellite information
     """
     try:
-        # Create SSC Web Services client
-        client = SscWs()
+        # Use the shared SSC Web Services client
+        client = get_ssc_client()
         
         # Get all available observatories (satellites)
         response = client.get_observatories()
         observatories = response['Observatory']
         
-        print("=" * 60)
-        print("AVAILABLE SATELLITES FROM NASA SSC")
-        print("=" * 60)
-        print(f"{'ID':<15} {'Name':<40}")
-        print("-" * 60)
+        print("=" * 60, file=log)
+        print("AVAILABLE SATELLITES FROM NASA SSC", file=log)
+        print("=" * 60, file=log)
+        print(f"{'ID':<15} {'Name':<40}", file=log)
+        print("-" * 60, file=log)
         
         for obs in observatories:
-            print(f"{obs['Id']:<15} {obs['Name']:<40}")
+            print(f"{obs['Id']:<15} {obs['Name']:<40}", file=log)
         
-        print(f"\nTotal satellites available: {len(observatories)}")
-        print("=" * 60)
+        print(f"\nTotal satellites available: {len(observatories)}", file=log)
+        print("=" * 60, file=log)
         
         return observatories
         
     except Exception as e:
-        print(f"Error fetching satellite list: {e}")
+        print(f"Error fetching satellite list: {e}", file=log)
         return []
 
 
-def fetch_satellite_positions(satellite_ids, time_window_hours=1):
+def fetch_satellite_positions(satellite_ids, time_window_hours=1, client=None,
+                              start_time=None, end_time=None, raise_errors=False, verbose=True,
+                              coords=('geo',), derive_coords=False, log=None):
     """
     Fetch position data for specified satellites within a time window.
     
     Args:
         satellite_ids (list): List of satellite IDs to track (e.g., ['iss'])
         time_window_hours (float): Time window in hours (default: 1, supports fractional hours)
+        client: SSC client to query (default: None, the shared client from get_ssc_client())
+        start_time (datetime): UTC start of the window (default: end_time - time_window_hours)
+        end_time (datetime): UTC end of the window (default: now)
+        raise_errors (bool): Re-raise fetch errors instead of printing them and
+                             returning an empty list (default: False)
+        verbose (bool): Print the fetched time range (default: True)
+        coords (tuple): Coordinate frames to return, any of 'geo', 'gei', 'gse',
+                        'gsm' (default: ('geo',)). GEO is always included.
+        derive_coords (bool): Fetch GEO only and derive the other frames locally
+                              with vectorized rotations (default: False, request
+                              all frames from SSC in one call)
+        log: Stream for progress and error messages (default: None, sys.stdout)
     
     Returns:
-        list: List of dictionaries containing satellite position data
+        list: List of dictionaries containing satellite position data. Each
+              entry's 'coordinates' maps frame name to {'x', 'y', 'z'} arrays in km.
     """
     try:
         # Calculate time range
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=time_window_hours)
+        if end_time is None:
+            end_time = datetime.utcnow()
+        if start_time is None:
+            start_time = end_time - timedelta(hours=time_window_hours)
         
         # Format times as ISO 8601 UTC strings
         start_time_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
         end_time_str = end_time.strftime('%Y-%m-%dT%H:%M:%SZ')
         
-        print(f"\nFetching positions from {start_time_str} to {end_time_str}")
-        print(f"Time window: {time_window_hours} hour(s)")
+        if verbose:
+            print(f"\nFetching positions from {start_time_str} to {end_time_str}", file=log)
+            print(f"Time window: {(end_time - start_time).total_seconds() / 3600:g} hour(s)", file=log)
         
-        # Create SSC Web Services client
-        client = SscWs()
+        # Use the shared SSC Web Services client unless one was given
+        if client is None:
+            client = get_ssc_client()
         
-        # Fetch satellite positions using GEO coordinate system
+        # Always request GEO (lat/lon/alt come from it); other frames are
+        # requested in the same call unless they are derived locally
+        frames = ['geo'] + [f for f in dict.fromkeys(coords) if f != 'geo']
+        requested = frames[:1] if derive_coords else frames
         result = client.get_locations(
             satellite_ids,
             [start_time_str, end_time_str],
-            coords=[CoordinateSystem.GEO]
+            coords=[COORDINATE_SYSTEMS[f] for f in requested]
         )
         
+        if result.get('HttpStatus', 200) != 200:
+            raise RuntimeError(f"SSC returned HTTP status {result['HttpStatus']}")
+        
         satellite_data = []
         
         if 'Data' in result and result['Data']:
@@ -92,79 +218,120 @@ def fetch_satellite_positions(satellite_ids, time_window_hours=1):
                 satellite_id = data_i['Id']
                 times = data_i['Time']
                 
+                # Index returned coordinate blocks by frame name
+                blocks = {}
+                for c in data_i['Coordinates']:
+                    value = c['CoordinateSystem'].value.lower()
+                    frame = next((f for f, cs in COORDINATE_SYSTEMS.items() if cs.value.lower() == value), value)
+                    blocks[frame] = c
+                
                 # Select GEO coordinates with proper error handling
-                geo = next((c for c in data_i['Coordinates'] if c['CoordinateSystem'].value.lower() == 'geo'), None)
+                geo = blocks.get('geo')
                 if not geo:
                     continue  # Skip if no GEO coordinates found
                 
                 # Extract position arrays
-                latitudes = np.array(geo['LAT'])
-                longitudes = np.array(geo['LON'])
-                x_coords = np.array(geo['X'])
-                y_coords = np.array(geo['Y'])
-                z_coords = np.array(geo['Z'])
+                latitudes = np.asarray(geo['LAT'], dtype=np.float64)
+                longitudes = np.asarray(geo['LON'], dtype=np.float64)
+                
+                # GEO X/Y/Z from SSC are in Earth radii; convert to km in place in
+                # one (3, n) array whose rows serve as x, y, z and as the GEO frame
+                geo_km = np.array([geo['X'], geo['Y'], geo['Z']], dtype=np.float64)
+                geo_km *= EARTH_RADIUS_KM
+                
+                # Altitude above the spherical Earth (einsum sums the squares without temporaries)
+                altitudes = np.sqrt(np.einsum('ij,ij->j', geo_km, geo_km))
+                altitudes -= EARTH_RADIUS_KM
                 
-                # Calculate altitude from X, Y, Z coordinates
-                # Note: GEO X/Y/Z coordinates from SSC are in Earth radii units
-                # Convert to kilometers: dist_km = distances * EARTH_RADIUS_KM
-                distances = np.sqrt(x_coords**2 + y_coords**2 + z_coords**2)
-                distances_km = distances * EARTH_RADIUS_KM
-                altitudes = distances_km - EARTH_RADIUS_KM
+                # Positions in every requested frame, side by side (km)
+                coordinates = {}
+                for frame in frames:
+                    block = blocks.get(frame)
+                    if frame == 'geo':
+                        xyz = geo_km
+                    elif block is not None:
+                        xyz = np.array([block['X'], block['Y'], block['Z']], dtype=np.float64)
+                        xyz *= EARTH_RADIUS_KM
+                    else:
+                        xyz = convert_frame(geo_km.T, times_to_epoch_seconds(times), 'geo', frame).T
+                    coordinates[frame] = {'x': xyz[0], 'y': xyz[1], 'z': xyz[2]}
                 
                 satellite_data.append({
                     'id': satellite_id,
                     'latitudes': latitudes,
                     'longitudes': longitudes,
                     'altitudes': altitudes,
+                    'x': geo_km[0],
+                    'y': geo_km[1],
+                    'z': geo_km[2],
+                    'coordinates': coordinates,
                     'times': times
                 })
         
         return satellite_data
         
     except Exception as e:
-        print(f"Error fetching satellite positions: {e}")
+        if raise_errors:
+            raise
+        print(f"Error fetching satellite positions: {e}", file=log)
         return []
 
 
-def print_satellite_data(satellite_data):
+def print_satellite_data(satellite_data, fmt='text', all_samples=False, stream=None, header=True):
     """
     Print formatted satellite position data.
     
+    The 'text' format is the decorated per-satellite listing; 'table', 'csv'
+    and 'ndjson' are one row per position for piping into other tools (see
+    output_format.py). Output is assembled first and written at once.
+    
     Args:
         satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        fmt (str): 'text', 'table', 'csv' or 'ndjson' (default: 'text')
+        all_samples (bool): Print every sample instead of the latest position (default: False)
+        stream: Text stream to write to (default: sys.stdout)
+        header (bool): Start with the title or column header; False continues
+                       earlier output, e.g. when printing fetched chunks (default: True)
     """
+    stream = sys.stdout if stream is None else stream
+    if fmt != 'text':
+        from output_format import write_positions
+        write_positions(satellite_data, fmt, all_samples, stream, header)
+        return
+    
     if not satellite_data:
-        print("No satellite data available.")
+        if header:
+            stream.write("No satellite data available.\n")
         return
     
-    print("\n" + "=" * 80)
-    print("SATELLITE POSITION DATA")
-    print("=" * 80)
+    lines = ["\n" + "=" * 80, "SATELLITE POSITION DATA", "=" * 80] if header else []
     
     for sat in satellite_data:
-        print(f"\nSatellite: {sat['id'].upper()}")
-        print("-" * 40)
-        
-        # Get the most recent position (last element in arrays)
-        if len(sat['times']) > 0:
-            latest_idx = -1
-            latest_time = sat['times'][latest_idx]
-            latest_lat = sat['latitudes'][latest_idx]
-            latest_lon = sat['longitudes'][latest_idx]
-            latest_alt = sat['altitudes'][latest_idx]
-            
-            # Convert longitude to 0-360 format if needed
-            if latest_lon < 0:
-                latest_lon += 360
-            
-            print(f"Timestamp:    {latest_time}")
-            print(f"Latitude:     {latest_lat:.3f}°")
-            print(f"Longitude:    {latest_lon:.3f}°")
-            print(f"Altitude:     {latest_alt:.2f} km")
-        else:
-            print("No position data available")
+        lines += [f"\nSatellite: {sat['id'].upper()}", "-" * 40]
+        
+        if len(sat['times']) == 0:
+            lines.append("No position data available")
+            continue
+        
+        # Every sample as one line each, or the most recent position (last element in arrays)
+        if all_samples:
+            lines += [f"{t}  {lat:8.3f}°  {lon % 360:8.3f}°  {alt:10.2f} km"
+                      for t, lat, lon, alt in zip(sat['times'], sat['latitudes'],
+                                                  sat['longitudes'], sat['altitudes'])]
+            continue
+        
+        # Convert longitude to 0-360 format if needed
+        latest_lon = sat['longitudes'][-1]
+        if latest_lon < 0:
+            latest_lon += 360
+        
+        lines += [f"Timestamp:    {sat['times'][-1]}",
+                  f"Latitude:     {sat['latitudes'][-1]:.3f}°",
+                  f"Longitude:    {latest_lon:.3f}°",
+                  f"Altitude:     {sat['altitudes'][-1]:.2f} km"]
     
-    print("\n" + "=" * 80)
+    lines.append("\n" + "=" * 80)
+    stream.write("\n".join(lines) + "\n")
 
 
 def _make_base_map():
@@ -199,6 +366,8 @@ def _draw_satellites(ax, satellite_data, show_trajectory=True):
     """
     Draw satellite positions and trajectories on the given axes.
     
+    Labels are drawn separately by _label_satellites() once the figure layout is final.
+    
     Args:
         ax: matplotlib axes object with cartopy projection
         satellite_data (list): List of satellite data dictionaries
@@ -228,29 +397,76 @@ def _draw_satellites(ax, satellite_data, show_trajectory=True):
             ax.plot(plot_lons, sat['latitudes'], 
                    color=color, alpha=0.6, linewidth=1.5,
                    transform=ccrs.PlateCarree())
-        
-        # Add satellite name label at most recent position
-        if len(plot_lons) > 0:
-            latest_lon = plot_lons[-1]
-            latest_lat = sat['latitudes'][-1]
-            ax.annotate(sat['id'].upper(), 
-                       xy=(latest_lon, latest_lat),
-                       xytext=(5, 5), textcoords='offset points',
-                       fontsize=8, fontweight='bold',
-                       bbox=dict(boxstyle='round,pad=0.3', facecolor=color, alpha=0.7),
-                       transform=ccrs.PlateCarree())
 
 
-def plot_3d_satellites(satellite_data):
+def _label_satellites(ax, satellite_data, highlight=None):
+    """
+    Label the most recent satellite positions, drawing only the labels that fit without overlapping.
+    
+    Placement works in screen pixels (see label_layout.py), so call this after
+    tight_layout() or anything else that moves the axes.
+    
+    Args:
+        ax: matplotlib axes object with cartopy projection
+        satellite_data (list): List of satellite data dictionaries
+        highlight (list): Satellite IDs whose labels are placed first (default: None)
+    """
+    import matplotlib.pyplot as plt
+    import cartopy.crs as ccrs
+    from label_layout import axes_bounds, estimate_label_sizes, place_labels, project_2d, selection_priority
+    
+    # Same colors as _draw_satellites()
+    colors = plt.cm.tab20(np.linspace(0, 1, len(satellite_data)))
+    labelled = [idx for idx, sat in enumerate(satellite_data) if len(sat['longitudes']) > 0]
+    if not labelled:
+        return
+    latest_lons = np.array([((satellite_data[idx]['longitudes'][-1] + 180) % 360) - 180 for idx in labelled])
+    latest_lats = np.array([satellite_data[idx]['latitudes'][-1] for idx in labelled])
+    names = [satellite_data[idx]['id'].upper() for idx in labelled]
+    offset_px = 5 * ax.figure.dpi / 72
+    keep = place_labels(project_2d(ax, latest_lons, latest_lats),
+                        estimate_label_sizes(names, 8, ax.figure.dpi, pad=0.3),
+                        selection_priority(names, highlight),
+                        offset=(offset_px, offset_px), bounds=axes_bounds(ax))
+    for pos in keep:
+        ax.annotate(names[pos], 
+                   xy=(latest_lons[pos], latest_lats[pos]),
+                   xytext=(5, 5), textcoords='offset points',
+                   fontsize=8, fontweight='bold',
+                   bbox=dict(boxstyle='round,pad=0.3', facecolor=colors[labelled[pos]], alpha=0.7),
+                   transform=ccrs.PlateCarree())
+
+
+def _draw_illumination(ax, x, y, z, illumination):
+    """
+    Shade a 3D trail by sunlight: dark in Earth's shadow, bright in sunlight.
+    
+    Args:
+        ax: matplotlib 3D axes object
+        x, y, z (array): Trail coordinates in km
+        illumination (array): Visible solar-disc fraction per sample (see eclipse.py)
+    
+    Returns:
+        The scatter collection, usable as a colorbar mappable
+    """
+    return ax.scatter(x, y, z, c=illumination, cmap='inferno', vmin=0, vmax=1,
+                      s=8, alpha=0.9, depthshade=False)
+
+
+def plot_3d_satellites(satellite_data, highlight=None, log=None):
     """
     Create a 3D visualization of satellite positions around Earth.
     
     Args:
         satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        highlight (list): Satellite IDs whose labels are placed first; the other
+                          labels are shown closest first while they fit (default: None)
+        log: Stream for progress and error messages (default: None, sys.stdout)
     """
     try:
         import matplotlib.pyplot as plt
         from mpl_toolkits.mplot3d import Axes3D
+        from label_layout import connect_declutter_3d
         
         fig = plt.figure(figsize=(14, 10))
         ax = fig.add_subplot(111, projection='3d')
@@ -268,6 +484,7 @@ def plot_3d_satellites(satellite_data):
         
         # Color cycle for multiple satellites
         colors = plt.cm.tab20(np.linspace(0, 1, len(satellite_data)))
+        labels = []
         
         for idx, sat in enumerate(satellite_data):
             color = colors[idx]
@@ -286,14 +503,18 @@ def plot_3d_satellites(satellite_data):
                    color=color, linewidth=2, alpha=0.8,
                    label=sat['id'].upper())
             
+            # Shade the trail by eclipse state when available
+            if 'illumination' in sat:
+                shading = _draw_illumination(ax, x, y, z, sat['illumination'])
+            
             # Plot current position
             ax.scatter(x[-1], y[-1], z[-1], 
                       color=color, s=100, edgecolors='black', linewidth=1)
             
             # Add altitude annotation
-            ax.text(x[-1], y[-1], z[-1] + 1000,
-                   f"{sat['id'].upper()}\n{sat['altitudes'][-1]:.0f} km",
-                   fontsize=8, ha='center')
+            labels.append(ax.text(x[-1], y[-1], z[-1] + 1000,
+                                  f"{sat['id'].upper()}\n{sat['altitudes'][-1]:.0f} km",
+                                  fontsize=8, ha='center'))
         
         # Set equal aspect ratio
         max_range = 50000  # km
@@ -310,30 +531,38 @@ def plot_3d_satellites(satellite_data):
         
         # Legend
         ax.legend(loc='upper left', bbox_to_anchor=(0.02, 0.98))
+        if any('illumination' in sat for sat in satellite_data):
+            fig.colorbar(shading, ax=ax, shrink=0.5, label='Sunlit fraction')
         
+        # Show only labels that fit (after layout), again after every rotation or zoom
         plt.tight_layout()
+        connect_declutter_3d(ax, labels, ids=[sat['id'] for sat in satellite_data], selected=highlight)
         plt.show()
         
     except ImportError as e:
-        print(f"Error: Required plotting libraries not installed: {e}")
-        print("To enable 3D visualization, install matplotlib:")
-        print("  pip install matplotlib")
-        print("The script still works without visualization features.")
+        print(f"Error: Required plotting libraries not installed: {e}", file=log)
+        print("To enable 3D visualization, install matplotlib:", file=log)
+        print("  pip install matplotlib", file=log)
+        print("The script still works without visualization features.", file=log)
     except Exception as e:
-        print(f"Error creating 3D plot: {e}")
+        print(f"Error creating 3D plot: {e}", file=log)
 
 
-def plot_modern_satellites(satellite_data):
+def plot_modern_satellites(satellite_data, highlight=None, log=None):
     """
     Create a modern, STL-viewer-style satellite visualization.
     
     Args:
         satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        highlight (list): Satellite IDs whose labels are placed first; the other
+                          labels are shown closest first while they fit (default: None)
+        log: Stream for progress and error messages (default: None, sys.stdout)
     """
     try:
         import matplotlib.pyplot as plt
         from mpl_toolkits.mplot3d import Axes3D
         import matplotlib.animation as animation
+        from label_layout import connect_declutter_3d
         
         # Create modern dark-themed figure
         fig = plt.figure(figsize=(16, 12), facecolor='black')
@@ -369,6 +598,7 @@ def plot_modern_satellites(satellite_data):
         
         # Color cycle for satellites
         colors = plt.cm.tab20(np.linspace(0, 1, len(satellite_data)))
+        labels = []
         
         # Plot satellites with modern styling
         for idx, sat in enumerate(satellite_data):
@@ -388,23 +618,29 @@ def plot_modern_satellites(satellite_data):
             ax.plot(x, y, z, 
                    color=color, linewidth=8, alpha=0.2)
             
-            # Satellite marker with glow
+            # Shade the trail by eclipse state when available
+            in_shadow = False
+            if 'illumination' in sat:
+                shading = _draw_illumination(ax, x, y, z, sat['illumination'])
+                in_shadow = sat['illumination'][-1] < 1.0
+            
+            # Satellite marker with glow (grey rim while in Earth's shadow)
             ax.scatter(x[-1], y[-1], z[-1], 
                       c=color, s=100, alpha=0.9, 
-                      edgecolors='white', linewidth=2)
+                      edgecolors='#555555' if in_shadow else 'white', linewidth=2)
             
             # Glow effect around satellite
             ax.scatter(x[-1], y[-1], z[-1], 
                       c=color, s=300, alpha=0.3)
             
             # Modern label styling
-            ax.text(x[-1], y[-1], z[-1] + 2000,
-                   sat['id'].upper(),
-                   fontsize=10, fontweight='bold', color='white',
-                   ha='center', va='bottom',
-                   bbox=dict(boxstyle='round,pad=0.3', 
-                            facecolor=color, alpha=0.8,
-                            edgecolor='white', linewidth=1))
+            labels.append(ax.text(x[-1], y[-1], z[-1] + 2000,
+                                  sat['id'].upper(),
+                                  fontsize=10, fontweight='bold', color='white',
+                                  ha='center', va='bottom',
+                                  bbox=dict(boxstyle='round,pad=0.3', 
+                                           facecolor=color, alpha=0.8,
+                                           edgecolor='white', linewidth=1)))
         
         # Set view
         ax.view_init(elev=20, azim=45)
@@ -422,25 +658,36 @@ def plot_modern_satellites(satellite_data):
                 f'Real-time satellite tracking • {len(satellite_data)} satellites • {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")} UTC',
                 fontsize=12, color='#CCCCCC', ha='center')
         
+        if any('illumination' in sat for sat in satellite_data):
+            bar = fig.colorbar(shading, ax=ax, shrink=0.4, pad=0.02)
+            bar.set_label('Sunlit fraction', color='white')
+            bar.ax.tick_params(colors='white')
+        
+        # Show only labels that fit (after layout), again after every rotation or zoom
         plt.tight_layout()
+        connect_declutter_3d(ax, labels, ids=[sat['id'] for sat in satellite_data],
+                             selected=highlight, pad=0.3)
         plt.show()
         
     except ImportError as e:
-        print(f"Error: Required plotting libraries not installed: {e}")
-        print("To enable modern visualization, install matplotlib:")
-        print("  pip install matplotlib")
-        print("The script still works without visualization features.")
+        print(f"Error: Required plotting libraries not installed: {e}", file=log)
+        print("To enable modern visualization, install matplotlib:", file=log)
+        print("  pip install matplotlib", file=log)
+        print("The script still works without visualization features.", file=log)
     except Exception as e:
-        print(f"Error creating modern plot: {e}")
+        print(f"Error creating modern plot: {e}", file=log)
 
 
-def plot_satellite_positions(satellite_data, show_trajectory=True):
+def plot_satellite_positions(satellite_data, show_trajectory=True, coverage=None, highlight=None, log=None):
     """
     Create a 2D Earth map visualization of satellite positions.
     
     Args:
         satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
         show_trajectory (bool): Whether to show trajectory paths (default: True)
+        coverage (CoverageGrid): Coverage grid drawn as a heatmap under the satellites (default: None)
+        highlight (list): Satellite IDs whose labels are placed first (default: None)
+        log: Stream for progress and error messages (default: None, sys.stdout)
     """
     try:
         import matplotlib.pyplot as plt
@@ -448,6 +695,11 @@ def plot_satellite_positions(satellite_data, show_trajectory=True):
         # Create base map
         fig, ax = _make_base_map()
         
+        # Draw coverage heatmap
+        if coverage is not None:
+            coverage.add(satellite_data)
+            plt.colorbar(coverage.draw(ax), ax=ax, shrink=0.6, label='Samples')
+        
         # Draw satellites
         _draw_satellites(ax, satellite_data, show_trajectory)
         
@@ -456,90 +708,183 @@ def plot_satellite_positions(satellite_data, show_trajectory=True):
                  fontsize=14, fontweight='bold')
         plt.legend(loc='upper right', bbox_to_anchor=(1.15, 1))
         
+        # Place labels once the layout no longer moves the map
         plt.tight_layout()
+        _label_satellites(ax, satellite_data, highlight)
         plt.show()
         
     except ImportError as e:
-        print(f"Error: Required plotting libraries not installed: {e}")
-        print("To enable visualization, install matplotlib and cartopy:")
-        print("  pip install matplotlib cartopy")
-        print("Note: cartopy requires additional system dependencies.")
-        print("The script still works without visualization features.")
+        print(f"Error: Required plotting libraries not installed: {e}", file=log)
+        print("To enable visualization, install matplotlib and cartopy:", file=log)
+        print("  pip install matplotlib cartopy", file=log)
+        print("Note: cartopy requires additional system dependencies.", file=log)
+        print("The script still works without visualization features.", file=log)
     except Exception as e:
-        print(f"Error creating plot: {e}")
-        print("Note: Make sure cartopy is properly installed. The script still works without visualization.")
+        print(f"Error creating plot: {e}", file=log)
+        print("Note: Make sure cartopy is properly installed. The script still works without visualization.", file=log)
 
 
-def plot_realtime_updates(satellite_ids, update_interval=60, time_window_hours=1):
+def plot_realtime_updates(satellite_ids, update_interval=60, time_window_hours=1, snapshot=None,
+                          coverage=None, hybrid=None, highlight=None, pipeline=None, history=None,
+                          scheduler=None, log=None):
     """
     Create real-time satellite position visualization with periodic updates.
     
+    The base map is drawn once and reused; each update only replaces the
+    satellite markers and refreshes the coverage heatmap.
+    
     Args:
         satellite_ids (list): List of satellite IDs to track
         update_interval (int): Seconds between updates (default: 60)
         time_window_hours (float): Time window in hours (default: 1, supports fractional hours)
+        snapshot (dict): Keyword arguments for snapshot.write_snapshot(), rewritten on
+                         every update (default: None, no snapshot)
+        coverage (CoverageGrid): Coverage grid accumulated across updates and drawn
+                                 as a heatmap (default: None)
+        hybrid (HybridTracker): Propagate positions locally between fetches and refetch
+                                only satellites whose predicted error is too large; the
+                                update interval is then the display rate (default: None)
+        highlight (list): Satellite IDs whose labels are placed first (default: None)
+        pipeline (FetchPipeline): Fetch in worker processes that publish through shared
+                                  memory (see shm_pipeline.py); the window then only
+                                  redraws when new data arrives and stays responsive
+                                  while fetching (default: None, fetch in this process)
+        history (RingStore): Keep every update in memory-mapped ring buffers on disk
+                             (see ring_store.py) and fetch only the samples since the
+                             newest stored ones (default: None, refetch the whole window)
+        scheduler (RefreshScheduler): Refresh each satellite on its own cadence from its
+                                      SSC resolution and observed motion, fetching only
+                                      the due satellites (see refresh_scheduler.py); the
+                                      update interval is then how often it is checked
+                                      (default: None, refetch every satellite each update)
+        log: Stream for progress and error messages (default: None, sys.stdout)
     """
     try:
         # Lazy import matplotlib and cartopy
         import matplotlib.pyplot as plt
         import cartopy.crs as ccrs
         import cartopy.feature as cfeature
+        from ssc_ratelimit import get_shared_limiter
         
         # Enable interactive mode
         plt.ion()
         
-        print(f"\nStarting real-time tracking...")
-        print(f"Update interval: {update_interval} seconds")
-        print(f"Time window: {time_window_hours} hour(s)")
-        print("Press Ctrl+C to stop")
+        print(f"\nStarting real-time tracking...", file=log)
+        print(f"Update interval: {update_interval} seconds", file=log)
+        print(f"Time window: {time_window_hours} hour(s)", file=log)
+        print("Press Ctrl+C to stop", file=log)
+        
+        fig = ax = heatmap = None
+        satellite_artists = []
+        sequences = None
+        if pipeline is not None:
+            pipeline.start()
+            print(f"Fetching in {len(pipeline.processes)} worker process(es) via shared memory", file=log)
         
         while True:
             try:
-                # Fetch fresh satellite data
-                satellite_data = fetch_satellite_positions(satellite_ids, time_window_hours)
+                # Fetch fresh satellite data, or propagate from the last anchors
+                if pipeline is not None:
+                    # Keep the window responsive until a worker publishes new data
+                    if sequences is not None and not pipeline.wait(sequences, 0):
+                        if fig is not None:
+                            plt.pause(0.25)
+                        else:
+                            time.sleep(0.25)
+                        continue
+                    sequences, satellite_data = pipeline.read()
+                    refetched = f"shared buffer v{pipeline.version()}"
+                    if history is not None:
+                        history.append(satellite_data)
+                elif hybrid is not None:
+                    fetch_calls = hybrid.fetch_calls
+                    satellite_data = hybrid.current_tracks(time.time())
+                    refetched = "refetched" if hybrid.fetch_calls > fetch_calls else "propagated"
+                elif scheduler is not None:
+                    fetch_calls = scheduler.fetch_calls
+                    satellite_data = scheduler.current_tracks(time.time())
+                    refetched = (f"{scheduler.fetch_calls - fetch_calls} call(s), "
+                                 f"{scheduler.fetch_calls} since start")
+                elif history is not None:
+                    satellite_data, added = history.refresh(satellite_ids, time_window_hours, verbose=True, log=log)
+                    refetched = f"{added} new sample(s) stored"
+                else:
+                    satellite_data = fetch_satellite_positions(satellite_ids, time_window_hours, log=log)
+                    refetched = "fetched"
+                
+                if satellite_data and snapshot:
+                    from snapshot import write_snapshot
+                    write_snapshot(satellite_data, **snapshot)
                 
                 if satellite_data:
-                    # Clear current plot
-                    plt.clf()
+                    # Create the base map once (again only if its window was closed)
+                    if fig is None or not plt.fignum_exists(fig.number):
+                        fig, ax = _make_base_map()
+                        heatmap = None
+                        satellite_artists = []
                     
-                    # Create new plot using helper function
-                    fig, ax = _make_base_map()
+                    # Remove the previous update's satellites
+                    for artist in satellite_artists:
+                        artist.remove()
+                    
+                    # Accumulate coverage and refresh the heatmap layer
+                    if coverage is not None:
+                        coverage.add(satellite_data)
+                        if heatmap is None:
+                            heatmap = coverage.draw(ax)
+                            plt.colorbar(heatmap, ax=ax, shrink=0.6, label='Samples')
+                        else:
+                            coverage.update_image(heatmap)
                     
                     # Draw satellites
+                    existing = set(ax.get_children())
                     _draw_satellites(ax, satellite_data, True)  # Always show trajectory in realtime
                     
                     # Update title and legend
-                    plt.title(f'Real-Time Satellite Tracking - {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")} UTC', 
-                             fontsize=14, fontweight='bold')
-                    plt.legend(loc='upper right', bbox_to_anchor=(1.15, 1))
+                    ax.set_title(f'Real-Time Satellite Tracking - {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")} UTC', 
+                                 fontsize=14, fontweight='bold')
+                    ax.legend(loc='upper right', bbox_to_anchor=(1.15, 1))
                     
+                    # Place labels once the layout no longer moves the map
                     plt.tight_layout()
+                    _label_satellites(ax, satellite_data, highlight)
+                    satellite_artists = [a for a in ax.get_children() if a not in existing]
                     plt.draw()
                     plt.pause(0.1)
                     
-                    print(f"Updated at {datetime.utcnow().strftime('%H:%M:%S')} UTC")
+                    print(f"Updated at {datetime.utcnow().strftime('%H:%M:%S')} UTC ({refetched})", file=log)
+                
+                # Redraw at once if the shared buffer was overwritten while drawing
+                if pipeline is not None:
+                    if pipeline.is_stale(sequences):
+                        sequences = None
+                    continue
                 
-                # Wait for next update
-                time.sleep(update_interval)
+                # Wait for next update, longer if SSC asked us to back off
+                time.sleep(max(update_interval, get_shared_limiter().cooldown_remaining()))
                 
             except KeyboardInterrupt:
-                print("\nReal-time tracking stopped by user.")
+                print("\nReal-time tracking stopped by user.", file=log)
                 break
             except Exception as e:
-                print(f"Error during real-time update: {e}")
-                time.sleep(update_interval)
+                print(f"Error during real-time update: {e}", file=log)
+                time.sleep(max(update_interval, get_shared_limiter().cooldown_remaining()))
         
+        if pipeline is not None:
+            pipeline.stop()
+        if history is not None:
+            history.flush()
         plt.ioff()
         
     except ImportError as e:
-        print(f"Error: Required plotting libraries not installed: {e}")
-        print("To enable visualization, install matplotlib and cartopy:")
-        print("  pip install matplotlib cartopy")
-        print("Note: cartopy requires additional system dependencies.")
-        print("The script still works without visualization features.")
+        print(f"Error: Required plotting libraries not installed: {e}", file=log)
+        print("To enable visualization, install matplotlib and cartopy:", file=log)
+        print("  pip install matplotlib cartopy", file=log)
+        print("Note: cartopy requires additional system dependencies.", file=log)
+        print("The script still works without visualization features.", file=log)
     except Exception as e:
-        print(f"Error in real-time mode: {e}")
-        print("Note: Make sure cartopy is properly installed.")
+        print(f"Error in real-time mode: {e}", file=log)
+        print("Note: Make sure cartopy is properly installed.", file=log)
 
 
 if __name__ == '__main__':
@@ -556,6 +901,7 @@ Examples:
   python satellite_tracker.py -s iss ace --plot # Track specific satellites only
   python satellite_tracker.py --realtime -u 30   # Real-time updates every 30s (ALL satellites)
   python satellite_tracker.py --list-satellites  # List all available satellites
+  python satellite_tracker.py --replay history --speed 3600  # Replay stored tracks at 3600x
 '''
     )
     
@@ -595,73 +941,419 @@ Examples:
     parser.add_argument('--modern', 
                        action='store_true',
                        help='Enable modern STL-viewer style visualization with animations')
+    parser.add_argument('--sprite',
+                       nargs='?',
+                       const='',
+                       metavar='FILE',
+                       help='Draw the 3D view with the NumPy sprite renderer instead of mplot3d '
+                            '(fast for thousands of objects); with FILE, save the image instead of showing it')
+    parser.add_argument('--tle',
+                       nargs='+',
+                       metavar='FILE',
+                       help='Propagate locally with SGP4 from TLE/OMM element files instead of querying SSC')
+    parser.add_argument('--hybrid',
+                       type=float,
+                       metavar='KM',
+                       help='In realtime mode, propagate locally between fetches and refetch a satellite only '
+                            'when its predicted error exceeds KM; --update-interval becomes the display rate')
+    parser.add_argument('--pipeline',
+                       type=int,
+                       nargs='?',
+                       const=1,
+                       metavar='WORKERS',
+                       help='In realtime mode, fetch in WORKERS background processes (default: 1) that '
+                            'publish through shared memory, so the window never waits on SSC')
+    parser.add_argument('--schedule',
+                       type=float,
+                       nargs='?',
+                       const=0.5,
+                       metavar='DEG',
+                       help='In realtime mode, refresh each satellite on its own cadence: no faster than '
+                            'its SSC resolution, slower if it moves less than DEG degrees (default: 0.5) '
+                            'per interval; due satellites are fetched together')
+    parser.add_argument('--history',
+                       metavar='DIR',
+                       help='Keep track history in memory-mapped ring buffers under DIR; a restarted '
+                            'tracker reads the window from disk and fetches only the gap (GEO only)')
+    parser.add_argument('--history-capacity',
+                       type=int,
+                       default=None,
+                       metavar='N',
+                       help='Samples kept per satellite in new history rings (default: one week at 1 min)')
+    parser.add_argument('--replay',
+                       metavar='DIR',
+                       help='Play back tracks stored under DIR (a --history directory or a backfill '
+                            'track store) in real time instead of querying SSC')
+    parser.add_argument('--speed',
+                       type=float,
+                       default=60,
+                       help='Replay speed-up, e.g. 1, 60 or 3600 (default: 60)')
+    parser.add_argument('--fps',
+                       type=float,
+                       default=20,
+                       help='Target replay frames per second; late frames are dropped (default: 20)')
+    parser.add_argument('--coords',
+                       nargs='+',
+                       choices=['geo', 'gei', 'gse', 'gsm'],
+                       default=['geo'],
+                       help='Coordinate frames to fetch side by side (default: geo)')
+    parser.add_argument('--derive-coords',
+                       action='store_true',
+                       help='Fetch GEO only and derive the other --coords frames locally')
+    parser.add_argument('--close-pairs',
+                       type=float,
+                       metavar='KM',
+                       help='List satellite pairs whose latest positions are closer than KM')
+    parser.add_argument('--conjunctions',
+                       type=float,
+                       metavar='KM',
+                       help='Screen the fetched window for close approaches below KM')
+    parser.add_argument('--conjunction-step',
+                       type=float,
+                       default=60,
+                       help='Time grid spacing in seconds for conjunction screening (default: 60)')
+    parser.add_argument('--stations',
+                       nargs='+',
+                       metavar='NAME:LAT:LON[:ALT_KM]',
+                       help='Predict passes over these ground stations')
+    parser.add_argument('--stations-file',
+                       metavar='CSV',
+                       help='Predict passes over stations listed in a name,lat,lon,alt_km CSV file')
+    parser.add_argument('--min-elevation',
+                       type=float,
+                       default=10.0,
+                       help='Elevation mask in degrees for pass prediction and coverage footprints (default: 10)')
+    parser.add_argument('--coverage',
+                       action='store_true',
+                       help='Accumulate a coverage heatmap and draw it on the 2D map')
+    parser.add_argument('--coverage-resolution',
+                       type=float,
+                       default=1.0,
+                       help='Coverage grid cell size in degrees (default: 1)')
+    parser.add_argument('--footprint',
+                       action='store_true',
+                       help='Count coverage over each satellite\'s visibility footprint (above --min-elevation) '
+                            'instead of only the ground track')
+    parser.add_argument('--eclipse',
+                       nargs='?',
+                       const='conical',
+                       choices=['conical', 'cylindrical'],
+                       help='Compute per-sample eclipse state (shadow model, default: conical) '
+                            'and shade 3D trails by it')
+    parser.add_argument('--highlight',
+                       nargs='+',
+                       metavar='ID',
+                       help='Satellites whose labels are always placed first when labels are decluttered')
+    parser.add_argument('--format',
+                       choices=['text', 'table', 'csv', 'ndjson'],
+                       default='text',
+                       help='Position output format; table, csv and ndjson write only the '
+                            'rows to stdout and everything else to stderr (default: text)')
+    parser.add_argument('--all-samples',
+                       action='store_true',
+                       help='Output every sample in the time window instead of the latest position')
+    parser.add_argument('--snapshot',
+                       metavar='PATH',
+                       help='Write a compact position snapshot for the web viewer to PATH')
+    parser.add_argument('--snapshot-format',
+                       choices=['binary', 'json'],
+                       default='binary',
+                       help='Snapshot encoding (default: binary)')
+    parser.add_argument('--snapshot-track-step',
+                       type=int,
+                       default=None,
+                       help='Include tracks in the snapshot, keeping every Nth sample')
+    parser.add_argument('--max-memory',
+                       metavar='SIZE',
+                       default=None,
+                       help='Memory budget such as 500M or 2G; a request estimated above it is fetched and '
+                            'processed in chunks, keeping thinned tracks for plots and screening')
+    parser.add_argument('--memory-report',
+                       action='store_true',
+                       help='Report the memory held and the peak reached by each stage (tracemalloc)')
     
     # Parse arguments
     args = parser.parse_args()
     
+    # Keep stdout for the rows alone when they are meant for another program
+    log = sys.stderr if args.format != 'text' else sys.stdout
+    if args.pipeline and args.hybrid:
+        parser.error('--pipeline and --hybrid cannot be combined')
+    if args.schedule is not None and (args.hybrid or args.pipeline or args.history):
+        parser.error('--schedule cannot be combined with --hybrid, --pipeline or --history')
+    if args.history and (args.hybrid or args.coords != ['geo']):
+        parser.error('--history stores GEO tracks only and cannot be combined with --hybrid or --coords')
+    if args.snapshot_track_step is not None and args.snapshot_track_step < 1:
+        parser.error('--snapshot-track-step must be at least 1')
+    max_memory = None
+    if args.max_memory is not None:
+        from memory_budget import parse_size
+        try:
+            max_memory = parse_size(args.max_memory)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.history:
+            parser.error('--max-memory cannot be combined with --history (history windows are read from disk)')
+    
     try:
-        print("NASA SSC Satellite Position Tracker")
-        print("===================================")
-        print("This script fetches satellite position data from NASA's")
-        print("Satellite Situation Center (SSC) Web Services.")
+        print("NASA SSC Satellite Position Tracker", file=log)
+        print("===================================", file=log)
+        print("This script fetches satellite position data from NASA's", file=log)
+        print("Satellite Situation Center (SSC) Web Services.", file=log)
+        
+        # Offline SGP4 backend in place of SSC
+        if args.tle:
+            from tle_backend import TleClient
+            set_ssc_client(TleClient(args.tle))
+            print(f"Position backend: SGP4 from {', '.join(args.tle)}", file=log)
         
         # Handle list satellites option
         if args.list_satellites:
-            list_available_satellites()
+            list_available_satellites(log)
+            exit(0)
+        
+        # Replay stored tracks without querying SSC
+        if args.replay:
+            from replay import replay_store
+            replay_store(args.replay, None if 'all' in args.satellites else args.satellites,
+                         speed=args.speed, fps=args.fps, highlight=args.highlight)
             exit(0)
         
         # Determine which satellites to track
         if 'all' in args.satellites:
-            print("\nFetching all available satellites...")
-            all_satellites = list_available_satellites()
+            print("\nFetching all available satellites...", file=log)
+            all_satellites = list_available_satellites(log)
             if all_satellites:
                 # Extract satellite IDs from the observatories
                 satellite_ids = [obs['Id'] for obs in all_satellites]
-                print(f"\nTracking ALL {len(satellite_ids)} satellites")
+                print(f"\nTracking ALL {len(satellite_ids)} satellites", file=log)
             else:
-                print("Could not fetch satellite list, using default satellites")
+                print("Could not fetch satellite list, using default satellites", file=log)
                 satellite_ids = ['iss', 'ace', 'wind', 'goes16', 'hubble']
         else:
             satellite_ids = args.satellites
-            print(f"\nTracking satellites: {', '.join(satellite_ids)}")
+            print(f"\nTracking satellites: {', '.join(satellite_ids)}", file=log)
         
-        print(f"Time window: {args.time_window} hour(s)")
+        print(f"Time window: {args.time_window} hour(s)", file=log)
         
         if args.plot:
             if hasattr(args, 'threed') and args.threed:
-                print("Visualization mode: ENABLED (3D)")
+                print("Visualization mode: ENABLED (3D)", file=log)
             else:
-                print("Visualization mode: ENABLED (2D)")
+                print("Visualization mode: ENABLED (2D)", file=log)
             if args.realtime:
-                print(f"Real-time mode: ENABLED (update every {args.update_interval}s)")
+                print(f"Real-time mode: ENABLED (update every {args.update_interval}s)", file=log)
         else:
-            print("Visualization mode: DISABLED (use --plot to enable)")
+            print("Visualization mode: DISABLED (use --plot to enable)", file=log)
+        
+        # Per-stage memory accounting
+        memory = None
+        if args.memory_report:
+            from memory_budget import MemoryReport
+            memory = MemoryReport()
+        
+        # Estimate the request against the memory budget
+        plan = None
+        if max_memory:
+            from memory_budget import format_bytes, plan_fetch
+            plan = plan_fetch(satellite_ids, args.time_window, max_memory, get_ssc_client(),
+                              frames=len(set(args.coords) | {'geo'}), log=log)
+            print(f"Estimated size: {format_bytes(plan.estimate)} (budget {format_bytes(max_memory)})", file=log)
+            if plan.streaming and args.realtime:
+                print("Note: real-time updates refetch the whole window at once; use a shorter -t to stay in budget", file=log)
+        
+        # Stages that can also run chunk by chunk
+        stations = []
+        if args.stations or args.stations_file:
+            from passes import load_stations, parse_station
+            stations = [parse_station(spec) for spec in args.stations or []]
+            if args.stations_file:
+                stations += load_stations(args.stations_file)
+        coverage = None
+        if args.coverage:
+            from coverage import CoverageGrid
+            coverage = CoverageGrid(args.coverage_resolution, footprint=args.footprint,
+                                    min_elevation=args.min_elevation)
+        
+        # Fetch satellite data, or read it from the ring-buffer history and fetch only the gap
+        history = None
+        streamed = None
+        if args.history:
+            from ring_store import DEFAULT_CAPACITY, RingStore
+            history = RingStore(args.history, args.history_capacity or DEFAULT_CAPACITY, get_ssc_client())
+            satellite_data, added = history.refresh(satellite_ids, args.time_window, verbose=True, log=log)
+            stored = sum(len(sat['times']) for sat in satellite_data)
+            print(f"History: {stored - min(added, stored)} sample(s) from {args.history}, {added} fetched", file=log)
+        elif plan is not None and plan.streaming:
+            # Over budget: fetch and process one chunk at a time, keeping thinned tracks
+            from memory_budget import TrackReducer
+            print(f"Streaming {len(plan.chunks)} chunk(s), keeping up to {plan.keep_samples:,} "
+                  f"sample(s) per satellite for plots and screening", file=log)
+            reducer = TrackReducer(plan)
+            streamed = {'passes': [], 'eclipse': {}}
+            for index, chunk in enumerate(plan.fetch(args.coords, args.derive_coords, log=log)):
+                if args.all_samples:
+                    print_satellite_data(chunk, args.format, True, header=index == 0)
+                if args.eclipse:
+                    from eclipse import add_illumination
+                    add_illumination(chunk, args.eclipse)
+                    for sat in chunk:
+                        if len(sat['times']):
+                            shadowed, total, _ = streamed['eclipse'].get(sat['id'], (0, 0, 1.0))
+                            streamed['eclipse'][sat['id']] = (shadowed + int(np.sum(sat['illumination'] < 1.0)),
+                                                              total + len(sat['times']),
+                                                              float(sat['illumination'][-1]))
+                if stations:
+                    from passes import predict_passes
+                    streamed['passes'] += predict_passes(chunk, stations, args.min_elevation)
+                if coverage is not None:
+                    coverage.add(chunk)
+                reducer.add(chunk)
+                del chunk
+            satellite_data = reducer.tracks()
+            print(f"Streamed {reducer.sample_count():,} sample(s) in {len(plan.chunks)} chunk(s)", file=log)
+        else:
+            satellite_data = fetch_satellite_positions(satellite_ids, args.time_window,
+                                                       coords=args.coords, derive_coords=args.derive_coords,
+                                                       log=log)
+        if memory is not None:
+            memory.checkpoint('fetch' if streamed is None else 'fetch + chunk stages')
+        
+        # Display the results to console (already written chunk by chunk when streaming every sample)
+        if streamed is None or not args.all_samples:
+            print_satellite_data(satellite_data, args.format, args.all_samples)
+            if memory is not None:
+                memory.checkpoint('output')
+        
+        # Eclipse state for every sample
+        if args.eclipse and satellite_data:
+            from eclipse import add_illumination, eclipse_summary
+            if streamed is None:
+                add_illumination(satellite_data, args.eclipse)
+                summary = eclipse_summary(satellite_data)
+            else:
+                summary = [(sat_id, shadowed / total, latest)
+                           for sat_id, (shadowed, total, latest) in streamed['eclipse'].items()]
+            print(f"\nEclipse state ({args.eclipse} shadow):", file=log)
+            for sat_id, shadowed, latest in summary:
+                state = 'SUNLIT' if latest >= 1.0 else 'UMBRA' if latest <= 0.0 else f'PENUMBRA ({latest:.0%} lit)'
+                print(f"  {sat_id.upper():<15} {state:<20} {shadowed:6.1%} of window in shadow", file=log)
+            if memory is not None:
+                memory.checkpoint('eclipse')
+        
+        # Screen latest positions for close pairs
+        if args.close_pairs and satellite_data:
+            from spatial_index import SpatialIndex
+            pairs = SpatialIndex.from_satellite_data(satellite_data).close_pairs(args.close_pairs)
+            print(f"\n{len(pairs)} satellite pair(s) within {args.close_pairs:g} km:", file=log)
+            for sat_a, sat_b, distance in pairs:
+                print(f"  {sat_a.upper():<15} {sat_b.upper():<15} {distance:10.2f} km", file=log)
+            if memory is not None:
+                memory.checkpoint('close pairs')
+        
+        # Screen the whole window for close approaches
+        if args.conjunctions and satellite_data:
+            from conjunction import screen_conjunctions
+            events = screen_conjunctions(satellite_data, args.conjunctions, args.conjunction_step)
+            print(f"\n{len(events)} close approach(es) below {args.conjunctions:g} km"
+                  f"{' (screened on thinned tracks)' if streamed is not None else ''}:", file=log)
+            for sat_a, sat_b, tca, distance in events:
+                tca_str = datetime.fromtimestamp(tca, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"  {sat_a.upper():<15} {sat_b.upper():<15} {tca_str} UTC {distance:10.2f} km", file=log)
+            if memory is not None:
+                memory.checkpoint('conjunctions')
+        
+        # Predict ground-station passes over the window
+        if stations and satellite_data:
+            from passes import predict_passes
+            if streamed is None:
+                passes = predict_passes(satellite_data, stations, args.min_elevation)
+            else:
+                passes = sorted(streamed['passes'], key=lambda p: (p['aos'], p['station'], p['satellite']))
+            print(f"\n{len(passes)} pass(es) above {args.min_elevation:g}° elevation:", file=log)
+            print(f"  {'Station':<12} {'Satellite':<15} {'AOS (UTC)':<19} {'LOS (UTC)':<19} {'Max El':>7} {'AOS Az':>7} {'LOS Az':>7}", file=log)
+            for p in passes:
+                aos = datetime.fromtimestamp(p['aos'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                los = datetime.fromtimestamp(p['los'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"  {p['station']:<12} {p['satellite'].upper():<15} {aos:<19} {los:<19} "
+                      f"{p['max_elevation']:6.1f}° {p['aos_azimuth']:6.1f}° {p['los_azimuth']:6.1f}°", file=log)
+            if memory is not None:
+                memory.checkpoint('passes')
         
-        # Fetch satellite data
-        satellite_data = fetch_satellite_positions(satellite_ids, args.time_window)
+        # Write snapshot for the web viewer
+        snapshot_options = None
+        if args.snapshot:
+            from snapshot import write_snapshot
+            snapshot_options = {
+                'path': args.snapshot,
+                'fmt': args.snapshot_format,
+                'track_step': args.snapshot_track_step,
+            }
+            if satellite_data:
+                size = write_snapshot(satellite_data, **snapshot_options)
+                print(f"Snapshot written to {args.snapshot} ({size:,} bytes, {args.snapshot_format})", file=log)
+                if memory is not None:
+                    memory.checkpoint('snapshot')
         
-        # Display the results to console
-        print_satellite_data(satellite_data)
+        # Coverage grid, accumulated over the fetched window (or its chunks) and any real-time updates
+        if coverage is not None and satellite_data and not args.plot:
+            coverage.add(satellite_data)  # Adds nothing new after streaming
+            print(f"\nCoverage: {coverage.samples} samples, "
+                  f"{100 * coverage.covered_fraction():.1f}% of the globe covered", file=log)
+            if memory is not None:
+                memory.checkpoint('coverage')
         
         # Handle visualization
         if args.plot and satellite_data:
             if args.realtime:
-                plot_realtime_updates(satellite_ids, args.update_interval, args.time_window)
+                hybrid = None
+                if args.hybrid:
+                    from hybrid import HybridTracker
+                    hybrid = HybridTracker(satellite_ids, args.time_window, threshold_km=args.hybrid)
+                pipeline = None
+                if args.pipeline:
+                    from functools import partial
+                    from shm_pipeline import FetchPipeline
+                    client_factory = None
+                    if args.tle:
+                        from tle_backend import TleClient
+                        client_factory = partial(TleClient, args.tle)
+                    pipeline = FetchPipeline(satellite_ids, args.time_window, args.update_interval,
+                                             workers=args.pipeline, client_factory=client_factory)
+                scheduler = None
+                if args.schedule is not None:
+                    from refresh_scheduler import RefreshScheduler
+                    scheduler = RefreshScheduler(satellite_ids, args.time_window, get_ssc_client(),
+                                                 tick_s=args.update_interval, tolerance_deg=args.schedule,
+                                                 coords=args.coords, log=log)
+                    scheduler.add(satellite_data, time.time())  # Seed with the initial fetch
+                plot_realtime_updates(satellite_ids, args.update_interval, args.time_window,
+                                      snapshot=snapshot_options, coverage=coverage, hybrid=hybrid,
+                                      highlight=args.highlight, pipeline=pipeline, history=history,
+                                      scheduler=scheduler, log=log)
+            elif args.sprite is not None:
+                from sprite_renderer import plot_sprite_satellites
+                plot_sprite_satellites(satellite_data, highlight=args.highlight, output=args.sprite or None)
             elif hasattr(args, 'modern') and args.modern:
-                plot_modern_satellites(satellite_data)
+                plot_modern_satellites(satellite_data, highlight=args.highlight, log=log)
             elif hasattr(args, 'threed') and args.threed:
-                plot_3d_satellites(satellite_data)
+                plot_3d_satellites(satellite_data, highlight=args.highlight, log=log)
             else:
-                plot_satellite_positions(satellite_data, args.trajectory)
+                plot_satellite_positions(satellite_data, args.trajectory, coverage=coverage,
+                                         highlight=args.highlight, log=log)
         elif args.plot and not satellite_data:
-            print("No satellite data available for plotting.")
+            print("No satellite data available for plotting.", file=log)
+        if memory is not None:
+            if args.plot:
+                memory.checkpoint('plot')
+            memory.print_report(log)
         
-        print(f"\nData source: NASA Satellite Situation Center (SSC)")
-        print(f"Generated at: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        print(f"\nData source: NASA Satellite Situation Center (SSC)", file=log)
+        print(f"Generated at: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC", file=log)
         
         if not args.plot:
-            print("\nTip: Use --plot to enable visualization or --help for more options.")
+            print("\nTip: Use --plot to enable visualization or --help for more options.", file=log)
         
     except Exception as e:
-        print(f"Script error: {e}")
-        print("Please check your internet connection and try again.")
+        print(f"Script error: {e}", file=log)
+        print("Please check your internet connection and try again.", file=log)
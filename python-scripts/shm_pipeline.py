@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Fetch/Render Pipeline
+
+Moves SSC fetching out of the rendering process. Fetch worker processes write
+the latest track arrays into multiprocessing.shared_memory blocks; the render
+process maps the same blocks as NumPy views (no copies, no pickling) and
+redraws only when a block publishes an update. Rendering therefore
+never waits on network I/O, and fetching can be spread over several workers.
+
+Each worker owns one block (a shard of the satellite list) laid out as:
+
+    header   int64[4]: sequence, active buffer (0/1), satellite count, capacity
+    buffer 0 lengths int64[n], times int64[n, capacity] (UTC microseconds),
+             values float64[6, n, capacity] (lat, lon, alt, x, y, z)
+    buffer 1 (same layout)
+
+Double buffering with a sequence lock: the worker makes the sequence odd,
+fills the inactive buffer, flips the active index and makes the sequence even
+again. The buffer a reader got is therefore only overwritten once the worker
+starts its second write after the read, which the sequence shows. read()
+returns the sequence it read at; after using (or copying) the arrays, callers
+check is_stale() and redo their work if the buffer may have changed under
+them. Consumers that keep the arrays beyond the next update should copy them.
+
+Usage:
+    pipeline = FetchPipeline(['iss', 'goes18'], time_window_hours=1, update_interval=60)
+    pipeline.start()
+    sequences, satellite_data = pipeline.read()  # views into shared memory
+    pipeline.stop()
+"""
+
+import math
+import multiprocessing
+import signal
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from satellite_tracker import fetch_satellite_positions, times_to_epoch_seconds
+
+TRACK_FIELDS = ('latitudes', 'longitudes', 'altitudes', 'x', 'y', 'z')
+HEADER_WORDS = 4
+DEFAULT_SAMPLE_S = 60
+DEFAULT_POLL_S = 0.25
+
+
+def default_capacity(time_window_hours, sample_s=DEFAULT_SAMPLE_S):
+    """Return the samples per satellite needed for a window at the given sample spacing."""
+    return int(math.ceil(time_window_hours * 3600 / sample_s)) + 1
+
+
+def _attach(name):
+    """
+    Attach to an existing shared memory block.
+
+    Python 3.13+ is told not to track the block. Older versions always
+    register it, which is harmless for the fetch workers: they are children
+    of the process that created the block and share its resource tracker,
+    where the name is already registered, and only the owner unlinks it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedTrackBuffer:
+    """
+    Double-buffered track arrays for a fixed list of satellites in shared memory.
+
+    Args:
+        satellite_ids (list): Satellites stored in this block, in row order
+        capacity (int): Samples kept per satellite; longer tracks keep their newest samples
+        name (str): Existing block to attach to (default: None, create a new block)
+    """
+
+    def __init__(self, satellite_ids, capacity, name=None):
+        self.satellite_ids = list(satellite_ids)
+        self.capacity = int(capacity)
+        n = len(self.satellite_ids)
+        self._row = {sat_id.lower(): row for row, sat_id in enumerate(self.satellite_ids)}
+        buffer_bytes = 8 * (n + n * self.capacity + len(TRACK_FIELDS) * n * self.capacity)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * HEADER_WORDS + 2 * buffer_bytes)
+        else:
+            self.shm = _attach(name)
+        self.name = self.shm.name
+
+        self.header = np.ndarray(HEADER_WORDS, dtype=np.int64, buffer=self.shm.buf)
+        self.lengths, self.times, self.values = [], [], []
+        for b in range(2):
+            offset = 8 * HEADER_WORDS + b * buffer_bytes
+            self.lengths.append(np.ndarray(n, dtype=np.int64, buffer=self.shm.buf, offset=offset))
+            offset += 8 * n
+            self.times.append(np.ndarray((n, self.capacity), dtype=np.int64, buffer=self.shm.buf, offset=offset))
+            offset += 8 * n * self.capacity
+            self.values.append(np.ndarray((len(TRACK_FIELDS), n, self.capacity), dtype=np.float64,
+                                          buffer=self.shm.buf, offset=offset))
+        if self.owner:
+            self.header[:] = (0, 0, n, self.capacity)
+            for lengths in self.lengths:
+                lengths[:] = 0
+
+    @property
+    def sequence(self):
+        """Sequence lock counter: twice the updates published, plus one while a write is in progress."""
+        return int(self.header[0])
+
+    @property
+    def version(self):
+        """Number of updates published so far."""
+        return self.sequence // 2
+
+    def write(self, satellite_data):
+        """
+        Publish fetched tracks: fill the inactive buffer, then flip it active.
+
+        Args:
+            satellite_data (list): Satellite data dictionaries from fetch_satellite_positions();
+                                   satellites not in this block are ignored
+        """
+        self.header[0] += 1  # odd: a write is in progress
+        target = 1 - int(self.header[1])
+        lengths, times, values = self.lengths[target], self.times[target], self.values[target]
+        lengths[:] = 0
+        for sat in satellite_data:
+            row = self._row.get(sat['id'].lower())
+            if row is None:
+                continue
+            count = min(len(sat['times']), self.capacity)
+            if count == 0:
+                continue
+            epochs = times_to_epoch_seconds(sat['times'])[-count:]
+            times[row, :count] = np.round(epochs * 1e6).astype(np.int64)
+            for field_idx, field in enumerate(TRACK_FIELDS):
+                values[field_idx, row, :count] = sat[field][-count:]
+            lengths[row] = count
+        # Publish: flip the active buffer first, then make the sequence even again
+        self.header[1] = target
+        self.header[0] += 1
+
+    def read(self):
+        """
+        Return the active buffer as satellite data dictionaries of zero-copy views.
+
+        Returns:
+            tuple: (sequence to pass to is_stale(), list of satellite data
+                    dictionaries in fetch_satellite_positions() layout, GEO
+                    only; 'times' is a datetime64[us] array)
+        """
+        # Take the active index and the sequence as one consistent pair
+        while True:
+            sequence = int(self.header[0])
+            active = int(self.header[1])
+            if int(self.header[0]) == sequence:
+                break
+        lengths, times, values = self.lengths[active], self.times[active], self.values[active]
+        satellite_data = []
+        for row, sat_id in enumerate(self.satellite_ids):
+            count = int(lengths[row])
+            if count == 0:
+                continue
+            sat = {'id': sat_id, 'times': times[row, :count].view('datetime64[us]')}
+            for field_idx, field in enumerate(TRACK_FIELDS):
+                sat[field] = values[field_idx, row, :count]
+            sat['coordinates'] = {'geo': {'x': sat['x'], 'y': sat['y'], 'z': sat['z']}}
+            satellite_data.append(sat)
+        return sequence, satellite_data
+
+    def is_stale(self, sequence):
+        """
+        Return True if the buffer read at this sequence may have been overwritten since.
+
+        Read while idle (even sequence), the buffer is next written by the write
+        starting at sequence + 3; read during a write (odd), by the one starting
+        at sequence + 2. Either way that is the next odd value after the next
+        even one.
+        """
+        return self.sequence >= (sequence | 1) + 2
+
+    def close(self):
+        """Detach from the block, and remove it if this instance created it."""
+        self.header = self.lengths = self.times = self.values = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # Views handed out by read() are still alive; the mapping goes with them
+        if self.owner:
+            self.shm.unlink()
+
+
+def _fetch_worker(name, satellite_ids, capacity, time_window_hours, update_interval, client_factory, stop):
+    """Worker process: fetch this shard's satellites and publish them until stopped."""
+    from ssc_ratelimit import get_shared_limiter
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C stops the renderer, which stops us
+    buffer = SharedTrackBuffer(satellite_ids, capacity, name=name)
+    client = client_factory() if client_factory is not None else None
+    try:
+        while not stop.is_set():
+            try:
+                satellite_data = fetch_satellite_positions(satellite_ids, time_window_hours, client,
+                                                           raise_errors=True, verbose=False)
+                buffer.write(satellite_data)
+            except Exception as e:
+                print(f"Fetch worker error: {e}", file=sys.stderr)
+            stop.wait(max(update_interval, get_shared_limiter().cooldown_remaining()))
+    finally:
+        buffer.close()
+
+
+class FetchPipeline:
+    """
+    Fetch worker processes feeding shared-memory track buffers.
+
+    Args:
+        satellite_ids (list): Satellite IDs to track
+        time_window_hours (float): Track window fetched on every update (default: 1)
+        update_interval (float): Seconds between fetches in each worker (default: 60)
+        workers (int): Fetch processes; the satellite list is split between them (default: 1)
+        capacity (int): Samples kept per satellite (default: the window at 60 s spacing)
+        client_factory (callable): Picklable callable returning the client each worker
+                                   fetches with, e.g. functools.partial(TleClient, paths)
+                                   (default: None, the shared SSC client)
+    """
+
+    def __init__(self, satellite_ids, time_window_hours=1, update_interval=60, workers=1,
+                 capacity=None, client_factory=None):
+        self.satellite_ids = list(satellite_ids)
+        self.time_window_hours = time_window_hours
+        self.update_interval = update_interval
+        self.capacity = capacity or default_capacity(time_window_hours)
+        self.client_factory = client_factory
+        workers = max(1, min(int(workers), len(self.satellite_ids)))
+        self.shards = [list(shard) for shard in np.array_split(np.array(self.satellite_ids, dtype=object), workers)]
+        self.buffers = []
+        self.processes = []
+        self._stop = None
+
+    def start(self):
+        """Create the shared buffers and start one fetch process per shard."""
+        self._stop = multiprocessing.Event()
+        for shard in self.shards:
+            buffer = SharedTrackBuffer(shard, self.capacity)
+            process = multiprocessing.Process(
+                target=_fetch_worker,
+                args=(buffer.name, shard, self.capacity, self.time_window_hours, self.update_interval,
+                      self.client_factory, self._stop),
+                daemon=True)
+            process.start()
+            self.buffers.append(buffer)
+            self.processes.append(process)
+        return self
+
+    def version(self):
+        """Return the total number of updates published by all workers."""
+        return sum(buffer.version for buffer in self.buffers)
+
+    def read(self):
+        """
+        Return the latest tracks of every shard as zero-copy views.
+
+        Returns:
+            tuple: (sequences tuple, one per shard, list of satellite data dictionaries)
+        """
+        sequences = []
+        satellite_data = []
+        for buffer in self.buffers:
+            sequence, shard_data = buffer.read()
+            sequences.append(sequence)
+            satellite_data.extend(shard_data)
+        return tuple(sequences), satellite_data
+
+    def is_stale(self, sequences):
+        """Return True if any shard read at these sequences may have been overwritten since."""
+        return any(buffer.is_stale(sequence) for buffer, sequence in zip(self.buffers, sequences))
+
+    def wait(self, sequences, timeout):
+        """
+        Wait until any shard publishes an update after the given read sequences.
+
+        Returns:
+            bool: True if new data is available
+        """
+        deadline = time.monotonic() + timeout
+        while all(buffer.version <= sequence // 2 for buffer, sequence in zip(self.buffers, sequences)):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(min(DEFAULT_POLL_S, max(0.0, deadline - time.monotonic())))
+        return True
+
+    def stop(self, timeout=5.0):
+        """Stop the workers and release the shared memory."""
+        if self._stop is not None:
+            self._stop.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for buffer in self.buffers:
+            buffer.close()
+        self.buffers = []
+        self.processes = []
@@ -4,52 +4,42 @@ Simple Modern Satellite Viewer
 A clean, STL-viewer-style visualization that actually works and shows satellites clearly
 """
 
+import argparse
+import os
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timezone
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
+from element_catalog import CATALOG_DIR, load_element_catalog, select_orbit_class
+from label_layout import connect_declutter_3d
+
 # Constants
 EARTH_RADIUS_KM = 6378.16
+DEFAULT_CATALOG = os.path.join(CATALOG_DIR, 'focused.csv')
 
-def create_focused_satellite_data():
-    """Create data for major satellites that are clearly visible."""
-    
-    # Major satellites with realistic parameters
-    satellites = [
-        # Low Earth Orbit (LEO) - Fast moving
-        {'id': 'iss', 'altitude': 408, 'inclination': 51.6, 'phase': 0, 'color': '#00BFFF', 'size': 100},
-        {'id': 'hubble', 'altitude': 540, 'inclination': 28.5, 'phase': np.pi/3, 'color': '#FFD700', 'size': 80},
-        {'id': 'landsat8', 'altitude': 705, 'inclination': 98.2, 'phase': 2*np.pi/3, 'color': '#32CD32', 'size': 70},
-        {'id': 'aqua', 'altitude': 705, 'inclination': 98.2, 'phase': np.pi, 'color': '#00CED1', 'size': 70},
-        {'id': 'terra', 'altitude': 705, 'inclination': 98.2, 'phase': 4*np.pi/3, 'color': '#228B22', 'size': 70},
-        {'id': 'aura', 'altitude': 705, 'inclination': 98.2, 'phase': 5*np.pi/3, 'color': '#20B2AA', 'size': 70},
-        
-        # Medium Earth Orbit (MEO) - GPS constellation
-        {'id': 'gps1', 'altitude': 20200, 'inclination': 55, 'phase': 0, 'color': '#FF6347', 'size': 60},
-        {'id': 'gps2', 'altitude': 20200, 'inclination': 55, 'phase': np.pi/6, 'color': '#FF6347', 'size': 60},
-        {'id': 'gps3', 'altitude': 20200, 'inclination': 55, 'phase': np.pi/3, 'color': '#FF6347', 'size': 60},
-        {'id': 'gps4', 'altitude': 20200, 'inclination': 55, 'phase': np.pi/2, 'color': '#FF6347', 'size': 60},
-        {'id': 'gps5', 'altitude': 20200, 'inclination': 55, 'phase': 2*np.pi/3, 'color': '#FF6347', 'size': 60},
-        {'id': 'gps6', 'altitude': 20200, 'inclination': 55, 'phase': 5*np.pi/6, 'color': '#FF6347', 'size': 60},
-        
-        # Geostationary Orbit (GEO) - Stationary
-        {'id': 'goes16', 'altitude': 35786, 'longitude': -75, 'color': '#FF8C00', 'size': 80},
-        {'id': 'goes17', 'altitude': 35786, 'longitude': -137, 'color': '#FF8C00', 'size': 80},
-        {'id': 'goes18', 'altitude': 35786, 'longitude': -75, 'color': '#FF8C00', 'size': 80},
-        {'id': 'meteosat11', 'altitude': 35786, 'longitude': 0, 'color': '#FFA500', 'size': 80},
-        {'id': 'himawari8', 'altitude': 35786, 'longitude': 140, 'color': '#FFB347', 'size': 80},
-        
-        # Deep Space Missions
-        {'id': 'ace', 'altitude': 148000, 'inclination': 0, 'phase': 0, 'color': '#DC143C', 'size': 50},
-        {'id': 'soho', 'altitude': 150000, 'inclination': 0, 'phase': np.pi/4, 'color': '#B22222', 'size': 50},
-        {'id': 'dscovr', 'altitude': 150000, 'inclination': 0, 'phase': np.pi/2, 'color': '#8B0000', 'size': 50},
-    ]
+def create_focused_satellite_data(catalog_path=None):
+    """
+    Load major satellites that are clearly visible from an element catalog.
+    
+    Args:
+        catalog_path (str): CSV/NPY/Parquet element catalog
+                            (default: catalogs/focused.csv)
     
-    return satellites
+    Returns:
+        numpy.ndarray: Structured array of satellites (see element_catalog.py)
+    """
+    return load_element_catalog(catalog_path or DEFAULT_CATALOG)
 
-def create_modern_view():
-    """Create a modern, clean satellite visualization."""
+def create_modern_view(illumination=False, catalog_path=None):
+    """
+    Create a modern, clean satellite visualization.
+    
+    Args:
+        illumination (bool): Shade each orbit by where it currently lies in
+                             Earth's shadow, using the Sun position now (default: False)
+        catalog_path (str): Element catalog to draw (default: catalogs/focused.csv)
+    """
     
     # Create dark-themed figure
     fig = plt.figure(figsize=(16, 12), facecolor='black')
@@ -84,13 +74,19 @@ def create_modern_view():
                    color='#87CEEB', alpha=0.1, shade=False)
     
     # Get satellite data
-    satellites = create_focused_satellite_data()
+    satellites = create_focused_satellite_data(catalog_path)
+    
+    # Sun position now, for eclipse shading of the orbits
+    if illumination:
+        from eclipse import illumination as sunlit_fraction, sun_position_geo
+        sun_xyz = sun_position_geo(datetime.now(timezone.utc).timestamp())[0]
     
     # Create orbital paths and satellites
+    labels = []
     for sat in satellites:
         radius = EARTH_RADIUS_KM + sat['altitude']
         
-        if 'longitude' in sat:  # Geostationary satellites
+        if np.isfinite(sat['longitude']):  # Geostationary satellites
             longitude = np.radians(sat['longitude'])
             x = np.full(100, radius * np.cos(longitude))
             y = np.full(100, radius * np.sin(longitude))
@@ -110,6 +106,11 @@ def create_modern_view():
         ax.plot(x, y, z, 
                color=sat['color'], linewidth=6, alpha=0.2)
         
+        # Orbit shaded by sunlight: dark in Earth's shadow, bright in sunlight
+        if illumination:
+            ax.scatter(x, y, z, c=sunlit_fraction(np.column_stack([x, y, z]), sun_xyz),
+                      cmap='inferno', vmin=0, vmax=1, s=8, alpha=0.9, depthshade=False)
+        
         # Satellite marker
         ax.scatter(x[0], y[0], z[0], 
                   c=sat['color'], s=sat['size'], alpha=0.9, 
@@ -120,13 +121,13 @@ def create_modern_view():
                   c=sat['color'], s=sat['size']*2, alpha=0.3)
         
         # Satellite label
-        ax.text(x[0], y[0], z[0] + 2000,
-               sat['id'].upper(),
-               fontsize=10, fontweight='bold', color='white',
-               ha='center', va='bottom',
-               bbox=dict(boxstyle='round,pad=0.3', 
-                        facecolor=sat['color'], alpha=0.8,
-                        edgecolor='white', linewidth=1))
+        labels.append(ax.text(x[0], y[0], z[0] + 2000,
+                              sat['id'].upper(),
+                              fontsize=10, fontweight='bold', color='white',
+                              ha='center', va='bottom',
+                              bbox=dict(boxstyle='round,pad=0.3', 
+                                       facecolor=sat['color'], alpha=0.8,
+                                       edgecolor='white', linewidth=1)))
     
     # Set view
     ax.view_init(elev=20, azim=45)
@@ -163,26 +164,37 @@ CONTROLS:
             fontsize=10, color='white', ha='left', va='bottom',
             bbox=dict(boxstyle='round,pad=0.5', facecolor='black', alpha=0.8, edgecolor='white', linewidth=1))
     
+    # Show only labels that fit (closest first, after layout), again after every rotation or zoom
     plt.tight_layout()
+    connect_declutter_3d(ax, labels, pad=0.3)
     plt.show()
     
     return fig, ax
 
 def main():
     """Main function to run the simple modern satellite viewer."""
+    parser = argparse.ArgumentParser(description='Simple Modern Satellite Viewer')
+    parser.add_argument('--illumination',
+                       action='store_true',
+                       help="Shade orbits by where they are currently in Earth's shadow")
+    parser.add_argument('--catalog', '-c',
+                       default=None,
+                       help='Element catalog to load (.csv, .npy or .parquet, default: catalogs/focused.csv)')
+    args = parser.parse_args()
+    
     print("Creating Simple Modern Satellite Viewer...")
     print("STL-viewer style with clear, visible satellites!")
     
-    satellites = create_focused_satellite_data()
+    satellites = create_focused_satellite_data(args.catalog)
     
     print(f"\nLoaded {len(satellites)} major satellites:")
-    print("🛰️ LEO: ISS, Hubble, Landsat, Aqua, Terra, Aura")
-    print("🛰️ MEO: GPS constellation (6 satellites)")
-    print("🛰️ GEO: GOES, Meteosat, Himawari")
-    print("🛰️ Deep Space: ACE, SOHO, DSCOVR")
+    for orbit_class, label in (('leo', 'LEO'), ('meo', 'MEO'), ('geo', 'GEO'), ('deep', 'Deep Space')):
+        ids = select_orbit_class(satellites, orbit_class)['id']
+        if len(ids):
+            print(f"🛰️ {label}: {', '.join(ids)}")
     
     print("\nCreating visualization...")
-    fig, ax = create_modern_view()
+    fig, ax = create_modern_view(illumination=args.illumination, catalog_path=args.catalog)
     
     print("✅ Modern satellite viewer created!")
     print("\nFeatures:")
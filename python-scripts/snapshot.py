@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Compact Satellite Position Snapshots
+
+Serializes the output of fetch_satellite_positions() into a small snapshot that
+the web SatelliteViewer can poll. The binary layout is a fixed header followed by
+little-endian float32 columns, so the browser can wrap each block directly in a
+Float32Array without parsing. A JSON fallback with the same fields is available
+for debugging and for clients that cannot handle ArrayBuffers.
+
+Binary layout (all values little-endian, every block 4-byte aligned):
+
+    Header (24 bytes)
+        magic        4s   b'SATS'
+        version      u16  SNAPSHOT_VERSION
+        flags        u16  bit 0 set when tracks are included
+        n_sats       u32  number of satellites
+        n_track      u32  total number of track points (0 without tracks)
+        base_epoch   f64  UTC epoch seconds all time offsets are relative to
+
+    IDs
+        ids_len      u32  byte length of the UTF-8 ids string
+        ids          newline-separated satellite IDs, zero-padded to 4 bytes
+
+    Latest positions (7 columns x n_sats float32)
+        t, lat, lon, alt, x, y, z   (t in seconds since base_epoch, km, degrees)
+
+    Tracks (only when flag bit 0 is set)
+        offsets      u32[n_sats + 1]  start index of each satellite's track
+        t, lat, lon, alt             (4 columns x n_track float32)
+"""
+
+import json
+import math
+import os
+import struct
+
+import numpy as np
+
+from satellite_tracker import times_to_epoch_seconds
+
+SNAPSHOT_MAGIC = b'SATS'
+SNAPSHOT_VERSION = 1
+FLAG_TRACKS = 0x1
+
+_HEADER = struct.Struct('<4sHHIId')
+LATEST_COLUMNS = ('t', 'lat', 'lon', 'alt', 'x', 'y', 'z')
+TRACK_COLUMNS = ('t', 'lat', 'lon', 'alt')
+
+
+def _pad4(blob):
+    """Zero-pad a bytes object to a multiple of 4 bytes."""
+    return blob + b'\0' * (-len(blob) % 4)
+
+
+def json_number(value, digits=4):
+    """Round a value for JSON, mapping NaN and infinities (not valid JSON) to None."""
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
+def _json_column(values, digits=4):
+    """Round an array for JSON as a list, with None where it is not finite."""
+    values = np.asarray(values, dtype=np.float64)
+    column = np.round(values, digits).astype(object)
+    column[~np.isfinite(values)] = None
+    return column.tolist()
+
+
+def _sat_columns(sat):
+    """Return (epoch_seconds, lat, lon, alt, x, y, z) arrays for one satellite."""
+    epochs = times_to_epoch_seconds(sat['times'])
+    empty = np.full(len(epochs), np.nan)
+    return (
+        epochs,
+        np.asarray(sat['latitudes'], dtype=np.float64),
+        np.asarray(sat['longitudes'], dtype=np.float64),
+        np.asarray(sat['altitudes'], dtype=np.float64),
+        np.asarray(sat.get('x', empty), dtype=np.float64),
+        np.asarray(sat.get('y', empty), dtype=np.float64),
+        np.asarray(sat.get('z', empty), dtype=np.float64),
+    )
+
+
+def build_snapshot(satellite_data, track_step=None):
+    """
+    Collect latest positions (and optionally decimated tracks) into column arrays.
+
+    Args:
+        satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        track_step (int): Keep every Nth track sample (default: None, no tracks).
+                          The latest sample is always kept so tracks end at the marker.
+
+    Returns:
+        dict: Snapshot with 'ids', 'base_epoch', 'latest' and optional 'tracks' entries
+
+    Raises:
+        ValueError: If track_step is given and smaller than 1
+    """
+    if track_step is not None and int(track_step) < 1:
+        raise ValueError(f"track_step must be at least 1, got {track_step}")
+    sats = [sat for sat in satellite_data if len(sat['times']) > 0]
+    ids = [sat['id'] for sat in sats]
+    columns = [_sat_columns(sat) for sat in sats]
+
+    latest = np.full((len(LATEST_COLUMNS), len(sats)), np.nan)
+    for idx, cols in enumerate(columns):
+        latest[:, idx] = [col[-1] for col in cols]
+    base_epoch = float(np.nanmin(latest[0])) if len(sats) else 0.0
+    latest[0] -= base_epoch
+
+    snapshot = {'ids': ids, 'base_epoch': base_epoch, 'latest': latest.astype(np.float32)}
+
+    if track_step:
+        offsets = np.zeros(len(sats) + 1, dtype=np.uint32)
+        pieces = []
+        for idx, cols in enumerate(columns):
+            n = len(cols[0])
+            keep = np.arange(n - 1, -1, -int(track_step))[::-1]
+            pieces.append(np.stack([cols[c][keep] for c in range(len(TRACK_COLUMNS))]))
+            offsets[idx + 1] = offsets[idx] + len(keep)
+        tracks = np.concatenate(pieces, axis=1) if pieces else np.zeros((len(TRACK_COLUMNS), 0))
+        tracks[0] -= base_epoch
+        snapshot['offsets'] = offsets
+        snapshot['tracks'] = tracks.astype(np.float32)
+
+    return snapshot
+
+
+def encode_binary(snapshot):
+    """
+    Encode a snapshot from build_snapshot() into the compact binary layout.
+
+    Args:
+        snapshot (dict): Snapshot dictionary
+
+    Returns:
+        bytes: Encoded snapshot
+    """
+    has_tracks = 'tracks' in snapshot
+    n_sats = len(snapshot['ids'])
+    n_track = snapshot['tracks'].shape[1] if has_tracks else 0
+    ids_blob = '\n'.join(snapshot['ids']).encode('utf-8')
+
+    parts = [
+        _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, FLAG_TRACKS if has_tracks else 0,
+                     n_sats, n_track, snapshot['base_epoch']),
+        struct.pack('<I', len(ids_blob)),
+        _pad4(ids_blob),
+        np.ascontiguousarray(snapshot['latest'], dtype='<f4').tobytes(),
+    ]
+    if has_tracks:
+        parts.append(np.ascontiguousarray(snapshot['offsets'], dtype='<u4').tobytes())
+        parts.append(np.ascontiguousarray(snapshot['tracks'], dtype='<f4').tobytes())
+    return b''.join(parts)
+
+
+def decode_binary(blob):
+    """
+    Decode a binary snapshot back into a snapshot dictionary.
+
+    Args:
+        blob (bytes): Data produced by encode_binary()
+
+    Returns:
+        dict: Snapshot dictionary (arrays are read-only views into blob)
+
+    Raises:
+        ValueError: If the blob is not a snapshot of a supported version
+    """
+    magic, version, flags, n_sats, n_track, base_epoch = _HEADER.unpack_from(blob, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot (magic={magic!r}, version={version})")
+
+    offset = _HEADER.size
+    (ids_len,) = struct.unpack_from('<I', blob, offset)
+    offset += 4
+    ids_blob = bytes(blob[offset:offset + ids_len])
+    ids = ids_blob.decode('utf-8').split('\n') if ids_len else []
+    offset += ids_len + (-ids_len % 4)
+
+    latest = np.frombuffer(blob, dtype='<f4', count=len(LATEST_COLUMNS) * n_sats, offset=offset)
+    offset += latest.nbytes
+    snapshot = {'ids': ids, 'base_epoch': base_epoch,
+                'latest': latest.reshape(len(LATEST_COLUMNS), n_sats)}
+
+    if flags & FLAG_TRACKS:
+        offsets = np.frombuffer(blob, dtype='<u4', count=n_sats + 1, offset=offset)
+        offset += offsets.nbytes
+        tracks = np.frombuffer(blob, dtype='<f4', count=len(TRACK_COLUMNS) * n_track, offset=offset)
+        snapshot['offsets'] = offsets
+        snapshot['tracks'] = tracks.reshape(len(TRACK_COLUMNS), n_track)
+
+    return snapshot
+
+
+def encode_json(snapshot):
+    """
+    Encode a snapshot as JSON with one object per satellite.
+
+    Missing values (NaN, e.g. x/y/z of tracks without GEO positions) are
+    written as null, since NaN is not valid JSON.
+
+    Args:
+        snapshot (dict): Snapshot dictionary from build_snapshot()
+
+    Returns:
+        bytes: UTF-8 encoded JSON document
+    """
+    latest = snapshot['latest'].astype(np.float64)
+    satellites = []
+    for idx, sat_id in enumerate(snapshot['ids']):
+        entry = {name: json_number(latest[c, idx]) for c, name in enumerate(LATEST_COLUMNS)}
+        entry['id'] = sat_id
+        if 'tracks' in snapshot:
+            start, end = snapshot['offsets'][idx], snapshot['offsets'][idx + 1]
+            entry['track'] = {
+                name: _json_column(snapshot['tracks'][c, start:end])
+                for c, name in enumerate(TRACK_COLUMNS)
+            }
+        satellites.append(entry)
+
+    document = {'version': SNAPSHOT_VERSION, 'base_epoch': snapshot['base_epoch'],
+                'satellites': satellites}
+    return json.dumps(document, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+def write_snapshot(satellite_data, path, fmt='binary', track_step=None):
+    """
+    Write a snapshot file that the web viewer can poll.
+
+    The file is written to a temporary name and renamed into place so a polling
+    client never reads a half-written snapshot.
+
+    Args:
+        satellite_data (list): List of satellite data dictionaries from fetch_satellite_positions()
+        path (str): Output file path
+        fmt (str): 'binary' or 'json' (default: 'binary')
+        track_step (int): Keep every Nth track sample (default: None, latest positions only)
+
+    Returns:
+        int: Number of bytes written
+    """
+    snapshot = build_snapshot(satellite_data, track_step)
+    if fmt == 'binary':
+        blob = encode_binary(snapshot)
+    elif fmt == 'json':
+        blob = encode_json(snapshot)
+    else:
+        raise ValueError(f"Unknown snapshot format: {fmt}")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(blob)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Spatial Index over Current Satellite Positions
+
+A uniform 3D grid over GEO X/Y/Z (km) built from the latest position of each
+satellite. Points are bucketed by integer cell, and the cell keys are kept
+sorted so a cell lookup is one searchsorted. Supported queries:
+
+- region:  satellites whose sub-satellite point lies in a lat/lon box
+- radius:  satellites within R km of a point
+- nearest: k nearest satellites to a point
+- pairs:   all satellite pairs closer than D km (conjunction screening)
+
+Every query is vectorized over the candidate set, so nothing is an O(n²)
+Python scan. update() re-buckets only when some satellite has changed cell,
+and re-sorting the nearly sorted keys after a refresh is cheap.
+"""
+
+import itertools
+
+import numpy as np
+
+from frames import lat_lon
+
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+# Half of the 26 neighbouring cell offsets (each unordered cell pair once)
+_HALF_NEIGHBOURS = np.array([o for o in itertools.product((-1, 0, 1), repeat=3) if o > (0, 0, 0)])
+
+
+def _cell_keys(cells):
+    """Pack (n, 3) integer cell coordinates into int64 keys."""
+    c = cells.astype(np.int64) + _KEY_OFFSET
+    return (c[:, 0] << (2 * _KEY_BITS)) | (c[:, 1] << _KEY_BITS) | c[:, 2]
+
+
+def _expand_ranges(lo, hi):
+    """Return (owner, position) index arrays enumerating every [lo[i], hi[i]) range."""
+    counts = hi - lo
+    owner = np.repeat(np.arange(len(lo)), counts)
+    starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+    return owner, starts + np.arange(counts.sum())
+
+
+class SpatialIndex:
+    """
+    Uniform-grid index over satellite positions.
+
+    Args:
+        cell_size_km (float): Grid cell edge length in km (default: 500)
+    """
+
+    def __init__(self, cell_size_km=500.0):
+        self.cell_size_km = cell_size_km
+        self.ids = np.array([], dtype=object)
+        self.xyz = np.zeros((0, 3))
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._order = np.zeros(0, dtype=np.int64)
+        self._sorted_keys = np.zeros(0, dtype=np.int64)
+        self._lat_lon = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_satellite_data(cls, satellite_data, cell_size_km=500.0):
+        """Build an index from the latest positions in fetch_satellite_positions() output."""
+        index = cls(cell_size_km)
+        index.update_from_satellite_data(satellite_data)
+        return index
+
+    def update_from_satellite_data(self, satellite_data):
+        """Update the index with the latest GEO position of each satellite."""
+        sats = [sat for sat in satellite_data if len(sat['times']) > 0]
+        ids = [sat['id'] for sat in sats]
+        xyz = np.array([[sat['x'][-1], sat['y'][-1], sat['z'][-1]] for sat in sats]).reshape(-1, 3)
+        return self.update(ids, xyz)
+
+    def update(self, ids, xyz):
+        """
+        Replace the indexed positions.
+
+        Cells are only re-sorted when the satellite set changed or at least one
+        satellite moved to a different cell. Satellites without a finite
+        position are left out of the index.
+
+        Args:
+            ids (list): Satellite IDs
+            xyz (array): (n, 3) GEO positions in km
+
+        Returns:
+            int: Number of satellites that changed cell
+        """
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        finite = np.isfinite(xyz).all(axis=1)
+        ids = np.asarray(ids, dtype=object)[finite]
+        xyz = xyz[finite]
+        keys = _cell_keys(np.floor(xyz / self.cell_size_km))
+        same_set = len(ids) == len(self.ids) and np.array_equal(ids, self.ids)
+
+        moved = int(np.count_nonzero(keys != self._keys)) if same_set else len(ids)
+        if not same_set:
+            self.ids = ids
+        self.xyz = xyz
+        self._lat_lon = None
+        if moved:
+            # Timsort is near-linear on the nearly sorted keys of a refresh
+            self._keys = keys
+            self._order = np.argsort(keys, kind='stable')
+            self._sorted_keys = keys[self._order]
+        return moved
+
+    def _cells_lookup(self, keys):
+        """Return index arrays (owner, member) for all points in the given cell keys."""
+        lo = np.searchsorted(self._sorted_keys, keys, side='left')
+        hi = np.searchsorted(self._sorted_keys, keys, side='right')
+        owner, positions = _expand_ranges(lo, hi)
+        return owner, self._order[positions]
+
+    def query_region(self, lat_min, lat_max, lon_min, lon_max):
+        """
+        Find satellites whose sub-satellite point lies inside a lat/lon box.
+
+        Longitudes may be given in either -180..180 or 0..360; a box with
+        lon_min > lon_max wraps across the antimeridian.
+
+        Returns:
+            list: Satellite IDs inside the box
+        """
+        if self._lat_lon is None:
+            self._lat_lon = lat_lon(self.xyz)
+        lat, lon = self._lat_lon
+        lon_min, lon_max = lon_min % 360, lon_max % 360
+        in_lon = (lon >= lon_min) & (lon <= lon_max) if lon_min <= lon_max else (lon >= lon_min) | (lon <= lon_max)
+        return self.ids[(lat >= lat_min) & (lat <= lat_max) & in_lon].tolist()
+
+    def _radius_indices(self, point, radius_km):
+        """Return (indices, distances) of points within radius_km of point."""
+        point = np.asarray(point, dtype=np.float64)
+        if not np.isfinite(point).all():
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        lo_cell = np.floor((point - radius_km) / self.cell_size_km).astype(np.int64)
+        hi_cell = np.floor((point + radius_km) / self.cell_size_km).astype(np.int64)
+        n_cells = np.prod(hi_cell - lo_cell + 1)
+
+        if n_cells > len(self.ids):
+            candidates = np.arange(len(self.ids))
+        else:
+            axes = [np.arange(lo, hi + 1) for lo, hi in zip(lo_cell, hi_cell)]
+            cells = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+            _, candidates = self._cells_lookup(_cell_keys(cells))
+
+        distances = np.linalg.norm(self.xyz[candidates] - point, axis=1)
+        inside = distances <= radius_km
+        return candidates[inside], distances[inside]
+
+    def query_radius(self, point, radius_km):
+        """
+        Find satellites within radius_km of a GEO point.
+
+        Args:
+            point (array): GEO X/Y/Z in km
+            radius_km (float): Search radius in km
+
+        Returns:
+            list: (satellite_id, distance_km) tuples sorted by distance
+        """
+        indices, distances = self._radius_indices(point, radius_km)
+        order = np.argsort(distances)
+        return list(zip(self.ids[indices[order]].tolist(), distances[order].tolist()))
+
+    def query_nearest(self, point, k=1):
+        """
+        Find the k satellites nearest to a GEO point.
+
+        Args:
+            point (array): GEO X/Y/Z in km
+            k (int): Number of neighbours (default: 1)
+
+        Returns:
+            list: (satellite_id, distance_km) tuples sorted by distance
+        """
+        k = min(k, len(self.ids))
+        point = np.asarray(point, dtype=np.float64)
+        if not k or not np.isfinite(point).all():
+            return []
+        # Beyond the farthest corner of the data's bounding box every point is in range
+        reach = 1.000001 * np.linalg.norm(np.maximum(np.abs(self.xyz.min(axis=0) - point),
+                                                     np.abs(self.xyz.max(axis=0) - point)))
+        radius = self.cell_size_km
+        while True:
+            indices, distances = self._radius_indices(point, min(radius, reach))
+            if len(indices) >= k or radius >= reach:
+                order = np.argsort(distances)[:k]
+                return list(zip(self.ids[indices[order]].tolist(), distances[order].tolist()))
+            radius *= 2
+
+    def close_pairs(self, max_distance_km):
+        """
+        Find all satellite pairs closer than max_distance_km.
+
+        Points are bucketed with a cell at least max_distance_km wide, so only
+        the same and the 13 "forward" neighbouring cells need to be compared.
+
+        Args:
+            max_distance_km (float): Distance threshold in km
+
+        Returns:
+            list: (id_a, id_b, distance_km) tuples sorted by distance
+        """
+        if len(self.ids) < 2:
+            return []
+        if max_distance_km <= self.cell_size_km:
+            cells = np.floor(self.xyz / self.cell_size_km).astype(np.int64)
+            sorted_keys, order = self._sorted_keys, self._order
+        else:
+            cells = np.floor(self.xyz / max_distance_km).astype(np.int64)
+            keys = _cell_keys(cells)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+
+        pairs_a, pairs_b = [], []
+        for offset in [np.zeros(3, dtype=np.int64)] + list(_HALF_NEIGHBOURS):
+            neighbour_keys = _cell_keys(cells + offset)
+            lo = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+            hi = np.searchsorted(sorted_keys, neighbour_keys, side='right')
+            a, positions = _expand_ranges(lo, hi)
+            b = order[positions]
+            if not offset.any():
+                keep = a < b
+                a, b = a[keep], b[keep]
+            pairs_a.append(a)
+            pairs_b.append(b)
+
+        a, b = np.concatenate(pairs_a), np.concatenate(pairs_b)
+        distances = np.linalg.norm(self.xyz[a] - self.xyz[b], axis=1)
+        close = distances <= max_distance_km
+        a, b, distances = a[close], b[close], distances[close]
+        order = np.argsort(distances)
+        return list(zip(self.ids[a[order]].tolist(), self.ids[b[order]].tolist(), distances[order].tolist()))
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+NumPy Point-Sprite Renderer
+
+A CPU renderer for large 3D scenes, used in place of mplot3d when there are
+thousands of objects. mplot3d projects and depth-sorts every artist in
+Python on every draw. This module renders the whole scene into one RGBA
+array, which is shown with a single imshow image or written to a file:
+
+1. Project: every satellite position and trail vertex is transformed by one
+   3x4 camera matrix (a single matrix multiply) to pixel coordinates and
+   camera depth.
+2. Rasterize: satellites become round splats and trails become anti-aliased
+   lines (one sample per pixel along the major axis, coverage spread over
+   the pixels across it). Both only produce fragments, i.e. flat arrays of
+   pixel index, depth, colour and coverage.
+3. Depth test: fragments behind the Earth are dropped. Of the rest, the
+   nearest opaque fragment per pixel wins, through one np.minimum.at over
+   64-bit keys of (edge flag, float32 depth bits, fragment index). Faint
+   anti-aliased edge fragments only win where no opaque fragment lands.
+4. Composite: the winning fragments are blended, by coverage and alpha, over
+   a cached background holding the Earth impostor. The impostor is a shaded
+   sphere with an atmosphere rim, ray-traced per pixel once. The camera
+   always looks at the Earth's centre, so it depends only on the image size,
+   field of view and distance, and rotating the view never rebuilds it.
+
+The cost is proportional to the number of fragments, not to the number of
+artists. 10,000 satellites render at interactive rates without a GPU.
+"""
+
+import argparse
+import itertools
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6378.16
+EARTH_COLOR = (0x4A / 255, 0x90 / 255, 0xE2 / 255)   # as in the mplot3d viewers
+ATMOSPHERE_COLOR = (0x87 / 255, 0xCE / 255, 0xEB / 255)
+BACKGROUND = (0.0, 0.0, 0.0)
+LIGHT_DIRECTION = (-0.5, -0.5, -0.7)  # camera space (x right, y down, z forward), towards the light
+DEFAULT_FOV_DEG = 30.0
+
+_INDEX_BITS = 31
+_EDGE_ALPHA = 0.5  # Fragments fainter than this never hide farther ones
+
+
+def camera_matrix(azim, elev, extent, width, height, fov_deg=DEFAULT_FOV_DEG):
+    """
+    Build the 3x4 matrix projecting world km to pixels for an orbit camera.
+
+    The camera looks at the origin from direction (azim, elev), as in
+    mplot3d's view_init, at the distance where a sphere of radius extent
+    just fills the shorter image side.
+
+    Args:
+        azim (float): Azimuth in degrees about +Z
+        elev (float): Elevation in degrees above the XY plane
+        extent (float): Radius in km to keep in view
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        fov_deg (float): Field of view across the shorter image side
+
+    Returns:
+        tuple: ((3, 4) matrix mapping homogeneous world points to (u*w, v*w, w),
+                w being the camera depth in km; camera distance in km;
+                focal length in pixels)
+    """
+    azim, elev = np.radians(azim), np.radians(elev)
+    half = np.radians(fov_deg) / 2
+    distance = extent / np.sin(half)
+    focal = min(width, height) / 2 / np.tan(half)
+
+    # Camera axes in world coordinates: forward towards the origin, image y downwards
+    eye = distance * np.array([np.cos(elev) * np.cos(azim), np.cos(elev) * np.sin(azim), np.sin(elev)])
+    forward = -eye / distance
+    right = np.cross(forward, [0.0, 0.0, 1.0])
+    right = right / np.linalg.norm(right) if np.linalg.norm(right) > 1e-9 else np.array([0.0, 1.0, 0.0])
+    down = np.cross(forward, right)
+    rotation = np.vstack([right, down, forward])
+
+    intrinsics = np.array([[focal, 0.0, width / 2], [0.0, focal, height / 2], [0.0, 0.0, 1.0]])
+    return intrinsics @ np.hstack([rotation, -(rotation @ eye)[:, None]]), distance, focal
+
+
+def project(matrix, points):
+    """
+    Project world points with one matrix multiply.
+
+    Args:
+        matrix (array): (3, 4) camera matrix from camera_matrix()
+        points (array): (..., 3) world positions in km
+
+    Returns:
+        tuple: (..., 2) pixel coordinates and (...) camera depths in km
+               (non-positive depth: behind the camera)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    homogeneous = points @ matrix[:, :3].T + matrix[:, 3]
+    depth = homogeneous[..., 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pixels = homogeneous[..., :2] / depth[..., None]
+    return pixels, depth
+
+
+def earth_impostor(width, height, focal, distance, radius=EARTH_RADIUS_KM):
+    """
+    Ray-trace the Earth sphere once into a background image and depth map.
+
+    Args:
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        focal (float): Focal length in pixels
+        distance (float): Camera distance from the Earth's centre in km
+        radius (float): Drawn Earth radius in km
+
+    Returns:
+        tuple: ((height, width, 4) uint8 RGBA background,
+                (height * width,) float64 depth of the Earth's surface, inf off the disk)
+    """
+    u = (np.arange(width) + 0.5 - width / 2) / focal
+    v = (np.arange(height) + 0.5 - height / 2) / focal
+    rays = np.stack(np.broadcast_arrays(u[None, :], v[:, None], 1.0), axis=-1)
+    rays /= np.linalg.norm(rays, axis=-1, keepdims=True)
+
+    # Ray/sphere intersection with the centre at (0, 0, distance) in camera space
+    along = rays[..., 2] * distance                       # ray parameter of the closest approach
+    miss2 = distance**2 - along**2                       # squared closest-approach distance
+    hit = miss2 < radius**2
+    t = along - np.sqrt(np.maximum(radius**2 - miss2, 0.0))
+    depth = np.where(hit, t * rays[..., 2], np.inf)
+
+    normal = (rays * t[..., None] - np.array([0.0, 0.0, distance])) / radius
+    light = np.asarray(LIGHT_DIRECTION) / np.linalg.norm(LIGHT_DIRECTION)
+    shade = 0.25 + 0.75 * np.clip(normal @ light, 0.0, 1.0)
+
+    image = np.empty((height, width, 3), dtype=np.float32)
+    image[:] = BACKGROUND
+    image[hit] = np.asarray(EARTH_COLOR) * shade[hit, None]
+
+    # Atmosphere: a glow fading out over 5% of the radius beyond the limb
+    rim = np.sqrt(np.maximum(miss2, 0.0)) / radius - 1.0
+    glow = np.where(hit, 0.0, np.clip(1.0 - rim / 0.05, 0.0, 1.0) ** 2) * 0.8
+    image += (np.asarray(ATMOSPHERE_COLOR, dtype=np.float32) - image) * glow[..., None].astype(np.float32)
+    rgba = np.full((height, width, 4), 255, dtype=np.uint8)
+    rgba[..., :3] = image * 255 + 0.5
+    return rgba, depth.ravel()
+
+
+def _as_rgba(colors, count):
+    """Broadcast a colour or per-item colours ((n, 3) or (n, 4), 0-1) to (count, 4) float32."""
+    colors = np.asarray(colors, dtype=np.float32)
+    if colors.shape[-1] == 3:
+        colors = np.concatenate([colors, np.ones(colors.shape[:-1] + (1,), dtype=np.float32)], axis=-1)
+    return np.broadcast_to(colors, (count, 4))
+
+
+class SpriteRenderer:
+    """
+    Z-buffered point-sprite and line rasterizer producing RGBA images.
+
+    Args:
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        extent (float): Radius in km kept in view
+        earth_scale (float): Drawn Earth radius as a fraction of the real one (default: 1)
+        fov_deg (float): Field of view across the shorter image side
+    """
+
+    def __init__(self, width=800, height=800, extent=50000.0, earth_scale=1.0, fov_deg=DEFAULT_FOV_DEG):
+        self.width = int(width)
+        self.height = int(height)
+        self.extent = float(extent)
+        self.earth_radius = EARTH_RADIUS_KM * earth_scale
+        self.fov_deg = fov_deg
+        self.azim = 45.0
+        self.elev = 20.0
+        self._background = None
+        self._update_camera()
+
+    def _update_camera(self):
+        self.matrix, distance, focal = camera_matrix(self.azim, self.elev, self.extent,
+                                                     self.width, self.height, self.fov_deg)
+        key = (self.width, self.height, focal, distance, self.earth_radius)
+        if self._background is None or self._background[0] != key:
+            self._background = (key,) + earth_impostor(self.width, self.height, focal, distance,
+                                                       self.earth_radius)
+
+    def view(self, azim=None, elev=None, extent=None):
+        """Set the camera direction in degrees and the radius in km kept in view."""
+        if azim is not None:
+            self.azim = float(azim)
+        if elev is not None:
+            self.elev = float(np.clip(elev, -89.9, 89.9))
+        if extent is not None:
+            self.extent = float(extent)
+        self._update_camera()
+
+    def screen_positions(self, points):
+        """
+        Project points to image pixels (y downwards).
+
+        Returns:
+            tuple: ((n, 2) pixel positions, (n,) camera depth in km,
+                    (n,) True where the point is in the image and not behind the Earth)
+        """
+        pixels, depth = project(self.matrix, points)
+        with np.errstate(invalid='ignore'):
+            shown = ((depth > 0) & (pixels[:, 0] >= 0) & (pixels[:, 0] < self.width)
+                     & (pixels[:, 1] >= 0) & (pixels[:, 1] < self.height))
+        index = np.flatnonzero(shown)
+        pixel = pixels[index].astype(np.int64)
+        shown[index] = depth[index] < self._background[2][pixel[:, 1] * self.width + pixel[:, 0]]
+        return pixels, depth, shown
+
+    def _point_fragments(self, points, colors, radii):
+        """Round, anti-aliased splats: (pixel, depth, palette, palette index, coverage) fragment arrays."""
+        pixels, depth = project(self.matrix, points)
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), depth.shape)
+        visible = (depth > 0) & np.isfinite(pixels).all(axis=1)
+        visible &= ((pixels[:, 0] > -radii) & (pixels[:, 0] < self.width + radii)
+                    & (pixels[:, 1] > -radii) & (pixels[:, 1] < self.height + radii))
+        index = np.flatnonzero(visible)
+        if len(index) == 0:
+            return None
+        reach = int(np.ceil(radii[index].max() + 0.5))
+        offsets = np.arange(-reach, reach + 1, dtype=np.int32)
+        dx, dy = (offset.ravel() for offset in np.meshgrid(offsets, offsets))
+
+        # Per point: integer pixel plus the offset of its centre inside that pixel
+        centre = pixels[index].astype(np.float32)
+        base = np.floor(centre)
+        inside = centre - base - np.float32(0.5)
+        base = base.astype(np.int32)
+        ddx = dx.astype(np.float32) - inside[:, 0:1]
+        ddy = dy.astype(np.float32) - inside[:, 1:2]
+        coverage = np.clip(radii[index, None] + np.float32(0.5) - np.sqrt(ddx * ddx + ddy * ddy), 0.0, 1.0)
+        px = base[:, 0:1] + dx
+        py = base[:, 1:2] + dy
+        keep = coverage > 0
+        keep &= (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        rows, cols = np.nonzero(keep)
+        owner = index[rows]
+        return (py[rows, cols].astype(np.int64) * self.width + px[rows, cols], depth[owner],
+                _as_rgba(colors, len(points)), owner, coverage[rows, cols])
+
+    def _line_fragments(self, paths, colors, width):
+        """Anti-aliased polylines: (pixel, depth, palette, palette index, coverage) fragment arrays."""
+        paths = np.asarray(paths, dtype=np.float64)
+        pixels, depth = project(self.matrix, paths)
+        rgba = _as_rgba(colors, len(paths))
+
+        # Segments between consecutive vertices of every path, dropping any with an end behind the camera
+        start, end = pixels[:, :-1].reshape(-1, 2), pixels[:, 1:].reshape(-1, 2)
+        z0, z1 = depth[:, :-1].ravel(), depth[:, 1:].ravel()
+        owner = np.repeat(np.arange(len(paths)), paths.shape[1] - 1)
+        valid = (z0 > 0) & (z1 > 0) & np.isfinite(start).all(axis=1) & np.isfinite(end).all(axis=1)
+        lo, hi = np.minimum(start, end), np.maximum(start, end)
+        valid &= (hi[:, 0] > -width) & (lo[:, 0] < self.width + width)
+        valid &= (hi[:, 1] > -width) & (lo[:, 1] < self.height + width)
+        start, end, z0, z1, owner = start[valid], end[valid], z0[valid], z1[valid], owner[valid]
+        if len(owner) == 0:
+            return None
+
+        # One sample per pixel step along each segment's major axis
+        delta = end - start
+        steep = np.abs(delta[:, 1]) > np.abs(delta[:, 0])
+        steps = np.maximum(np.ceil(np.abs(delta).max(axis=1)).astype(np.int64), 1)
+        segment = np.repeat(np.arange(len(owner)), steps)
+        first = np.cumsum(steps) - steps
+        t = ((np.arange(len(segment)) - first[segment]) + 0.5) / steps[segment]
+        x = start[segment, 0] + t * delta[segment, 0]
+        y = start[segment, 1] + t * delta[segment, 1]
+        z = z0[segment] + t * (z1 - z0)[segment]
+        is_steep = steep[segment]
+        major = np.where(is_steep, y, x)
+        minor = np.where(is_steep, x, y)
+
+        # Coverage across the line: pixels whose centre lies within width / 2 (+ 0.5 for smoothing)
+        span = int(np.ceil(width / 2 + 0.5))
+        offsets = np.arange(-span, span + 1)
+        minor_px = np.floor(minor)[:, None] + offsets
+        coverage = np.clip(width / 2 + 0.5 - np.abs(minor_px + 0.5 - minor[:, None]), 0.0, 1.0)
+        major_px = np.broadcast_to(np.floor(major)[:, None], minor_px.shape)
+        px = np.where(is_steep[:, None], minor_px, major_px)
+        py = np.where(is_steep[:, None], major_px, minor_px)
+        keep = (coverage > 0) & (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        rows, cols = np.nonzero(keep)
+        return ((py[rows, cols] * self.width + px[rows, cols]).astype(np.int64), z[rows],
+                rgba, owner[segment[rows]], coverage[rows, cols].astype(np.float32))
+
+    def render(self, points=None, colors=(1.0, 1.0, 1.0), radii=2.0, trails=None,
+               trail_colors=(1.0, 1.0, 1.0, 0.7), trail_width=1.5, earth=True):
+        """
+        Render points and trails over the Earth impostor.
+
+        Args:
+            points (array): (n, 3) positions in km
+            colors (array): One colour or (n, 3) / (n, 4) colours in 0-1
+            radii (array): Splat radius in pixels, one or (n,)
+            trails (array): (m, k, 3) polylines in km (e.g. orbit trails)
+            trail_colors (array): One colour or (m, 3) / (m, 4) colours in 0-1
+            trail_width (float): Line width in pixels
+            earth (bool): Draw and depth-test against the Earth (default: True)
+
+        Returns:
+            numpy.ndarray: (height, width, 4) uint8 RGBA image
+        """
+        _, background, earth_depth = self._background
+        if earth:
+            out = background.copy()
+        else:
+            out = np.empty((self.height, self.width, 4), dtype=np.uint8)
+            out[..., :3] = np.asarray(BACKGROUND) * 255 + 0.5
+            out[..., 3] = 255
+        image = out.reshape(-1, 4)
+
+        batches = []
+        if points is not None and len(points):
+            batches.append(self._point_fragments(points, colors, radii))
+        if trails is not None and len(trails):
+            batches.append(self._line_fragments(trails, trail_colors, trail_width))
+        batches = [batch for batch in batches if batch is not None]
+
+        if batches:
+            # Fragments index one palette holding every point's and trail's colour
+            first = np.cumsum([0] + [len(batch[2]) for batch in batches])
+            palette = np.concatenate([batch[2] for batch in batches])
+            pixel, depth, coverage = (np.concatenate([batch[part] for batch in batches]) for part in (0, 1, 4))
+            color = np.concatenate([batch[3] + offset for batch, offset in zip(batches, first)])
+            if earth:
+                front = depth < earth_depth[pixel]
+                pixel, depth, coverage, color = pixel[front], depth[front], coverage[front], color[front]
+            alpha = palette[color, 3] * coverage
+
+            # Z-buffer: nearest opaque fragment per pixel; faint edges only where nothing opaque lands
+            key = ((alpha < _EDGE_ALPHA).astype(np.uint64) << np.uint64(63)) \
+                | (depth.astype(np.float32).view(np.uint32).astype(np.uint64) << np.uint64(_INDEX_BITS)) \
+                | np.arange(len(pixel), dtype=np.uint64)
+            zbuffer = np.full(self.width * self.height, np.iinfo(np.uint64).max, dtype=np.uint64)
+            np.minimum.at(zbuffer, pixel, key)
+            hit = np.flatnonzero(zbuffer != np.iinfo(np.uint64).max)
+            winner = (zbuffer[hit] & np.uint64((1 << _INDEX_BITS) - 1)).astype(np.int64)
+            blend = alpha[winner, None]
+            image[hit, :3] = palette[color[winner], :3] * (255 * blend) + image[hit, :3] * (1 - blend) + 0.5
+        return out
+
+    def save(self, path, image):
+        """Write a rendered image to a PNG (or any format matplotlib can write)."""
+        import matplotlib.image as mpimg
+        mpimg.imsave(path, image)
+
+
+class SpriteView:
+    """
+    Matplotlib window showing rendered frames; dragging rotates and scrolling zooms.
+
+    The figure is sized so that one image pixel is one screen pixel at 100
+    dpi. Drawing a large image through matplotlib (imshow or figimage) takes
+    about 100 ms per megapixel, far longer than rendering it, so once the
+    canvas has been drawn, frames are copied straight into the Agg buffer.
+    Text artists (title, labels) are then drawn over them and the canvas is
+    blitted. Where the buffer does not match the image (HiDPI scaling,
+    non-Agg backends), the image artist is redrawn normally.
+
+    Args:
+        renderer (SpriteRenderer): Renderer holding the camera
+        draw (callable): Returns a fresh RGBA image from the renderer (called after every change)
+        title (str): Title drawn over the image (default: none)
+    """
+
+    def __init__(self, renderer, draw, title=None):
+        import matplotlib.pyplot as plt
+
+        self.renderer = renderer
+        self.draw = draw
+        self.fig = plt.figure(figsize=(renderer.width / 100, renderer.height / 100), dpi=100,
+                              facecolor='black')
+        self.ax = self.fig.add_axes((0, 0, 1, 1))
+        self.ax.set_axis_off()
+        self.image = self.ax.imshow(np.zeros((renderer.height, renderer.width, 4), dtype=np.uint8),
+                                    interpolation='nearest')
+        if title:
+            self.fig.text(0.5, 0.97, title, color='white', ha='center', va='top', fontsize=12,
+                          fontweight='bold')
+        self._drawn = False
+        self._drag = None
+        self._timer = None
+        canvas = self.fig.canvas
+        canvas.mpl_connect('draw_event', self._on_draw)
+        canvas.mpl_connect('button_press_event', self._on_press)
+        canvas.mpl_connect('motion_notify_event', self._on_motion)
+        canvas.mpl_connect('button_release_event', lambda event: setattr(self, '_drag', None))
+        canvas.mpl_connect('scroll_event', self._on_scroll)
+
+    def _on_draw(self, event):
+        self._drawn = True
+
+    def _on_press(self, event):
+        if event.inaxes is self.ax:
+            self._drag = (event.x, event.y, self.renderer.azim, self.renderer.elev)
+
+    def _on_motion(self, event):
+        if self._drag is not None and event.x is not None:
+            x0, y0, azim, elev = self._drag
+            self.renderer.view(azim=azim - (event.x - x0) * 0.3, elev=elev - (event.y - y0) * 0.3)
+            self.update()
+
+    def _on_scroll(self, event):
+        self.renderer.view(extent=self.renderer.extent * (0.9 if event.button == 'up' else 1.1))
+        self.update()
+
+    def update(self):
+        """Render a new frame and put it on screen."""
+        self.present(self.draw())
+
+    def present(self, image):
+        """Show an RGBA image, copying it into the canvas buffer when possible."""
+        self.image.set_data(image)  # Kept current for full redraws (resize, savefig)
+        canvas = self.fig.canvas
+        buffer = None
+        if self._drawn and hasattr(canvas, 'buffer_rgba'):
+            buffer = np.asarray(canvas.buffer_rgba())
+        if buffer is None or buffer.shape != image.shape:
+            canvas.draw_idle()
+            return
+        buffer[:] = image
+        for text in self.fig.texts + self.ax.texts:
+            if text.get_visible():
+                self.fig.draw_artist(text)
+        canvas.blit(self.fig.bbox)
+
+    def animate(self, step, interval_ms=50):
+        """
+        Call step(frame) every interval_ms on the GUI event loop and redraw.
+
+        A step that returns False skips the redraw, e.g. when no new frame
+        is due yet.
+
+        Returns:
+            Timer: The running matplotlib timer (keep a reference to it)
+        """
+        frames = itertools.count()
+
+        def tick():
+            if step(next(frames)) is not False:
+                self.update()
+
+        self._timer = self.fig.canvas.new_timer(interval=interval_ms)
+        self._timer.add_callback(tick)
+        self._timer.start()
+        return self._timer
+
+
+def satellite_scene(satellite_data, colormap='tab20'):
+    """
+    Build renderer inputs from fetched satellite tracks.
+
+    Args:
+        satellite_data (list): Satellite data dictionaries from fetch_satellite_positions()
+        colormap (str): Matplotlib colormap cycled over satellites
+
+    Returns:
+        dict: Keyword arguments for SpriteRenderer.render() (points at the newest
+              samples, trails along the whole tracks, sunlit trails dimmed by
+              eclipse state when available)
+    """
+    import matplotlib.pyplot as plt
+
+    satellites = [sat for sat in satellite_data if len(sat['x'])]
+    colors = plt.get_cmap(colormap)(np.arange(len(satellites)) % 20 / 20.0)
+    points = np.array([[sat['x'][-1], sat['y'][-1], sat['z'][-1]] for sat in satellites]).reshape(-1, 3)
+
+    # Trails as one (m, k, 3) array: shorter tracks are padded by repeating their last sample
+    length = max((len(sat['x']) for sat in satellites), default=0)
+    trails = np.zeros((len(satellites), length, 3))
+    trail_colors = np.array(colors, dtype=np.float32)
+    trail_colors[:, 3] = 0.8
+    for row, sat in enumerate(satellites):
+        track = np.column_stack([sat['x'], sat['y'], sat['z']])
+        trails[row, :len(track)] = track
+        trails[row, len(track):] = track[-1]
+        if 'illumination' in sat:
+            trail_colors[row, :3] *= 0.4 + 0.6 * float(np.mean(sat['illumination']))
+    return {'points': points, 'colors': colors, 'radii': 4.0, 'trails': trails if length > 1 else None,
+            'trail_colors': trail_colors, 'trail_width': 1.5}
+
+
+def plot_sprite_satellites(satellite_data, highlight=None, output=None, width=1000, height=800,
+                           extent=50000.0):
+    """
+    Draw fetched satellites with the sprite renderer, interactively or to a file.
+
+    Args:
+        satellite_data (list): Satellite data dictionaries from fetch_satellite_positions()
+        highlight (list): Satellite IDs whose labels are placed first; the other
+                          labels are shown closest first while they fit (default: None)
+        output (str): Save the figure to this file instead of showing a window
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        extent (float): Radius in km kept in view
+    """
+    import matplotlib.pyplot as plt
+    from label_layout import declutter_sprite, sprite_labels
+
+    scene = satellite_scene(satellite_data)
+    satellites = [sat for sat in satellite_data if len(sat['x'])]
+    renderer = SpriteRenderer(width, height, extent)
+    labels = []
+
+    def draw():
+        image = renderer.render(**scene)
+        declutter_sprite(renderer, labels, scene['points'], ids=[sat['id'] for sat in satellites],
+                         selected=highlight, pad=0.2)
+        return image
+
+    view = SpriteView(renderer, draw, title=f"{len(satellites)} satellites - drag to rotate, scroll to zoom")
+    labels += sprite_labels(view.ax, [sat['id'].upper() for sat in satellites], scene['colors'])
+    view.image.set_data(draw())
+    fig = view.fig
+    if output:
+        fig.savefig(output, dpi=100, facecolor='black')
+        plt.close(fig)
+        print(f"Rendered {len(satellites)} satellite(s) to {output}")
+    else:
+        plt.show()
+
+
+def main():
+    """Render a Walker-delta constellation to a file or an interactive window."""
+    parser = argparse.ArgumentParser(description='NumPy point-sprite renderer for large satellite scenes')
+    parser.add_argument('--walker', '-w',
+                        metavar='PLANES:PER_PLANE:INC:ALT_KM',
+                        default='100:100:53:550',
+                        help='Walker-delta constellation to render (default: 100:100:53:550)')
+    parser.add_argument('--output', '-o',
+                        default=None,
+                        help='Write the image to this file (default: show an interactive window)')
+    parser.add_argument('--size',
+                        default='1000x800',
+                        help='Image size WIDTHxHEIGHT in pixels (default: 1000x800)')
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.lower().split('x'))
+    from element_catalog import orbit_positions, walker_delta
+    planes, per_plane, inclination, altitude = args.walker.split(':')
+    catalog = walker_delta(int(planes), int(per_plane), float(inclination), float(altitude))
+    points = np.column_stack(orbit_positions(catalog, catalog['phase']))
+    renderer = SpriteRenderer(width, height, extent=(EARTH_RADIUS_KM + float(altitude)) * 1.4)
+    scene = {'points': points, 'colors': (0.0, 0.75, 1.0), 'radii': 1.5}
+    if args.output:
+        renderer.save(args.output, renderer.render(**scene))
+        print(f"Rendered {len(points):,} satellites to {args.output}")
+        return
+
+    import matplotlib.pyplot as plt
+    view = SpriteView(renderer, lambda: renderer.render(**scene),
+                      title=f"{len(points):,} satellites - drag to rotate, scroll to zoom")
+    view.image.set_data(view.draw())
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Request Coalescing for SSC Queries
+
+Wraps an SSC client so concurrent get_locations calls share upstream work:
+
+- Identical in-flight requests (same normalized satellite set, time window and
+  coordinate systems) wait for the one call already running.
+- Requests that arrive within a short merge window and overlap a pending
+  request (same coordinate systems, overlapping time ranges) are merged into a
+  single superset request. Its result is split back out so each caller only
+  sees its own satellites and time range. A request that arrives while no
+  other request is pending goes upstream at once.
+
+A merged request runs at the most urgent priority of the callers it serves
+(see ssc_ratelimit.request_priority). All other client methods
+(get_observatories, ...) are passed straight through.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from satellite_tracker import times_to_epoch_seconds
+from ssc_ratelimit import current_priority, request_priority
+
+
+def _to_epoch(value):
+    """Convert an ISO 8601 UTC string or datetime to epoch seconds."""
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _to_iso(epoch):
+    """Convert epoch seconds to the ISO 8601 UTC string format SSC expects."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _coords_key(coords):
+    """Normalize a coordinate system list into a hashable key."""
+    if not coords:
+        return ()
+    return tuple(sorted(getattr(c, 'value', c).lower() for c in coords))
+
+
+def request_key(satellite_ids, time_range, coords=None):
+    """
+    Build the normalized key identifying an SSC location request.
+
+    Args:
+        satellite_ids (list): Satellite IDs
+        time_range (list): [start, end] ISO 8601 UTC strings or datetimes
+        coords (list): Coordinate systems
+
+    Returns:
+        tuple: (frozenset of lowercase IDs, start epoch, end epoch, coords key)
+    """
+    start, end = (_to_epoch(t) for t in time_range)
+    return frozenset(s.lower() for s in satellite_ids), start, end, _coords_key(coords)
+
+
+class _Flight:
+    """One upstream get_locations call and the callers waiting on it."""
+
+    def __init__(self, sats, start, end, coords, coords_key, kwargs):
+        self.sats = set(sats)
+        self.start = start
+        self.end = end
+        self.coords = coords
+        self.coords_key = coords_key
+        self.kwargs = kwargs
+        self.started = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.priority = current_priority()
+
+    def covers(self, sats, start, end, coords_key):
+        return (coords_key == self.coords_key and sats <= self.sats
+                and self.start <= start and end <= self.end)
+
+    def overlaps(self, start, end, coords_key):
+        return coords_key == self.coords_key and start <= self.end and self.start <= end
+
+
+def split_result(result, satellite_ids, start, end):
+    """
+    Extract one caller's satellites and time range from a superset get_locations result.
+
+    Args:
+        result (dict): sscws get_locations result
+        satellite_ids (set): Lowercase satellite IDs wanted by the caller
+        start (float): Start of the caller's window in epoch seconds
+        end (float): End of the caller's window in epoch seconds
+
+    Returns:
+        dict: Result in the same format containing only the requested data
+    """
+    if not result or not result.get('Data'):
+        return result
+
+    data = []
+    for data_i in result['Data']:
+        if data_i['Id'].lower() not in satellite_ids:
+            continue
+        epochs = times_to_epoch_seconds(data_i['Time'])
+        mask = (epochs >= start) & (epochs <= end)
+        entry = dict(data_i)
+        entry['Time'] = np.asarray(data_i['Time'])[mask]
+        entry['Coordinates'] = [
+            {key: (np.asarray(value)[mask] if np.ndim(value) == 1 and len(value) == len(mask) else value)
+             for key, value in coords.items()}
+            for coords in data_i['Coordinates']
+        ]
+        data.append(entry)
+
+    split = dict(result)
+    split['Data'] = data
+    return split
+
+
+class CoalescingClient:
+    """
+    SSC client wrapper that single-flights and merges concurrent location requests.
+
+    Args:
+        client: Underlying SSC client (e.g. SscWs())
+        merge_window (float): Seconds a new request waits for others to merge into it
+                              before going upstream, when other requests are pending
+                              (default: 0.05)
+    """
+
+    def __init__(self, client, merge_window=0.05):
+        self.client = client
+        self.merge_window = merge_window
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self._pending_callers = 0
+        self._flights = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _join_or_create(self, sats, start, end, coords, coords_key, kwargs):
+        """Attach to a covering or mergeable flight, or create a new one. Returns (flight, leader)."""
+        with self._lock:
+            for flight in self._flights:
+                if flight.kwargs == kwargs and flight.covers(sats, start, end, coords_key):
+                    if not flight.started:
+                        flight.priority = min(flight.priority, current_priority())
+                    self.coalesced_calls += 1
+                    return flight, False
+            for flight in self._flights:
+                if not flight.started and flight.kwargs == kwargs and flight.overlaps(start, end, coords_key):
+                    flight.sats |= sats
+                    flight.start = min(flight.start, start)
+                    flight.end = max(flight.end, end)
+                    flight.priority = min(flight.priority, current_priority())
+                    self.coalesced_calls += 1
+                    return flight, False
+            flight = _Flight(sats, start, end, coords, coords_key, kwargs)
+            self._flights.append(flight)
+            return flight, True
+
+    def _run(self, flight):
+        """Wait for merges if other requests are pending, then perform the upstream call for a flight."""
+        with self._lock:
+            contended = len(self._flights) > 1 or self._pending_callers > 1
+        if self.merge_window and contended:
+            time.sleep(self.merge_window)
+        with self._lock:
+            flight.started = True
+            self.upstream_calls += 1
+        try:
+            call_kwargs = dict(flight.kwargs)
+            if flight.coords is not None:
+                call_kwargs['coords'] = flight.coords
+            with request_priority(flight.priority):
+                flight.result = self.client.get_locations(
+                    sorted(flight.sats), [_to_iso(flight.start), _to_iso(flight.end)], **call_kwargs
+                )
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.remove(flight)
+            flight.done.set()
+
+    def get_locations(self, satellite_ids, time_range, coords=None, **kwargs):
+        """
+        Coalesced drop-in replacement for SscWs.get_locations.
+
+        Args:
+            satellite_ids (list): Satellite IDs
+            time_range (list): [start, end] ISO 8601 UTC strings or datetimes
+            coords (list): Coordinate systems (default: None, SSC default)
+            **kwargs: Passed through to the underlying client; requests only
+                      merge when these match
+
+        Returns:
+            dict: get_locations result restricted to the caller's request
+        """
+        sats, start, end, coords_key = request_key(satellite_ids, time_range, coords)
+        with self._lock:
+            self._pending_callers += 1
+        try:
+            flight, leader = self._join_or_create(sats, start, end, coords, coords_key, kwargs)
+            if leader:
+                self._run(flight)
+            else:
+                flight.done.wait()
+        finally:
+            with self._lock:
+                self._pending_callers -= 1
+
+        if flight.error is not None:
+            raise flight.error
+        if flight.sats == sats and flight.start == start and flight.end == end:
+            return flight.result
+        return split_result(flight.result, sats, start, end)
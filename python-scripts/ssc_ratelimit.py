@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Adaptive Rate Limiting for SSC Calls
+
+A process-wide token bucket with priority-aware scheduling and jittered
+exponential backoff for NASA SSC Web Services:
+
+- Every SSC call takes a token first. While callers wait, the one with the
+  most urgent priority is served first, so real-time "latest position"
+  requests go ahead of bulk historical backfills.
+- The refill rate adapts to the HttpStatus in each response. A throttling or
+  server error status (429/5xx) halves the rate and triggers a backoff. Each
+  success raises the rate again, up to the configured maximum.
+- Failed calls are retried after a full-jitter exponential delay instead of a
+  fixed interval.
+
+Callers pick their priority with the request_priority() context manager:
+
+    with request_priority(PRIORITY_BULK):
+        fetch_satellite_positions(ids, 24)
+"""
+
+import contextlib
+import heapq
+import itertools
+import random
+import sys
+import threading
+import time
+
+PRIORITY_REALTIME = 0
+PRIORITY_INTERACTIVE = 5
+PRIORITY_BULK = 10
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_context = threading.local()
+
+
+def current_priority():
+    """Return the SSC request priority of the calling thread (default: PRIORITY_REALTIME)."""
+    return getattr(_context, 'priority', PRIORITY_REALTIME)
+
+
+@contextlib.contextmanager
+def request_priority(priority):
+    """
+    Run SSC calls made by this thread at the given priority (lower is more urgent).
+
+    Args:
+        priority (int): e.g. PRIORITY_REALTIME or PRIORITY_BULK
+    """
+    previous = current_priority()
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket with AIMD rate adaptation, backoff and priority scheduling.
+
+    Args:
+        max_rate (float): Maximum tokens per second (default: 2.0)
+        min_rate (float): Floor the rate never drops below (default: 0.05)
+        burst (float): Bucket capacity (default: 4)
+        base_delay (float): First backoff delay in seconds (default: 1.0)
+        max_delay (float): Backoff ceiling in seconds (default: 120.0)
+    """
+
+    def __init__(self, max_rate=2.0, min_rate=0.05, burst=4, base_delay=1.0, max_delay=120.0):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = max_rate
+        self.burst = burst
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.tokens = burst
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.throttle_count = 0
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=None):
+        """
+        Block until a token is available and this caller is the most urgent waiter.
+
+        Args:
+            priority (int): Request priority (default: current_priority())
+        """
+        if priority is None:
+            priority = current_priority()
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == entry and now >= self.blocked_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    if self._waiters[0] != entry:
+                        wait = None
+                    elif now < self.blocked_until:
+                        wait = self.blocked_until - now
+                    else:
+                        wait = (1 - self.tokens) / self.rate
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def backoff_delay(self):
+        """Return a full-jitter exponential delay for the current failure count."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** max(self.failures - 1, 0))
+        return random.uniform(0, ceiling)
+
+    def record(self, http_status):
+        """
+        Adapt the rate to an SSC response status.
+
+        Args:
+            http_status (int): HttpStatus of the response (None for a connection error)
+
+        Returns:
+            float: Seconds the caller should back off before retrying (0 on success)
+        """
+        with self._cond:
+            if http_status is not None and http_status not in RETRY_STATUSES:
+                self.failures = 0
+                self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+                return 0.0
+            self.failures += 1
+            self.throttle_count += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            delay = self.backoff_delay()
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self._cond.notify_all()
+            return delay
+
+    def cooldown_remaining(self):
+        """Return seconds until the limiter accepts calls again after a backoff."""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+
+class RateLimitedClient:
+    """
+    SSC client wrapper that routes every call through an AdaptiveRateLimiter.
+
+    Args:
+        client: Underlying SSC client (e.g. SscWs())
+        limiter (AdaptiveRateLimiter): Shared limiter (default: get_shared_limiter())
+        max_retries (int): Retries after a throttled or failed call (default: 4)
+        log: Stream for retry notices (default: None, sys.stderr, so that
+             machine-readable output on stdout stays clean)
+    """
+
+    def __init__(self, client, limiter=None, max_retries=4, log=None):
+        self.client = client
+        self.limiter = limiter or get_shared_limiter()
+        self.max_retries = max_retries
+        self.log = log
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _call(self, method, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                delay = self.limiter.record(None)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                status = result.get('HttpStatus', 200) if isinstance(result, dict) else 200
+                delay = self.limiter.record(status)
+                if not delay or attempt == self.max_retries:
+                    return result
+            print(f"SSC call throttled or failed, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{self.max_retries})", file=self.log or sys.stderr)
+            time.sleep(delay)
+
+    def get_locations(self, *args, **kwargs):
+        """Rate-limited SscWs.get_locations."""
+        return self._call(self.client.get_locations, *args, **kwargs)
+
+    def get_observatories(self, *args, **kwargs):
+        """Rate-limited SscWs.get_observatories."""
+        return self._call(self.client.get_observatories, *args, **kwargs)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter():
+    """Return the process-wide AdaptiveRateLimiter used for all SSC calls."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Local Stand-In for NASA SSC Web Services
+
+Implements the small part of the SscWs client API that the tracker uses
+(get_observatories and get_locations) with deterministic circular orbits, so
+services and tools built on fetch_satellite_positions() can be run and tested
+without network access. Responses mirror the sscws result dictionaries,
+including X/Y/Z in Earth radii for each requested coordinate system and
+per-call HttpStatus.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sscws.coordinates import CoordinateSystem
+
+from frames import convert as convert_frame
+from satellite_tracker import COORDINATE_SYSTEMS, EARTH_MU_KM3_S2, EARTH_RADIUS_KM
+
+EARTH_ROTATION_RAD_S = 7.2921159e-5
+
+# (id, name, altitude km, inclination deg, resolution s)
+DEFAULT_STANDIN_SATELLITES = [
+    ('iss', 'International Space Station', 420, 51.6, 60),
+    ('hst', 'Hubble Space Telescope', 540, 28.5, 60),
+    ('aqua', 'Aqua', 705, 98.2, 60),
+    ('terra', 'Terra', 705, 98.2, 60),
+    ('aura', 'Aura', 705, 98.2, 60),
+    ('cluster1', 'Cluster-1', 19000, 90.0, 720),
+    ('mms1', 'MMS-1', 25000, 28.0, 120),
+    ('goes18', 'GOES-18', 35786, 0.0, 720),
+    ('goes19', 'GOES-19', 35786, 0.0, 720),
+    ('ace', 'ACE', 1500000, 0.0, 720),
+]
+BENCHMARK_ALTITUDES_KM = (420, 550, 800, 1200, 20200, 35786)
+
+
+def parse_ssc_time(value):
+    """Parse an SSC ISO 8601 time string (or datetime) into an aware UTC datetime."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+def benchmark_satellites(count, seed=0, resolution=60):
+    """
+    Return a stand-in catalog of many satellites for benchmarks.
+
+    Altitudes are drawn from LEO to GEO (BENCHMARK_ALTITUDES_KM) and
+    inclinations from 0 to 98 degrees.
+
+    Args:
+        count (int): Number of satellites, named bench0000, bench0001, ...
+        seed (int): Random seed, so a benchmark sees the same catalog every run (default: 0)
+        resolution (float): Resolution in seconds of every satellite (default: 60)
+
+    Returns:
+        list: (id, name, altitude_km, inclination_deg, resolution_s) tuples for StandInSscWs
+    """
+    rng = np.random.default_rng(seed)
+    altitudes = rng.choice(BENCHMARK_ALTITUDES_KM, count)
+    inclinations = rng.uniform(0, 98, count)
+    return [(f'bench{i:04d}', f'Bench {i}', float(alt), float(inc), resolution)
+            for i, (alt, inc) in enumerate(zip(altitudes, inclinations))]
+
+
+class StandInSscWs:
+    """
+    Offline SscWs replacement that serves synthetic circular-orbit positions.
+
+    Args:
+        satellites (list): (id, name, altitude_km, inclination_deg, resolution_s) tuples
+                           (default: DEFAULT_STANDIN_SATELLITES)
+        latency (float): Seconds to sleep per get_locations call, to mimic a round trip
+        http_status (int): HttpStatus reported in responses (default: 200)
+    """
+
+    def __init__(self, satellites=None, latency=0.0, http_status=200):
+        self.satellites = {}
+        rng = np.random.default_rng(0)
+        for sat_id, name, altitude, inclination, resolution in (satellites or DEFAULT_STANDIN_SATELLITES):
+            self.satellites[sat_id] = {
+                'id': sat_id,
+                'name': name,
+                'altitude': altitude,
+                'inclination': np.radians(inclination),
+                'raan': rng.uniform(0, 2 * np.pi),
+                'phase': rng.uniform(0, 2 * np.pi),
+                'resolution': resolution,
+            }
+        self.latency = latency
+        self.http_status = http_status
+        self.call_count = 0
+        self._lock = threading.Lock()
+
+    def get_observatories(self):
+        """Return the stand-in observatory list in sscws format."""
+        start = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2100, 1, 1, tzinfo=timezone.utc)
+        return {
+            'HttpStatus': 200,
+            'Observatory': [
+                {'Id': sat['id'], 'Name': sat['name'], 'Resolution': sat['resolution'],
+                 'StartTime': start, 'EndTime': end, 'ResourceId': f"standin:{sat['id']}"}
+                for sat in self.satellites.values()
+            ],
+        }
+
+    def _positions(self, sat, epochs):
+        """Return GEO X, Y, Z (Earth radii), LAT and LON (degrees) for epoch seconds."""
+        radius = EARTH_RADIUS_KM + sat['altitude']
+        mean_motion = np.sqrt(EARTH_MU_KM3_S2 / radius**3)
+        theta = sat['phase'] + mean_motion * epochs
+        inc, raan = sat['inclination'], sat['raan'] - EARTH_ROTATION_RAD_S * epochs
+
+        x = np.cos(raan) * np.cos(theta) - np.sin(raan) * np.sin(theta) * np.cos(inc)
+        y = np.sin(raan) * np.cos(theta) + np.cos(raan) * np.sin(theta) * np.cos(inc)
+        z = np.sin(theta) * np.sin(inc)
+        scale = radius / EARTH_RADIUS_KM
+        return {
+            'X': x * scale,
+            'Y': y * scale,
+            'Z': z * scale,
+            'LAT': np.degrees(np.arcsin(z)),
+            'LON': np.degrees(np.arctan2(y, x)) % 360,
+        }
+
+    def get_locations(self, satellite_ids, time_range, coords=None, **kwargs):
+        """
+        Return positions for the requested satellites in sscws result format.
+
+        Args:
+            satellite_ids (list): Satellite IDs
+            time_range (list): [start, end] ISO 8601 UTC strings or datetimes
+            coords (list): Requested coordinate systems (default: GEO)
+
+        Returns:
+            dict: Result with 'HttpStatus', 'StatusCode' and 'Data' entries
+        """
+        with self._lock:
+            self.call_count += 1
+        if self.latency:
+            threading.Event().wait(self.latency)
+        if self.http_status != 200:
+            return {'HttpStatus': self.http_status, 'StatusCode': 'SERVICE_UNAVAILABLE', 'Data': None}
+
+        start, end = (parse_ssc_time(t) for t in time_range)
+        data = []
+        for sat_id in satellite_ids:
+            sat = self.satellites.get(sat_id)
+            if sat is None:
+                continue
+            step = sat['resolution']
+            first = np.ceil(start.timestamp() / step) * step
+            epochs = np.arange(first, end.timestamp() + 1e-6, step)
+            epoch0 = datetime(1970, 1, 1, tzinfo=timezone.utc)
+            times = [epoch0 + timedelta(seconds=float(t)) for t in epochs]
+            geo = self._positions(sat, epochs)
+            coordinates = []
+            for system in coords or [CoordinateSystem.GEO]:
+                frame = next(f for f, cs in COORDINATE_SYSTEMS.items() if cs == system)
+                if frame == 'geo':
+                    block = dict(geo)
+                else:
+                    xyz = convert_frame(np.column_stack([geo['X'], geo['Y'], geo['Z']]), epochs, 'geo', frame)
+                    block = {'X': xyz[:, 0], 'Y': xyz[:, 1], 'Z': xyz[:, 2]}
+                block['CoordinateSystem'] = system
+                coordinates.append(block)
+            data.append({'Id': sat_id, 'Time': times, 'Coordinates': coordinates})
+
+        return {'HttpStatus': 200, 'StatusCode': 'SUCCESS', 'Data': data}
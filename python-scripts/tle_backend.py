@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Offline Position Backend: SGP4 Propagation from TLE/OMM Element Sets
+
+Implements the part of the SscWs client API that the tracker uses
+(get_observatories and get_locations), but propagates locally stored element
+sets with SGP4 instead of querying SSC. Any code that accepts a client,
+including fetch_satellite_positions(), the position service and the backfill,
+therefore gets the same output shape without network access.
+
+All requested satellites are propagated over the whole time grid in one
+vectorized call (sgp4's SatrecArray). The TEME results are rotated to GEO by
+Greenwich sidereal time, one rotation per timestamp broadcast over every
+satellite.
+
+Element files may be two- or three-line TLE text, or CCSDS OMM as JSON, CSV or
+XML (e.g. CelesTrak's GP data). Satellites are addressed by their NORAD
+catalog number or by a normalized name ('ISS (ZARYA)' -> 'iss_zarya').
+
+Requires the optional sgp4 package:
+    pip install sgp4
+"""
+
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sscws.coordinates import CoordinateSystem
+
+from frames import convert as convert_frame
+from frames import gmst
+from satellite_tracker import COORDINATE_SYSTEMS, DEFAULT_RESOLUTION_S, EARTH_RADIUS_KM
+from ssc_standin import parse_ssc_time
+
+UNIX_EPOCH_JD = 2440587.5
+SECONDS_PER_DAY = 86400.0
+
+
+def normalize_name(name):
+    """Return a satellite ID from an element-set name ('ISS (ZARYA)' -> 'iss_zarya')."""
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def _read_tle(path):
+    """Yield (name, line1, line2) from a two- or three-line TLE file."""
+    with open(path) as f:
+        lines = [line.rstrip() for line in f if line.strip()]
+    name = None
+    idx = 0
+    while idx < len(lines):
+        line = lines[idx]
+        if line.startswith('1 ') and idx + 1 < len(lines) and lines[idx + 1].startswith('2 '):
+            yield name or line[2:7].strip(), line, lines[idx + 1]
+            name = None
+            idx += 2
+        else:
+            name = line[2:].strip() if line.startswith('0 ') else line.strip()
+            idx += 1
+
+
+def _read_omm(path):
+    """Yield OMM field dictionaries from a JSON, CSV or XML file."""
+    from sgp4 import omm
+
+    if path.endswith('.json'):
+        with open(path) as f:
+            records = json.load(f)
+        yield from (records if isinstance(records, list) else [records])
+    elif path.endswith('.xml'):
+        with open(path) as f:
+            yield from omm.parse_xml(f)
+    else:
+        with open(path, newline='') as f:
+            yield from omm.parse_csv(f)
+
+
+def load_element_sets(paths):
+    """
+    Load element sets from TLE or OMM files.
+
+    Args:
+        paths (list): File paths; '.json', '.csv' and '.xml' are read as OMM,
+                      anything else as TLE text
+
+    Returns:
+        list: Dictionaries with 'id', 'name', 'norad' and the initialized 'satrec';
+              later files override earlier ones for the same catalog number
+    """
+    from sgp4 import omm
+    from sgp4.api import Satrec
+
+    elements = {}
+    for path in [paths] if isinstance(paths, str) else paths:
+        if path.endswith(('.json', '.csv', '.xml')):
+            for fields in _read_omm(path):
+                satrec = Satrec()
+                omm.initialize(satrec, fields)
+                name = fields.get('OBJECT_NAME') or str(satrec.satnum)
+                elements[satrec.satnum] = (name, satrec)
+        else:
+            for name, line1, line2 in _read_tle(path):
+                satrec = Satrec.twoline2rv(line1, line2)
+                elements[satrec.satnum] = (name, satrec)
+
+    return [{'id': normalize_name(name), 'name': name, 'norad': norad, 'satrec': satrec}
+            for norad, (name, satrec) in elements.items()]
+
+
+def propagate(satrecs, epochs):
+    """
+    Propagate element sets to common timestamps with vectorized SGP4.
+
+    Args:
+        satrecs (list): sgp4 Satrec objects
+        epochs (array): (T,) UTC epoch seconds
+
+    Returns:
+        numpy.ndarray: (n, T, 3) GEO positions in km, NaN where SGP4 reported an error
+    """
+    from sgp4.api import SatrecArray
+
+    epochs = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+    days = np.floor(epochs / SECONDS_PER_DAY)
+    jd = UNIX_EPOCH_JD + days
+    fr = (epochs - days * SECONDS_PER_DAY) / SECONDS_PER_DAY
+    errors, teme, _ = SatrecArray(list(satrecs)).sgp4(jd, fr)
+
+    # TEME -> GEO: rotate by -GMST about the pole, one angle per timestamp
+    theta = gmst(epochs)
+    c, s = np.cos(theta), np.sin(theta)
+    geo = np.empty_like(teme)
+    geo[..., 0] = c * teme[..., 0] + s * teme[..., 1]
+    geo[..., 1] = c * teme[..., 1] - s * teme[..., 0]
+    geo[..., 2] = teme[..., 2]
+    geo[errors != 0] = np.nan
+    return geo
+
+
+class TleClient:
+    """
+    SscWs-compatible client that propagates TLE/OMM element sets locally.
+
+    Args:
+        paths (list): TLE or OMM files to load (see load_element_sets())
+        resolution_s (float): Sample spacing in seconds (default: DEFAULT_RESOLUTION_S, 60)
+    """
+
+    def __init__(self, paths, resolution_s=DEFAULT_RESOLUTION_S):
+        self.resolution_s = resolution_s
+        self.elements = load_element_sets(paths)
+        self._by_key = {}
+        for element in self.elements:
+            self._by_key[element['id']] = element
+            self._by_key[str(element['norad'])] = element
+
+    def get_observatories(self):
+        """Return the loaded element sets as an sscws observatory list."""
+        observatories = []
+        for element in self.elements:
+            epoch = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(
+                days=element['satrec'].jdsatepoch + element['satrec'].jdsatepochF - UNIX_EPOCH_JD)
+            observatories.append({
+                'Id': element['id'], 'Name': element['name'], 'Resolution': self.resolution_s,
+                'StartTime': epoch - timedelta(days=30), 'EndTime': epoch + timedelta(days=30),
+                'ResourceId': f"norad:{element['norad']}",
+            })
+        return {'HttpStatus': 200, 'Observatory': observatories}
+
+    def get_locations(self, satellite_ids, time_range, coords=None, **kwargs):
+        """
+        Return propagated positions in sscws result format.
+
+        Args:
+            satellite_ids (list): Satellite IDs (normalized names or NORAD numbers)
+            time_range (list): [start, end] ISO 8601 UTC strings or datetimes
+            coords (list): Requested coordinate systems (default: GEO)
+
+        Returns:
+            dict: Result with 'HttpStatus', 'StatusCode' and 'Data' entries
+        """
+        found = [(sat_id, self._by_key[str(sat_id).lower()]) for sat_id in satellite_ids
+                 if str(sat_id).lower() in self._by_key]
+        start, end = (parse_ssc_time(t) for t in time_range)
+        step = self.resolution_s
+        epochs = np.arange(np.ceil(start.timestamp() / step) * step, end.timestamp() + 1e-6, step)
+        if not found or len(epochs) == 0:
+            return {'HttpStatus': 200, 'StatusCode': 'SUCCESS', 'Data': []}
+
+        geo = propagate([element['satrec'] for _, element in found], epochs) / EARTH_RADIUS_KM
+        epoch0 = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        times = [epoch0 + timedelta(seconds=float(t)) for t in epochs]
+
+        data = []
+        for (sat_id, _), xyz in zip(found, geo):
+            valid = np.isfinite(xyz[:, 0])
+            xyz, sat_epochs = xyz[valid], epochs[valid]
+            r = np.linalg.norm(xyz, axis=1)
+            coordinates = []
+            for system in coords or [CoordinateSystem.GEO]:
+                frame = next(f for f, cs in COORDINATE_SYSTEMS.items() if cs == system)
+                block_xyz = xyz if frame == 'geo' else convert_frame(xyz, sat_epochs, 'geo', frame)
+                block = {'X': block_xyz[:, 0], 'Y': block_xyz[:, 1], 'Z': block_xyz[:, 2]}
+                if frame == 'geo':
+                    block['LAT'] = np.degrees(np.arcsin(xyz[:, 2] / r))
+                    block['LON'] = np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0])) % 360
+                block['CoordinateSystem'] = system
+                coordinates.append(block)
+            sat_times = times if valid.all() else [t for t, ok in zip(times, valid) if ok]
+            data.append({'Id': sat_id, 'Time': sat_times, 'Coordinates': coordinates})
+
+        return {'HttpStatus': 200, 'StatusCode': 'SUCCESS', 'Data': data}
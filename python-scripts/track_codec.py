@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Compressed Archival Encoding for Satellite Tracks
+
+Packs a track's columns (t, lat, lon, alt, x, y, z) into one compact blob for
+long-term storage. Minute-resolution tracks are smooth, so most of their
+information is in the first few samples; the rest is made cheap to store by:
+
+1. Timestamps: integer milliseconds, delta-of-delta encoded (a regular
+   cadence becomes a run of zeros).
+2. Coordinates: quantized to fixed point with a per-column precision
+   (default about 1 m), then delta or delta-of-delta encoded, whichever
+   gives smaller residuals. Longitude is unwrapped first so crossing the
+   antimeridian is not a jump.
+3. Residuals: zigzag-mapped to unsigned, narrowed to the smallest integer
+   width that holds them, and byte-shuffled so equal-significance bytes sit
+   together.
+4. A general-purpose compressor (zlib by default; lzma or bz2 from the
+   standard library) over all columns.
+
+Every step is a whole-array NumPy operation, so encoding and decoding never
+loop over samples. Decoding is exact up to the chosen precision.
+
+Usage:
+    blob = encode_columns({'t': epochs, 'lat': lat, ...})
+    columns = decode_columns(blob)
+    python track_codec.py --benchmark
+"""
+
+import argparse
+import bz2
+import json
+import lzma
+import struct
+import time
+import zlib
+
+import numpy as np
+
+CODEC_MAGIC = b'STRK'
+CODEC_VERSION = 1
+
+# Quantum of each column in its own units: seconds, degrees, km
+DEFAULT_PRECISION = {
+    't': 1e-3,
+    'lat': 1e-5,
+    'lon': 1e-5,
+    'alt': 1e-3,
+    'x': 1e-3,
+    'y': 1e-3,
+    'z': 1e-3,
+}
+
+COMPRESSORS = {
+    'zlib': (zlib.compress, zlib.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+    'bz2': (lambda data, level: bz2.compress(data, max(1, level)), bz2.decompress),
+    'none': (lambda data, level: data, lambda data: data),
+}
+
+_WIDTHS = (np.uint8, np.uint16, np.uint32, np.uint64)
+_PERIODIC = {'lon': 360.0}
+_HEADER = struct.Struct('<4sBI')
+
+
+def _zigzag(values):
+    """Map signed int64 to unsigned so small magnitudes become small numbers."""
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values):
+    """Invert _zigzag()."""
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)) ^ (np.uint64(0) - (values & np.uint64(1)))).view(np.int64)
+
+
+def _difference(quantized, order):
+    """Return (heads, residuals): the leading values of each difference level and the last level."""
+    heads = []
+    for _ in range(order):
+        heads.append(int(quantized[0]))
+        quantized = np.diff(quantized)
+    return heads, quantized
+
+
+def _integrate(heads, residuals):
+    """Invert _difference()."""
+    values = residuals
+    for head in reversed(heads):
+        values = np.cumsum(np.concatenate((np.array([head], dtype=np.int64), values)))
+    return values
+
+
+def _narrow(unsigned):
+    """Return the smallest unsigned dtype that holds every value."""
+    top = int(unsigned.max()) if len(unsigned) else 0
+    for dtype in _WIDTHS:
+        if top <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _shuffle(array):
+    """Group the bytes of fixed-width integers by significance."""
+    width = array.dtype.itemsize
+    return array.view(np.uint8).reshape(-1, width).T.tobytes()
+
+
+def _unshuffle(data, dtype, count):
+    """Invert _shuffle()."""
+    width = np.dtype(dtype).itemsize
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(width, count)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(count)
+
+
+def _encode_column(name, values, quantum):
+    """Quantize and difference one column; return (metadata, payload bytes)."""
+    values = np.asarray(values, dtype=np.float64)
+    meta = {'name': name, 'quantum': quantum, 'count': len(values)}
+
+    missing = ~np.isfinite(values)
+    if missing.any():
+        meta['missing'] = int(missing.sum())
+        mask = np.packbits(missing).tobytes()
+        values = values.copy()
+        values[missing] = np.interp(np.flatnonzero(missing), np.flatnonzero(~missing),
+                                    values[~missing]) if not missing.all() else 0.0
+    else:
+        mask = b''
+
+    if name in _PERIODIC and len(values):
+        period = _PERIODIC[name]
+        meta['period'] = period
+        meta['base'] = -period / 2 if values.min() < 0 else 0.0
+        values = np.unwrap(values, period=period)
+
+    quantized = np.round(values / quantum).astype(np.int64)
+    # Delta-of-delta for timestamps and smooth columns, unless plain deltas are smaller
+    best = None
+    for order in ((2,) if name == 't' else (1, 2)):
+        order = min(order, max(len(quantized) - 1, 0))
+        heads, residuals = _difference(quantized, order)
+        unsigned = _zigzag(residuals)
+        dtype = _narrow(unsigned)
+        if best is None or dtype.itemsize < best[2].itemsize:
+            best = (heads, unsigned, dtype)
+    heads, unsigned, dtype = best
+    meta.update(heads=heads, dtype=dtype.str)
+    payload = _shuffle(unsigned.astype(dtype))
+    meta['bytes'] = len(payload)
+    meta['mask_bytes'] = len(mask)
+    return meta, mask + payload
+
+
+def _decode_column(meta, data):
+    """Invert _encode_column()."""
+    count = meta['count']
+    mask_bytes = meta['mask_bytes']
+    residual_count = count - len(meta['heads'])
+    unsigned = _unshuffle(data[mask_bytes:mask_bytes + meta['bytes']], np.dtype(meta['dtype']), residual_count)
+    values = _integrate(meta['heads'], _unzigzag(unsigned)) * meta['quantum'] if count else np.zeros(0)
+    if 'period' in meta:
+        values = (values - meta['base']) % meta['period'] + meta['base']
+    if mask_bytes:
+        missing = np.unpackbits(np.frombuffer(data[:mask_bytes], dtype=np.uint8), count=count).astype(bool)
+        values[missing] = np.nan
+    return values
+
+
+def encode_columns(columns, precision=None, compressor='zlib', level=6):
+    """
+    Encode equal-length track columns into a compressed blob.
+
+    Args:
+        columns (dict): {name: array}; 't' is epoch seconds, other columns are
+                        floats in their own units (NaN marks a missing value)
+        precision (dict): Quantum per column, overriding DEFAULT_PRECISION
+                          (columns not in either use 1e-6)
+        compressor (str): 'zlib' (default), 'lzma', 'bz2' or 'none'
+        level (int): Compression level (default: 6)
+
+    Returns:
+        bytes: Encoded blob
+    """
+    quanta = dict(DEFAULT_PRECISION, **(precision or {}))
+    metas, payloads = [], []
+    for name, values in columns.items():
+        meta, payload = _encode_column(name, values, quanta.get(name, 1e-6))
+        metas.append(meta)
+        payloads.append(payload)
+
+    header = json.dumps({'compressor': compressor, 'columns': metas}, separators=(',', ':')).encode()
+    body = COMPRESSORS[compressor][0](b''.join(payloads), level)
+    return _HEADER.pack(CODEC_MAGIC, CODEC_VERSION, len(header)) + header + body
+
+
+def decode_columns(blob, columns=None):
+    """
+    Decode a blob written by encode_columns().
+
+    Args:
+        blob (bytes): Encoded blob
+        columns (tuple): Column names to return (default: all)
+
+    Returns:
+        dict: {name: float64 array}
+    """
+    magic, version, header_size = _HEADER.unpack_from(blob)
+    if magic != CODEC_MAGIC or version != CODEC_VERSION:
+        raise ValueError("Not an encoded track blob (or an unsupported version)")
+    header = json.loads(blob[_HEADER.size:_HEADER.size + header_size])
+    body = COMPRESSORS[header['compressor']][1](blob[_HEADER.size + header_size:])
+
+    decoded = {}
+    offset = 0
+    for meta in header['columns']:
+        size = meta['mask_bytes'] + meta['bytes']
+        if columns is None or meta['name'] in columns:
+            decoded[meta['name']] = _decode_column(meta, body[offset:offset + size])
+        offset += size
+    return decoded
+
+
+def track_columns(sat):
+    """Return a satellite data dictionary's samples as codec columns (t, lat, lon, alt, x, y, z)."""
+    from satellite_tracker import times_to_epoch_seconds
+
+    return {'t': times_to_epoch_seconds(sat['times']), 'lat': sat['latitudes'], 'lon': sat['longitudes'],
+            'alt': sat['altitudes'], 'x': sat['x'], 'y': sat['y'], 'z': sat['z']}
+
+
+def benchmark(satellite_count=300, hours=24, compressors=('zlib', 'lzma', 'bz2'), repeats=3):
+    """
+    Measure compression ratio and throughput on fetch_satellite_positions() output.
+
+    Tracks come from the offline SSC stand-in at one-minute resolution. The
+    raw size counts the seven float64 columns. npz is TrackStore's default
+    format (np.savez), and npz+zlib applies the same compressor to raw floats.
+
+    Args:
+        satellite_count (int): Satellites, spread from LEO to GEO (default: 300)
+        hours (float): Track length in hours (default: 24)
+        compressors (tuple): Compressors to compare
+        repeats (int): Timing runs; the fastest is reported
+
+    Returns:
+        list: One dict per compressor with 'ratio', 'encode_mb_s', 'decode_mb_s',
+              'decode_samples_s' and 'max_error' (per column)
+    """
+    import io
+    from datetime import datetime, timedelta
+
+    from satellite_tracker import fetch_satellite_positions
+    from ssc_standin import StandInSscWs, benchmark_satellites
+
+    satellites = benchmark_satellites(satellite_count, seed=1)
+    end = datetime(2025, 1, 2)
+    satellite_data = fetch_satellite_positions([s[0] for s in satellites], client=StandInSscWs(satellites),
+                                               start_time=end - timedelta(hours=hours), end_time=end,
+                                               verbose=False)
+    tracks = [track_columns(sat) for sat in satellite_data]
+    samples = sum(len(track['t']) for track in tracks)
+    raw = sum(8 * len(track) * len(track['t']) for track in tracks)
+    npz = npz_zlib = 0
+    for track in tracks:
+        for save in (np.savez, np.savez_compressed):
+            buffer = io.BytesIO()
+            save(buffer, **track)
+            if save is np.savez:
+                npz += buffer.tell()
+            else:
+                npz_zlib += buffer.tell()
+    print(f"{len(tracks)} tracks, {samples:,} samples: raw {raw / 1e6:.2f} MB, "
+          f"npz {npz / 1e6:.2f} MB, npz+zlib {npz_zlib / 1e6:.2f} MB ({raw / npz_zlib:.1f}x)")
+
+    results = []
+    for compressor in compressors:
+        encode_s = decode_s = np.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            blobs = [encode_columns(track, compressor=compressor) for track in tracks]
+            encode_s = min(encode_s, time.perf_counter() - start)
+            start = time.perf_counter()
+            decoded = [decode_columns(blob) for blob in blobs]
+            decode_s = min(decode_s, time.perf_counter() - start)
+        size = sum(len(blob) for blob in blobs)
+        max_error = {name: max(float(np.max(np.abs(out[name] - track[name])))
+                               for track, out in zip(tracks, decoded)) for name in tracks[0]}
+        results.append({'compressor': compressor, 'bytes': size, 'ratio': raw / size,
+                        'encode_mb_s': raw / 1e6 / encode_s, 'decode_mb_s': raw / 1e6 / decode_s,
+                        'decode_samples_s': samples / decode_s, 'max_error': max_error})
+        print(f"  {compressor:<5} {size / 1e6:7.3f} MB  ratio {raw / size:5.1f}x  "
+              f"encode {raw / 1e6 / encode_s:6.1f} MB/s  decode {raw / 1e6 / decode_s:6.1f} MB/s "
+              f"({samples / decode_s / 1e6:.1f} M samples/s)")
+    errors = ', '.join(f"{name} {error:.1e}" for name, error in results[0]['max_error'].items())
+    print(f"  max abs error: {errors}")
+    return results
+
+
+def main():
+    """Main function with command line options."""
+    parser = argparse.ArgumentParser(description='Compressed archival encoding for satellite tracks')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Measure compression ratio and throughput on stand-in tracks')
+    parser.add_argument('--satellites', '-n', type=int, default=300,
+                        help='Satellites in the benchmark (default: 300)')
+    parser.add_argument('--hours', type=float, default=24,
+                        help='Track length in hours for the benchmark (default: 24)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.satellites, args.hours)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Columnar On-Disk Track Store
+
+Stores satellite tracks as one file per (satellite, UTC day) with each column
+(t, lat, lon, alt, x, y, z) kept as a separate array, so readers only touch
+the days and columns they need. Files are written to a temporary name and
+renamed into place, so a crash never leaves a half-written unit behind.
+
+Units are plain .npz files by default, or compressed archival .trk blobs
+(see track_codec.py) when the store is opened with compress=True. Readers
+handle both, so a store can be switched to compression at any time.
+
+Layout:
+    <root>/<satellite_id>/<YYYY-MM-DD>.npz (or .trk)
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from satellite_tracker import times_to_epoch_seconds
+from track_codec import decode_columns, encode_columns
+
+STORE_COLUMNS = ('t', 'lat', 'lon', 'alt', 'x', 'y', 'z')
+_RECORD_FIELDS = {'lat': 'latitudes', 'lon': 'longitudes', 'alt': 'altitudes',
+                  'x': 'x', 'y': 'y', 'z': 'z'}
+UNIT_EXTENSIONS = ('.npz', '.trk')
+
+
+def day_range(start_day, end_day):
+    """Return the list of dates from start_day up to but excluding end_day."""
+    return [start_day + timedelta(days=i) for i in range((end_day - start_day).days)]
+
+
+def day_bounds(day):
+    """Return (start, end) naive UTC datetimes covering one day."""
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+
+class TrackStore:
+    """
+    Columnar store of satellite tracks, one file per satellite per UTC day.
+
+    Args:
+        root (str): Store directory (created if missing)
+        compress (bool): Write new units with the archival codec (default: False, .npz)
+        precision (dict): Codec quantum per column (default: track_codec.DEFAULT_PRECISION)
+    """
+
+    def __init__(self, root, compress=False, precision=None):
+        self.root = root
+        self.compress = compress
+        self.precision = precision
+        os.makedirs(root, exist_ok=True)
+
+    def unit_path(self, satellite_id, day, extension=None):
+        """Return the file path of one (satellite, day) unit in this store's write format."""
+        extension = extension or ('.trk' if self.compress else '.npz')
+        return os.path.join(self.root, satellite_id, f"{day.isoformat()}{extension}")
+
+    def _existing_unit(self, satellite_id, day):
+        """Return the path of a written (satellite, day) unit in either format, or None."""
+        for extension in UNIT_EXTENSIONS:
+            path = self.unit_path(satellite_id, day, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def has_unit(self, satellite_id, day):
+        """Return True if the (satellite, day) unit has been written."""
+        return self._existing_unit(satellite_id, day) is not None
+
+    def write_unit(self, satellite_id, day, sat):
+        """
+        Write one satellite's samples for one day.
+
+        Args:
+            satellite_id (str): Satellite ID
+            day (date): UTC day the samples belong to
+            sat (dict): Satellite data dictionary from fetch_satellite_positions()
+                        (or None for a day without samples)
+
+        Returns:
+            int: Number of samples written
+        """
+        if sat is None:
+            columns = {name: np.zeros(0) for name in STORE_COLUMNS}
+        else:
+            epochs = times_to_epoch_seconds(sat['times'])
+            columns = {'t': epochs}
+            for name, field in _RECORD_FIELDS.items():
+                columns[name] = np.asarray(sat.get(field, np.full(len(epochs), np.nan)), dtype=np.float64)
+
+        path = self.unit_path(satellite_id, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            if self.compress:
+                f.write(encode_columns(columns, self.precision))
+            else:
+                np.savez(f, **columns)
+        os.replace(tmp_path, path)
+        stale = self.unit_path(satellite_id, day, '.npz' if self.compress else '.trk')
+        if os.path.exists(stale):
+            os.remove(stale)  # Rewritten in the other format
+        return len(columns['t'])
+
+    def satellites(self):
+        """Return the sorted list of satellite IDs present in the store."""
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, name)))
+
+    def days(self, satellite_id):
+        """Return the sorted list of days stored for a satellite."""
+        directory = os.path.join(self.root, satellite_id)
+        if not os.path.isdir(directory):
+            return []
+        return sorted({date.fromisoformat(name[:-4]) for name in os.listdir(directory)
+                       if name.endswith(UNIT_EXTENSIONS)})
+
+    def read_track(self, satellite_id, start=None, end=None, columns=STORE_COLUMNS):
+        """
+        Read a satellite's stored samples between two epochs.
+
+        Args:
+            satellite_id (str): Satellite ID
+            start (float): Start epoch seconds, inclusive (default: None, from the first sample)
+            end (float): End epoch seconds, inclusive (default: None, to the last sample)
+            columns (tuple): Columns to load (default: all)
+
+        Returns:
+            dict: Satellite data dictionary with 'times' as epoch seconds, or None
+                  if nothing is stored in the range
+        """
+        days = self.days(satellite_id)
+        if start is not None:
+            first = datetime.fromtimestamp(start, timezone.utc).date()
+            days = [d for d in days if d >= first]
+        if end is not None:
+            last = datetime.fromtimestamp(end, timezone.utc).date()
+            days = [d for d in days if d <= last]
+
+        columns = ('t',) + tuple(c for c in columns if c != 't')
+        pieces = {name: [] for name in columns}
+        for day in days:
+            path = self._existing_unit(satellite_id, day)
+            if path.endswith('.trk'):
+                with open(path, 'rb') as f:
+                    unit = decode_columns(f.read(), columns)
+                for name in columns:
+                    pieces[name].append(unit[name])
+                continue
+            with np.load(path) as unit:
+                for name in columns:
+                    pieces[name].append(unit[name])
+        if not days:
+            return None
+
+        data = {name: np.concatenate(arrays) for name, arrays in pieces.items()}
+        mask = np.ones(len(data['t']), dtype=bool)
+        if start is not None:
+            mask &= data['t'] >= start
+        if end is not None:
+            mask &= data['t'] <= end
+        if not mask.any():
+            return None
+
+        sat = {'id': satellite_id, 'times': data['t'][mask]}
+        for name in columns[1:]:
+            sat[_RECORD_FIELDS[name]] = data[name][mask]
+        return sat
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Check conjunction screening against a brute-force pairwise minimum
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-scripts'))
+
+from conjunction import align_tracks, screen_conjunctions
+
+
+def make_tracks(count=40, seed=7):
+    """Circular orbits with random planes and phases, plus a few fast, high movers."""
+    rng = np.random.default_rng(seed)
+    epochs = 1735689600.0 + np.arange(0, 3 * 3600, 60.0)
+    tracks = []
+    for i in range(count):
+        radius = rng.uniform(6800, 7300) if i >= 3 else rng.uniform(30000, 60000)
+        period = 2 * np.pi * np.sqrt(radius ** 3 / 398600.4418)
+        if i < 3:
+            period /= 20   # fast movers exercise the separate fast-mover path
+        normal = rng.normal(size=3)
+        normal /= np.linalg.norm(normal)
+        u = np.cross(normal, [0.0, 0.0, 1.0])
+        u /= np.linalg.norm(u)
+        v = np.cross(normal, u)
+        angle = 2 * np.pi * (epochs - epochs[0]) / period + rng.uniform(0, 2 * np.pi)
+        xyz = radius * (np.cos(angle)[:, None] * u + np.sin(angle)[:, None] * v)
+        keep = slice(0, len(epochs) // 2) if i == count - 1 else slice(None)   # partial coverage
+        tracks.append({'id': f'sat{i:02d}', 'times': epochs[keep],
+                       'x': xyz[keep, 0], 'y': xyz[keep, 1], 'z': xyz[keep, 2]})
+    return tracks
+
+
+def brute_force_minimum(positions):
+    """Exact minimum distance of every pair over every linear segment, without pruning."""
+    minima = {}
+    for a, b in itertools.combinations(range(positions.shape[0]), 2):
+        best = np.inf
+        for step in range(positions.shape[1] - 1):
+            r0 = positions[a, step] - positions[b, step]
+            r1 = positions[a, step + 1] - positions[b, step + 1]
+            if np.isnan(r0).any() or np.isnan(r1).any():
+                continue
+            dr = r1 - r0
+            s = 0.0 if not dr.dot(dr) else min(max(-r0.dot(dr) / dr.dot(dr), 0.0), 1.0)
+            best = min(best, float(np.linalg.norm(r0 + s * dr)))
+        minima[(a, b)] = best
+    return minima
+
+
+def test_screen_matches_brute_force():
+    tracks = make_tracks()
+    threshold_km = 1500.0
+    ids, _, positions = align_tracks(tracks)
+    minima = brute_force_minimum(positions)
+    expected = {(ids[a], ids[b]): d for (a, b), d in minima.items() if d <= threshold_km}
+    assert len(expected) >= 5
+
+    found = {(a, b): d for a, b, _, d in screen_conjunctions(tracks, threshold_km)}
+    assert set(found) == set(expected)
+    for pair, distance in found.items():
+        assert abs(distance - expected[pair]) < 1e-6
+
+
+def test_screen_reports_time_of_closest_approach():
+    tracks = make_tracks(count=3)[1:]
+    epochs = tracks[0]['times']
+    # A chaser drifts through the first satellite, 5 km abeam halfway between two samples
+    middle = len(epochs) // 2
+    drift = 100.0 * (np.arange(len(epochs)) - (middle + 0.5))
+    tracks[1] = {'id': 'chaser', 'times': epochs, 'x': tracks[0]['x'] + drift,
+                 'y': tracks[0]['y'] + 5.0, 'z': tracks[0]['z']}
+
+    result = screen_conjunctions(tracks, 100.0)
+    assert [(a, b) for a, b, _, _ in result] == [(tracks[0]['id'], 'chaser')]
+    _, _, tca, distance = result[0]
+    assert abs(tca - (epochs[middle] + 30.0)) < 1.0
+    assert 4.0 < distance < 6.0
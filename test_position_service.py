@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Check the position service's conditional snapshot requests, slow WebSocket clients and call counts
+"""
+
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-scripts'))
+
+from position_service import SUBSCRIBER_QUEUE_SIZE, PositionRequestHandler, PositionState
+from ssc_standin import StandInSscWs
+
+
+class FailingClient(StandInSscWs):
+    """Stand-in whose location requests fail."""
+
+    def get_locations(self, *args, **kwargs):
+        raise ConnectionError("SSC unreachable")
+
+
+@pytest.fixture
+def server():
+    state = PositionState(['iss', 'goes18', 'ace'], client=StandInSscWs())
+    handler = type('TestHandler', (PositionRequestHandler,), {'state': state})
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield state, f'http://127.0.0.1:{httpd.server_address[1]}'
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def get(url, etag=None):
+    """Return (status, headers, body), with 304 as a status rather than an error."""
+    request = urllib.request.Request(url, headers={'If-None-Match': etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_snapshot_etag_and_not_modified(server):
+    state, base = server
+    assert get(base + '/snapshot.json')[0] == 503   # nothing fetched yet
+    state.refresh()
+
+    status, headers, body = get(base + '/snapshot.json')
+    etag = headers['ETag']
+    assert status == 200 and json.loads(body)['version'] == state.version
+    assert get(base + '/snapshot.json', etag)[:1] == (304,)
+    assert get(base + '/snapshot.json', etag)[2] == b''
+    assert get(base + '/snapshot.bin', etag)[0] == 200   # each format has its own tag
+
+    state.refresh()   # no newer samples: the snapshot and its tag stay the same
+    assert get(base + '/snapshot.json', etag)[0] == 304
+
+    state.tracks.pop('iss')   # the next refresh brings the ISS back as new data
+    state.refresh()
+    status, headers, _ = get(base + '/snapshot.json', etag)
+    assert status == 200 and headers['ETag'] != etag
+
+
+def test_slow_subscriber_queue_is_bounded_and_resynchronised():
+    state = PositionState(['iss', 'goes18', 'ace'], client=StandInSscWs())
+    state.refresh()
+    subscriber = state.subscribe()
+    for _ in range(3 * SUBSCRIBER_QUEUE_SIZE):
+        state.tracks.clear()   # every refresh then changes every satellite
+        state.refresh()
+        assert subscriber.qsize() <= SUBSCRIBER_QUEUE_SIZE
+
+    messages = [json.loads(subscriber.get_nowait()) for _ in range(subscriber.qsize())]
+    assert messages[0]['type'] == 'full'   # the backlog was collapsed into the full state
+    assert {entry['id'] for entry in messages[0]['positions']} == {'iss', 'goes18', 'ace'}
+    assert messages[-1]['version'] == state.version
+    state.unsubscribe(subscriber)
+
+
+def test_failed_refresh_is_not_counted_as_an_upstream_call():
+    state = PositionState(['iss'], client=FailingClient())
+    with pytest.raises(ConnectionError):
+        state.refresh()
+    assert state.status()['upstream_calls'] == 0
+    assert state.status()['failed_calls'] == 1
+    assert state.version == 0
+
+    state.client = StandInSscWs()
+    state.refresh()
+    assert state.status()['upstream_calls'] == 1
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Check refresh intervals of eccentric orbits and the grouping of due satellites into fetches
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-scripts'))
+
+from frames import convert
+from refresh_scheduler import RefreshScheduler, angular_rate, fetch_groups, window_rate
+from satellite_tracker import EARTH_MU_KM3_S2
+
+START = 1735689600.0
+
+
+def orbit_track(sat_id, a, e, inclination, mean_anomaly, resolution=60.0, hours=1.0):
+    """Two-body track in fetch_satellite_positions() layout, with GEI positions rotated into GEO."""
+    epochs = START + np.arange(0, hours * 3600 + 1, resolution)
+    mean = mean_anomaly + np.sqrt(EARTH_MU_KM3_S2 / a**3) * (epochs - epochs[0])
+    eccentric = mean.copy()
+    for _ in range(50):
+        eccentric = mean + e * np.sin(eccentric)
+    p = a * (np.cos(eccentric) - e)
+    q = a * np.sqrt(1 - e**2) * np.sin(eccentric)
+    inc = np.radians(inclination)
+    # Perigee in the orbital plane at the ascending node, tilted about x
+    gei = np.column_stack([p, q * np.cos(inc), q * np.sin(inc)])
+    geo = convert(gei, epochs, 'gei', 'geo')
+    zeros = np.zeros(len(epochs))
+    return {'id': sat_id, 'times': epochs, 'latitudes': zeros, 'longitudes': zeros, 'altitudes': zeros,
+            'x': geo[:, 0], 'y': geo[:, 1], 'z': geo[:, 2], 'coordinates': {}}
+
+
+def test_eccentric_orbit_seen_near_apogee_keeps_a_short_interval():
+    # Molniya-like: slow near apogee, 0.08 degrees/s at perigee
+    molniya = orbit_track('molniya', 26600.0, 0.74, 63.4, np.pi - 0.2)
+    geostationary = orbit_track('geo', 42164.2, 0.0, 0.0, 0.0)
+    scheduler = RefreshScheduler(['molniya', 'geo'], tolerance_deg=2.0,
+                                 resolutions={'molniya': 60.0, 'geo': 60.0})
+    scheduler.add([molniya, geostationary], START + 3600)
+
+    xyz = np.column_stack([molniya['x'], molniya['y'], molniya['z']])
+    newest = angular_rate(molniya['times'][None, -2:], xyz[None, -2:])[0]
+    assert 2.0 / newest > 480   # the rate of the two newest samples alone allows 8 minutes or more
+    assert scheduler.interval['molniya'] == 60.0
+    assert scheduler.interval['geo'] == 1800.0
+
+
+def test_window_rate_is_the_fastest_step_of_each_track():
+    tracks = [orbit_track('leo', 6800.0, 0.0, 51.6, 0.0),
+              orbit_track('elliptic', 12000.0, 0.4, 20.0, -0.5, hours=2.0),
+              orbit_track('short', 7000.0, 0.0, 98.0, 1.0, hours=1 / 60)]
+    expected = []
+    for track in tracks:
+        epochs = np.column_stack([track['times'][:-1], track['times'][1:]])
+        xyz = np.column_stack([track['x'], track['y'], track['z']])
+        expected.append(angular_rate(epochs, np.stack([xyz[:-1], xyz[1:]], axis=1)).max())
+    assert np.allclose(window_rate([dict(track, epochs=track['times']) for track in tracks]), expected)
+
+
+def test_fetch_groups_split_by_newest_sample():
+    resolution = {'leo1': 60.0, 'leo2': 60.0, 'leo3': 60.0, 'geo': 720.0, 'new': 60.0}
+    last = {'leo1': 10_000.0, 'geo': 9_360.0, 'leo2': 10_000.0, 'leo3': 9_880.0, 'new': None}
+    groups = fetch_groups(last, resolution, window_start=5_000.0, refetch_steps=4)
+    assert groups == [(['new'], 5_000.0), (['geo'], 9_360.0), (['leo3', 'leo1', 'leo2'], 9_880.0)]
+
+    # A window that starts after every stored sample puts them all in one fetch from its start
+    assert fetch_groups(last, resolution, window_start=20_000.0)[1:] == [(['geo', 'leo3', 'leo1', 'leo2'], 20_000.0)]
+
+
+@pytest.mark.parametrize('steps', [0, 20])
+def test_fetch_groups_refetch_steps(steps):
+    resolution = dict.fromkeys(('a', 'b'), 60.0)
+    groups = fetch_groups({'a': 0.0, 'b': 600.0}, resolution, window_start=-3600.0, refetch_steps=steps)
+    assert len(groups) == (2 if steps < 10 else 1)
+
+
+def test_failed_fetches_are_not_counted():
+    class FailingClient:
+        def get_locations(self, *args, **kwargs):
+            raise ConnectionError("SSC unreachable")
+
+    scheduler = RefreshScheduler(['iss', 'goes18'], client=FailingClient(), resolutions={'iss': 60.0, 'goes18': 720.0})
+    assert sorted(scheduler.refresh(START)) == ['goes18', 'iss']
+    assert scheduler.fetch_calls == 0 and scheduler.fetched_satellites == 0
+    assert scheduler.next_due() == START + 60.0   # both are retried later
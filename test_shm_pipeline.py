@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Check that shared-memory track buffers never hand out a torn read as fresh
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-scripts'))
+
+from shm_pipeline import TRACK_FIELDS, SharedTrackBuffer
+
+SATELLITES = ['sat0', 'sat1', 'sat2', 'sat3']
+CAPACITY = 20000
+
+
+def frame(number):
+    """Tracks whose every time and value encodes the frame number."""
+    times = np.full(CAPACITY, np.datetime64(1_700_000_000 + number, 's')).astype('datetime64[us]')
+    return [dict({'id': sat_id, 'times': times}, **{field: np.full(CAPACITY, float(number))
+                                                     for field in TRACK_FIELDS})
+            for sat_id in SATELLITES]
+
+
+def publish_forever(name, stop):
+    """Writer process: publish numbered frames back to back until stopped."""
+    buffer = SharedTrackBuffer(SATELLITES, CAPACITY, name=name)
+    tracks = frame(0)
+    number = 0
+    while not stop.is_set():
+        number += 1
+        for sat in tracks:
+            sat['times'][:] = np.datetime64(1_700_000_000 + number, 's')
+            for field in TRACK_FIELDS:
+                sat[field][:] = number
+        buffer.write(tracks)
+    buffer.close()
+
+
+def snapshot_values(satellite_data):
+    """Copy every time and value of a read, as the renderer's drawing would use them."""
+    return np.concatenate([np.concatenate([sat['times'].astype(np.int64) // 1_000_000]
+                                          + [sat[field] for field in TRACK_FIELDS])
+                           for sat in satellite_data])
+
+
+def test_second_publish_marks_read_stale():
+    buffer = SharedTrackBuffer(SATELLITES, CAPACITY)
+    try:
+        buffer.write(frame(1))
+        sequence, satellite_data = buffer.read()
+        buffer.write(frame(2))   # fills the other buffer: the read is still intact
+        assert not buffer.is_stale(sequence)
+        assert np.all(snapshot_values(satellite_data) % 1_700_000_000 == 1)
+        buffer.write(frame(3))   # overwrites the buffer that was read
+        assert buffer.is_stale(sequence)
+        assert buffer.version == 3
+    finally:
+        buffer.close()
+
+
+def test_concurrent_reads_are_never_torn_when_fresh():
+    buffer = SharedTrackBuffer(SATELLITES, CAPACITY)
+    stop = multiprocessing.Event()
+    writer = multiprocessing.Process(target=publish_forever, args=(buffer.name, stop), daemon=True)
+    writer.start()
+    try:
+        while buffer.version == 0:
+            time.sleep(0.001)
+        rng = np.random.default_rng(1)
+        fresh = stale = 0
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            sequence, satellite_data = buffer.read()
+            time.sleep(rng.uniform(0, 0.005))   # drawing takes a while, so writes overlap it
+            values = snapshot_values(satellite_data)
+            if buffer.is_stale(sequence):
+                stale += 1
+                continue
+            fresh += 1
+            frames = np.unique(values % 1_700_000_000)
+            assert len(frames) == 1, f"torn read accepted at sequence {sequence}: frames {frames[:5]}"
+        assert fresh > 0 and stale > 0
+    finally:
+        stop.set()
+        writer.join(5)
+        buffer.close()
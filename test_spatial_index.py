@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+Check spatial index queries against brute force over every satellite
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-scripts'))
+
+from frames import lat_lon
+from spatial_index import SpatialIndex
+
+
+def make_positions(count=600, seed=5):
+    """LEO to GEO positions, with a tight cluster so close pairs exist at every scale."""
+    rng = np.random.default_rng(seed)
+    direction = rng.normal(size=(count, 3))
+    direction /= np.linalg.norm(direction, axis=1)[:, None]
+    xyz = direction * rng.choice([6800.0, 7200.0, 26560.0, 42164.0], count)[:, None]
+    xyz[:40] = xyz[0] + rng.normal(0, 50.0, (40, 3))
+    return [f'sat{i:03d}' for i in range(count)], xyz
+
+
+@pytest.fixture(scope='module')
+def index():
+    ids, xyz = make_positions()
+    index = SpatialIndex(1000.0)
+    index.update(ids, xyz)
+    return index
+
+
+def test_region_matches_brute_force(index):
+    lat, lon = lat_lon(index.xyz)
+    for box in [(-30, 30, 10, 120), (0, 90, 300, 40), (-90, -10, -170, -100)]:
+        lat_min, lat_max, lon_min, lon_max = box
+        lo, hi = lon_min % 360, lon_max % 360
+        in_lon = (lon >= lo) & (lon <= hi) if lo <= hi else (lon >= lo) | (lon <= hi)
+        expected = set(index.ids[(lat >= lat_min) & (lat <= lat_max) & in_lon])
+        assert set(index.query_region(*box)) == expected
+
+
+@pytest.mark.parametrize('radius', [100.0, 1500.0, 20000.0])
+def test_radius_and_nearest_match_brute_force(index, radius):
+    rng = np.random.default_rng(1)
+    for point in [index.xyz[0], rng.normal(0, 20000.0, 3), [100000.0, 0.0, 0.0]]:
+        distances = np.linalg.norm(index.xyz - point, axis=1)
+        inside = np.flatnonzero(distances <= radius)
+        found = index.query_radius(point, radius)
+        assert [sat_id for sat_id, _ in found] == index.ids[inside[np.argsort(distances[inside])]].tolist()
+
+        nearest = index.query_nearest(point, k=7)
+        assert np.allclose([d for _, d in nearest], np.sort(distances)[:7])
+
+
+@pytest.mark.parametrize('threshold', [60.0, 800.0, 3000.0])
+def test_close_pairs_match_brute_force(index, threshold):
+    expected = {(a, b) for a, b in itertools.combinations(range(len(index)), 2)
+                if np.linalg.norm(index.xyz[a] - index.xyz[b]) <= threshold}
+    found = index.close_pairs(threshold)
+    assert len(found) == len(expected)
+    lookup = {sat_id: i for i, sat_id in enumerate(index.ids)}
+    assert {tuple(sorted((lookup[a], lookup[b]))) for a, b, _ in found} == expected
+
+
+def test_non_finite_positions_are_left_out():
+    index = SpatialIndex(1000.0)
+    index.update(['a', 'b', 'c'], [[7000.0, 0.0, 0.0], [np.nan, np.nan, np.nan], [0.0, 42164.0, 0.0]])
+    assert index.ids.tolist() == ['a', 'c']
+    assert [sat_id for sat_id, _ in index.query_nearest([7000.0, 0.0, 0.0], k=3)] == ['a', 'c']
+    assert index.query_nearest([np.nan, 0.0, 0.0], k=1) == []
+    assert index.query_radius([np.inf, 0.0, 0.0], 1e6) == []
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+Check that archived tracks decode to within the codec quantum
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python-scripts'))
+
+from track_codec import COMPRESSORS, DEFAULT_PRECISION, decode_columns, encode_columns
+
+
+def make_track(count=1441, seed=3):
+    """A LEO-like track at one-minute cadence with jitter, antimeridian crossings and gaps."""
+    rng = np.random.default_rng(seed)
+    t = 1735689600.0 + 60.0 * np.arange(count) + rng.uniform(-0.4, 0.4, count)
+    t[count // 2:] += 3600.0   # a one-hour outage
+    phase = 2 * np.pi * (t - t[0]) / 5580.0
+    lat = 51.6 * np.sin(phase)
+    lon = (np.degrees(phase) * 1.06 + 170.0) % 360.0 - 180.0
+    alt = 420.0 + 5.0 * np.sin(phase / 3) + rng.normal(0, 0.01, count)
+    radius = 6371.2 + alt
+    x = radius * np.cos(np.radians(lat)) * np.cos(np.radians(lon))
+    y = radius * np.cos(np.radians(lat)) * np.sin(np.radians(lon))
+    z = radius * np.sin(np.radians(lat))
+    track = {'t': t, 'lat': lat, 'lon': lon, 'alt': alt, 'x': x, 'y': y, 'z': z}
+    track['alt'][[i for i in (5, 6, 700) if i < count]] = np.nan   # missing values
+    return track
+
+
+@pytest.mark.parametrize('compressor', sorted(COMPRESSORS))
+def test_round_trip_within_quantum(compressor):
+    track = make_track()
+    decoded = decode_columns(encode_columns(track, compressor=compressor))
+    assert list(decoded) == list(track)
+    for name, values in track.items():
+        out = decoded[name]
+        assert out.shape == values.shape
+        missing = np.isnan(values)
+        assert np.array_equal(np.isnan(out), missing), name
+        error = np.abs(out[~missing] - values[~missing])
+        if name == 'lon':
+            error = np.minimum(error, 360.0 - error)
+            assert out.min() >= -180.0 and out.max() < 180.0
+        assert error.max() <= DEFAULT_PRECISION[name] / 2 * (1 + 1e-6), name
+
+
+def test_custom_precision_and_column_selection():
+    track = make_track(count=200)
+    blob = encode_columns(track, precision={'x': 1.0, 'y': 1.0, 'z': 1.0})
+    decoded = decode_columns(blob, columns=('t', 'x'))
+    assert list(decoded) == ['t', 'x']
+    assert np.abs(decoded['x'] - track['x']).max() <= 0.5 + 1e-9
+    assert np.abs(decoded['t'] - track['t']).max() <= DEFAULT_PRECISION['t'] / 2 + 1e-9
+    assert len(blob) < 8 * 7 * 200   # smaller than the raw float64 columns
+
+
+def test_short_and_empty_tracks():
+    for count in (0, 1, 2):
+        track = {name: values[:count] for name, values in make_track(count=5).items()}
+        decoded = decode_columns(encode_columns(track))
+        for name, values in track.items():
+            assert len(decoded[name]) == count
+            assert np.allclose(decoded[name], values, atol=DEFAULT_PRECISION[name], equal_nan=True)
+
+
+def test_rejects_foreign_blob():
+    with pytest.raises(ValueError):
+        decode_columns(b'NOPE' + bytes(16))